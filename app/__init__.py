@@ -2,14 +2,21 @@ import os
 import logging
 from flask import Flask
 from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash
 from flask_login import LoginManager
-from app.models import db, User
+from app.models import db
 from app.blueprints.auth import auth_bp
 from app.blueprints.admin import admin_bp
 from app.blueprints.utility import utility_bp
 from app.blueprints.planning import planning_bp
 from app.blueprints.media import media_bp
+from app.blueprints.portfolio import portfolio_bp
+from app.cli import register_cli
+from app.user_cache import init_user_cache, load_cached_user
+from app.db_tuning import build_engine_options, sqlite_pragmas, install_sqlite_pragmas
+from app.metrics import init_metrics
+from app.slow_queries import init_slow_query_log
+from app.compression import init_compression
+from app.json_provider import init_json_provider
 from config import get_config
 
 def create_app():
@@ -18,51 +25,49 @@ def create_app():
     app = Flask(__name__, static_folder='../static', static_url_path='/static')
     # Load config
     app.config.from_object(get_config())
+    init_json_provider(app)
     if app.config['SECRET_KEY'] == 'dev-insecure':
         app.logger.warning('Using fallback dev SECRET_KEY; set SECRET_KEY in .env for production.')
     # Basic logging config (can be overridden by gunicorn/host)
     logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s in %(module)s: %(message)s')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, sqlite_pragmas(app.config))
+        init_metrics(app, db.engine)
+        init_slow_query_log(app, db.engine)
     login_manager = LoginManager()
     login_manager.login_view = 'auth.login'
     login_manager.init_app(app)
 
+    init_user_cache(app)
+    init_compression(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(int(user_id))
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
     app.register_blueprint(utility_bp)
     app.register_blueprint(planning_bp)
     app.register_blueprint(media_bp)
+    app.register_blueprint(portfolio_bp)
+    # Optional feature blueprints are imported only when enabled
+    if app.config.get('ENABLE_PRESENCE', True):
+        from app.blueprints.presence import presence_bp
+        app.register_blueprint(presence_bp)
+    if app.config.get('ENABLE_DRAFTS', True):
+        from app.blueprints.drafts import drafts_bp
+        app.register_blueprint(drafts_bp)
+    register_cli(app)
 
-    def ensure_admin():
-        username = os.getenv('ADMIN_USERNAME')
-        password = os.getenv('ADMIN_PASSWORD')
-        if not username or not password:
-            return
-        user = User.query.filter_by(username=username).first()
-        created = False
-        if not user:
-            user = User(username=username, password_hash=generate_password_hash(password), is_admin=True)
-            db.session.add(user)
-            created = True
-        else:
-            if not user.is_admin:
-                user.is_admin = True
-        try:
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
-        # Optional: you could print/log creation, but avoid noisy stdout in production.
-
-    with app.app_context():
-        # Avoid create_all when Alembic is managing schema (prevents duplicate tables during migrations)
-        alembic_running = os.getenv('ALEMBIC_RUNNING') == '1'
-        if not alembic_running:
-            # For first-run (no migrations run yet) allow create_all, but prefer Alembic afterwards.
-            if not os.path.exists(os.path.join(app.root_path, '..', 'app.db')):
-                db.create_all()
-        ensure_admin()
+    # Skipped under Alembic: the schema is about to change under these checks
+    if os.getenv('ALEMBIC_RUNNING') != '1':
+        if app.config.get('BOOTSTRAP_ON_START'):
+            from app.bootstrap import bootstrap
+            bootstrap(app)
+        if app.config.get('INDEX_CHECK_ON_START'):
+            from app.index_check import check_indexes
+            check_indexes(app)
     return app
@@ -1,31 +1,122 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+import itertools
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import current_user, login_required
 from werkzeug.security import generate_password_hash
+from sqlalchemy import event, func, select, union_all
+from sqlalchemy.orm import Session
 from app.models import db, User, Project, Phase, Feature, Item, Image
+from app.cache import TTLCache
+from app.upload_gc import scan_uploads
+from app.user_cache import invalidate_user
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# Dashboard figures are cached briefly and dropped whenever a counted model is written
+_stats_cache = TTLCache(ttl_seconds=30, maxsize=4)
+_STATS_MODELS = (User, Project, Phase, Feature, Item, Image)
+
+@event.listens_for(Session, 'after_flush')
+def _invalidate_stats_on_write(session, flush_context):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _STATS_MODELS):
+            _stats_cache.clear()
+            return
+
 def _require_admin():
     if not current_user.is_authenticated or not current_user.is_admin:
         flash('Admin access required.')
         return False
     return True
 
+def _table_counts():
+    """All headline counts in one statement (one scalar subquery per table)."""
+    def count_of(model):
+        return select(func.count()).select_from(model).scalar_subquery()
+    row = db.session.execute(select(
+        count_of(User).label('users'),
+        count_of(Project).label('projects'),
+        count_of(Phase).label('phases'),
+        count_of(Feature).label('features'),
+        count_of(Item).label('items'),
+        count_of(Image).label('images'),
+    )).one()
+    return dict(row._mapping)
+
+def _project_breakdown():
+    """Per-project parts, images and total scheduled days from grouped queries."""
+    parts = union_all(
+        select(Phase.project_id.label('project_id'), Phase.duration.label('duration')),
+        select(Phase.project_id, Feature.duration).join(Phase, Feature.phase_id == Phase.id),
+        select(Phase.project_id, Item.duration)
+            .join(Feature, Item.feature_id == Feature.id)
+            .join(Phase, Feature.phase_id == Phase.id),
+    ).subquery()
+    part_rows = db.session.execute(
+        select(parts.c.project_id, func.count(), func.coalesce(func.sum(parts.c.duration), 0))
+        .group_by(parts.c.project_id)
+    ).all()
+    image_rows = db.session.execute(
+        select(Image.project_id, func.count())
+        .where(Image.project_id.isnot(None))
+        .group_by(Image.project_id)
+    ).all()
+    by_project = {pid: {'parts': n, 'scheduled_days': int(days or 0)} for pid, n, days in part_rows}
+    images = {pid: n for pid, n in image_rows}
+    out = []
+    for pid, title in db.session.execute(select(Project.id, Project.title).order_by(Project.title.asc())):
+        agg = by_project.get(pid, {'parts': 0, 'scheduled_days': 0})
+        out.append({'id': pid, 'title': title, 'parts': agg['parts'],
+                    'images': images.get(pid, 0), 'scheduled_days': agg['scheduled_days']})
+    return out
+
+def dashboard_stats():
+    """Cached dashboard payload: counts, per-project breakdown and recent users."""
+    cached = _stats_cache.get('dashboard')
+    if cached is not None:
+        return cached
+    recent = db.session.execute(
+        select(User.id, User.username, User.is_admin).order_by(User.id.desc()).limit(5)
+    ).all()
+    payload = {
+        'stats': _table_counts(),
+        'projects': _project_breakdown(),
+        'recent_users': [{'id': uid, 'username': name, 'is_admin': bool(adm)} for uid, name, adm in recent],
+    }
+    _stats_cache.set('dashboard', payload, ttl_seconds=current_app.config.get('ADMIN_STATS_TTL_SECONDS', 30))
+    return payload
+
 @admin_bp.route('/')
 @login_required
 def dashboard():
     if not _require_admin():
         return redirect(url_for('planning.index'))
-    stats = {
-        'users': User.query.count(),
-        'projects': Project.query.count(),
-        'phases': Phase.query.count(),
-    'features': Feature.query.count(),
-    'items': Item.query.count(),
-        'images': Image.query.count()
-    }
-    recent_users = User.query.order_by(User.id.desc()).limit(5).all()
-    return render_template('admin_dashboard.html', stats=stats, recent_users=recent_users)
+    payload = dashboard_stats()
+    return render_template('admin_dashboard.html', stats=payload['stats'],
+                           project_stats=payload['projects'], recent_users=payload['recent_users'])
+
+USERS_PAGE_SIZE = 50
+
+def _users_page(q='', mode='prefix', after=None, limit=USERS_PAGE_SIZE):
+    """One keyset page of users ordered by username.
+
+    mode='prefix' turns q into a case-insensitive range on lower(username)
+    (q <= lower(username) < q + U+FFFF, q lowercased) that the ix_user_username_lower
+    expression index can serve; mode='contains' keeps the old substring match (full scan).
+    `after` is the last username of the previous page. Returns (users, next_cursor).
+    """
+    query = User.query
+    if q:
+        if mode == 'contains':
+            query = query.filter(User.username.ilike(f"%{q}%"))
+        else:
+            q = q.lower()
+            lowered = func.lower(User.username)
+            query = query.filter(lowered >= q, lowered < q + '\uffff')
+    if after:
+        query = query.filter(User.username > after)
+    rows = query.order_by(User.username.asc()).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].username if len(rows) > limit else None
+    return rows[:limit], next_cursor
 
 @admin_bp.route('/users')
 @login_required
@@ -33,12 +124,19 @@ def users():
     if not _require_admin():
         return redirect(url_for('planning.index'))
     q = request.args.get('q','').strip()
-    query = User.query
-    if q:
-        like = f"%{q}%"
-        query = query.filter(User.username.ilike(like))
-    users = query.order_by(User.username.asc()).all()
-    return render_template('admin_users.html', users=users, q=q)
+    mode = 'contains' if request.args.get('mode') == 'contains' else 'prefix'
+    after = request.args.get('after') or None
+    try:
+        limit = max(1, min(200, int(request.args.get('limit', USERS_PAGE_SIZE))))
+    except ValueError:
+        limit = USERS_PAGE_SIZE
+    users, next_cursor = _users_page(q, mode, after, limit)
+    if request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json':
+        return {
+            'users': [{'id': u.id, 'username': u.username, 'is_admin': bool(u.is_admin)} for u in users],
+            'next': next_cursor,
+        }
+    return render_template('admin_users.html', users=users, q=q, mode=mode, next_cursor=next_cursor, limit=limit)
 
 @admin_bp.route('/create_user', methods=['POST'])
 @login_required
@@ -74,6 +172,7 @@ def delete_user(user_id):
         flash('Cannot delete user who owns projects.')
         return redirect(url_for('admin.users'))
     db.session.delete(user); db.session.commit()
+    invalidate_user(user_id)
     flash('User deleted')
     return redirect(url_for('admin.users'))
 
@@ -92,6 +191,7 @@ def reset_password(user_id):
         return redirect(url_for('admin.users'))
     user.password_hash = generate_password_hash(new_pw)
     db.session.commit()
+    invalidate_user(user_id)
     flash(f'Password reset for {user.username}.')
     return redirect(url_for('admin.users'))
 
@@ -102,7 +202,7 @@ def make_admin(user_id):
         return redirect(url_for('planning.index'))
     user = User.query.get(user_id)
     if user:
-        user.is_admin = True; db.session.commit(); flash(f'User {user.username} is now an admin.')
+        user.is_admin = True; db.session.commit(); invalidate_user(user_id); flash(f'User {user.username} is now an admin.')
     return redirect(url_for('admin.users'))
 
 @admin_bp.route('/revoke_admin/<int:user_id>')
@@ -112,7 +212,40 @@ def revoke_admin(user_id):
         return redirect(url_for('planning.index'))
     user = User.query.get(user_id)
     if user and user.id != current_user.id:
-        user.is_admin = False; db.session.commit(); flash(f'Admin rights revoked for {user.username}.')
+        user.is_admin = False; db.session.commit(); invalidate_user(user_id); flash(f'Admin rights revoked for {user.username}.')
     else:
         flash('Cannot revoke this user.')
     return redirect(url_for('admin.users'))
+
+@admin_bp.route('/uploads_gc', methods=['POST'])
+@login_required
+def uploads_gc():
+    """Scan the upload folder against Image rows; reclaim orphans when reclaim=1 is posted."""
+    if not _require_admin():
+        return redirect(url_for('planning.index'))
+    from app.blueprints.media import UPLOAD_FOLDER
+    data = request.get_json() if request.is_json else request.form
+    reclaim = str(data.get('reclaim', '')) in ('1', 'true', 'on')
+    report = scan_uploads(UPLOAD_FOLDER, reclaim=reclaim)
+    if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return report
+    if report.get('error'):
+        flash(f"Upload scan failed: {report['error']}")
+    elif reclaim:
+        flash(f"Reclaimed {report['reclaimed_files']} orphaned file(s) and {report['removed_rows']} dangling image row(s).")
+    else:
+        flash(f"Upload scan: {report['scanned_files']} file(s), {report['orphan_count']} orphaned, {report['dangling_count']} dangling row(s).")
+    return redirect(url_for('admin.dashboard'))
+
+@admin_bp.route('/slow_queries')
+@login_required
+def slow_queries():
+    """Recent statements over SLOW_QUERY_MS with their route and EXPLAIN QUERY PLAN."""
+    if not _require_admin():
+        return redirect(url_for('planning.index'))
+    from app import slow_queries as slow_log
+    entries = slow_log.recent()
+    if request.args.get('format') == 'json':
+        return {'threshold_ms': current_app.config.get('SLOW_QUERY_MS'), 'queries': entries}
+    return render_template('admin_slow_queries.html', entries=entries,
+                           threshold_ms=current_app.config.get('SLOW_QUERY_MS'))
@@ -1,40 +1,33 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, current_user
 from werkzeug.security import check_password_hash, generate_password_hash
 from app.models import db, User
+from app import throttle
+from app.user_cache import invalidate_user
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
-    import time
-    MAX_ATTEMPTS = 5
-    LOCK_SECONDS = 300
     if current_user.is_authenticated:
         return redirect(url_for('planning.index'))
-    locked_until = session.get('login_lock_until')
-    if locked_until and locked_until > time.time():
-        flash(f'Too many attempts. Try again in {int(locked_until - time.time())}s')
-        return render_template('login.html')
     if request.method == 'POST':
         username = request.form.get('username','').strip()
         password = request.form.get('password','')
-        attempts = session.get('login_attempts', 0)
+        addr = request.remote_addr
+        # Throttle before touching the password hash so floods cost a row update, not a KDF run
+        wait = throttle.acquire(username, addr)
+        if wait:
+            flash(f'Too many attempts. Try again in {wait}s')
+            return render_template('login.html'), 429
         user = User.query.filter_by(username=username).first()
         if user and check_password_hash(user.password_hash, password):
-            session['login_attempts'] = 0
-            session.pop('login_lock_until', None)
+            throttle.record_success(username, addr)
             login_user(user)
             flash('Signed in')
             return redirect(url_for('planning.index'))
-        attempts += 1
-        session['login_attempts'] = attempts
-        remaining = MAX_ATTEMPTS - attempts
-        if remaining <= 0:
-            session['login_lock_until'] = time.time() + LOCK_SECONDS
-            flash('Account locked for 5 minutes due to repeated failures.')
-        else:
-            flash(f'Invalid credentials. {remaining} attempts left.')
+        throttle.record_failure(username, addr)
+        flash('Invalid credentials.')
         return redirect(url_for('auth.login'))
     return render_template('login.html')
 
@@ -86,8 +79,10 @@ def change_password():
         if len(new) < 6:
             flash('Password must be at least 6 characters')
             return redirect(url_for('auth.change_password'))
+        user_id = current_user.id
         current_user.password_hash = generate_password_hash(new)
         db.session.commit()
+        invalidate_user(user_id)
         flash('Password updated')
         return redirect(url_for('planning.index'))
     return render_template('change_password.html')
@@ -0,0 +1,377 @@
+"""Draft holding area: title-only parts kept outside the schedule until promoted.
+
+Registered only when ENABLE_DRAFTS is on, so deployments without drafts never import it.
+"""
+import io
+from datetime import datetime, date
+from flask import Blueprint, request, session, current_app
+from flask_login import login_required
+from sqlalchemy import and_, or_
+from app.models import db, Phase, Feature, Item, DraftPart
+from app.blueprints.planning import _build_task_for_obj, _recompute_critical, _write_dependencies
+from app.dependencies import DependencyError, DependencyWrite, commit_writes, normalise, part_project_id
+from app.draft_intake import intake_drafts
+
+drafts_bp = Blueprint('drafts', __name__)
+PART_MODELS = {'phase': Phase, 'feature': Feature, 'item': Item}
+
+
+def serialize_draft(d):
+    return {
+        'id': d.id, 'title': d.title, 'type': d.part_type,
+        'internal_external': d.internal_external, 'project_id': d.project_id,
+        'start': d.start_date.isoformat() if d.start_date else None,
+        'duration': d.duration,
+        'milestone': bool(d.is_milestone),
+        'dependencies': d.dependencies,
+        'notes': d.notes,
+        'needs_type': d.part_type is None
+    }
+
+
+def draft_page(project_id=None, after=None, limit=None):
+    """One page of drafts in creation order: the project's plus unassigned ones (all when no project).
+
+    Keyset paging on (created_at, id); `after` is the last draft id of the previous page.
+    Returns (drafts, next_cursor).
+    """
+    limit = max(1, min(int(limit or current_app.config.get('DRAFT_PAGE_SIZE', 50)), 500))
+    q = DraftPart.query
+    if project_id:
+        q = q.filter(or_(DraftPart.project_id == project_id, DraftPart.project_id.is_(None)))
+    if after:
+        anchor = db.session.get(DraftPart, int(after))
+        if anchor is not None:
+            q = q.filter(or_(DraftPart.created_at > anchor.created_at,
+                             and_(DraftPart.created_at == anchor.created_at, DraftPart.id > anchor.id)))
+        else:
+            q = q.filter(DraftPart.id > int(after))
+    rows = q.order_by(DraftPart.created_at.asc(), DraftPart.id.asc()).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+@drafts_bp.route('/drafts')
+@login_required
+def list_drafts():
+    """JSON page of drafts for the selected (or ?project_id=) project; follow `next` with ?after=."""
+    try:
+        project_id = int(request.args.get('project_id') or 0) or session.get('selected_project_id')
+        drafts, next_cursor = draft_page(project_id, request.args.get('after'), request.args.get('limit'))
+    except ValueError:
+        return {'error':'invalid paging parameters'}, 400
+    return {'drafts': [serialize_draft(d) for d in drafts], 'next': next_cursor}
+
+
+@drafts_bp.route('/create_draft_part', methods=['POST'])
+@login_required
+def create_draft_part():
+    """Create a lightweight draft part. Type is optional in holding area.
+
+    If omitted, part_type is stored as NULL and can be assigned during promotion.
+    """
+    title = request.form.get('draft-title','').strip()
+    ptype = request.form.get('draft-type') or None
+    internal_external = request.form.get('draft-internal-external','internal')
+    # Optional extended fields
+    start_raw = request.form.get('draft-start')
+    duration_raw = request.form.get('draft-duration')
+    milestone_flag = bool(request.form.get('draft-milestone'))
+    dependencies = request.form.get('draft-dependencies') or None
+    notes = request.form.get('draft-notes') or None
+    # Allow drafts without project context; use optional explicit project override
+    project_id_form = request.form.get('draft-project-id')
+    try:
+        project_id = int(project_id_form) if project_id_form else session.get('selected_project_id')
+    except Exception:
+        project_id = session.get('selected_project_id')
+    if not title:
+        return {'error':'missing title'}, 400
+    start_date = None
+    if start_raw:
+        try:
+            from datetime import datetime
+            start_date = datetime.strptime(start_raw, '%Y-%m-%d').date()
+        except Exception:
+            start_date = None
+    try:
+        duration = int(duration_raw) if duration_raw else None
+    except ValueError:
+        duration = None
+    # Optional pre-assigned parents to guide promotion
+    phase_id = request.form.get('draft-phase-id'); feature_id = request.form.get('draft-feature-id')
+    try:
+        phase_id_val = int(phase_id) if phase_id else None
+    except ValueError:
+        phase_id_val = None
+    try:
+        feature_id_val = int(feature_id) if feature_id else None
+    except ValueError:
+        feature_id_val = None
+    d = DraftPart(title=title, part_type=ptype, internal_external=internal_external, project_id=project_id,
+                  start_date=start_date, duration=duration, is_milestone=milestone_flag,
+                  dependencies=dependencies, notes=notes, phase_id=phase_id_val, feature_id=feature_id_val)
+    db.session.add(d)
+    db.session.commit()
+    return {'status':'ok','draft': serialize_draft(d)}
+
+@drafts_bp.route('/promote_draft/<int:draft_id>', methods=['POST'])
+@login_required
+def promote_draft(draft_id):
+    """Promote a draft into a concrete part (phase only for now)."""
+    draft = DraftPart.query.get_or_404(draft_id)
+    if draft.part_type != 'phase':
+        return {'error':'Only phase promotion implemented in partial migration'}, 400
+    project_id = draft.project_id or session.get('selected_project_id')
+    if not project_id:
+        return {'error':'project context required'}, 400
+    try:
+        start_date = datetime.strptime(request.form.get('start-date'), '%Y-%m-%d').date()
+    except Exception:
+        return {'error':'invalid start date'}, 400
+    try:
+        duration = int(request.form.get('duration') or 0)
+    except ValueError:
+        duration = 0
+    ph = Phase(title=draft.title, start_date=start_date, duration=duration, project_id=project_id,
+               internal_external=draft.internal_external)
+    db.session.add(ph)
+    db.session.delete(draft)
+    db.session.commit()
+    return {'status':'ok','created':{'id':ph.id,'type':'phase','title':ph.title}, 'removed_draft_id':draft_id}
+
+@drafts_bp.route('/drafts/intake', methods=['POST'])
+@login_required
+def intake_drafts_route():
+    """Bulk-create drafts from an uploaded CSV (`file`) or pasted text (`text`).
+
+    Rows are validated individually; good rows are inserted even when others fail.
+    Returns { status, created, ids, errors: [{line, error}] }.
+    """
+    try:
+        project_id = int(request.form.get('project_id') or 0) or session.get('selected_project_id')
+    except ValueError:
+        return {'error':'invalid project_id'}, 400
+    upload = request.files.get('file')
+    if upload and upload.filename:
+        # Decode the upload stream lazily; utf-8-sig drops the BOM spreadsheet exports add
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace', newline='')
+    elif (request.form.get('text') or '').strip():
+        lines = io.StringIO(request.form['text'], newline='')
+    else:
+        return {'error':'provide a CSV file or pasted text'}, 400
+    result = intake_drafts(lines, project_id=project_id,
+                           batch_size=current_app.config.get('DRAFT_INTAKE_BATCH_SIZE', 500),
+                           max_rows=current_app.config.get('DRAFT_INTAKE_MAX_ROWS', 5000))
+    return {'status':'ok', **result}
+
+
+class PromotionError(ValueError):
+    pass
+
+
+def _parse_start(raw, fallback):
+    if not raw:
+        return fallback or date.today()
+    try:
+        return datetime.strptime(raw, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise PromotionError('invalid start')
+
+
+def _parse_duration(raw, fallback):
+    """Explicit duration wins; else the draft's; minimum 1 day."""
+    if not raw and isinstance(fallback, int) and fallback:
+        return max(1, fallback)
+    try:
+        return max(1, int(raw or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def build_promoted_part(draft, spec, project_id):
+    """Unsaved Phase/Feature/Item for `draft` per `spec` (inferred_type, start, duration, phase_id,
+    feature_id, item_id). Carries over milestone, notes and (features/items) dependencies.
+    Raises PromotionError with the same messages the single-draft endpoint returns.
+    """
+    inferred = spec.get('inferred_type') or draft.part_type
+    if not inferred:
+        raise PromotionError('missing fields')
+    if draft.part_type and draft.part_type != inferred:
+        raise PromotionError('draft type conflict')
+    if inferred not in PART_MODELS:
+        raise PromotionError('unsupported inferred type')
+    start_date = _parse_start(spec.get('start'), draft.start_date)
+    duration = _parse_duration(spec.get('duration'), draft.duration)
+    common = dict(title=draft.title, start_date=start_date, duration=duration,
+                  internal_external=draft.internal_external, is_milestone=bool(draft.is_milestone), notes=draft.notes)
+    if inferred == 'phase':
+        if not project_id:
+            raise PromotionError('project context required')
+        part = Phase(project_id=project_id, **common)
+    elif inferred == 'feature':
+        phase_id = spec.get('phase_id') or draft.phase_id
+        if not phase_id:
+            raise PromotionError('phase_id required')
+        part = Feature(phase_id=int(phase_id), dependencies=draft.dependencies, **common)
+    else:
+        resolved_feature_id = None
+        feature_id = spec.get('feature_id') or draft.feature_id
+        item_id = spec.get('item_id') or draft.item_id
+        if feature_id:
+            try:
+                resolved_feature_id = int(feature_id)
+            except (TypeError, ValueError):
+                resolved_feature_id = None
+        if not resolved_feature_id and item_id:
+            try:
+                it_ref = db.session.get(Item, int(item_id))
+                resolved_feature_id = it_ref.feature_id if it_ref else None
+            except (TypeError, ValueError):
+                resolved_feature_id = None
+        if not resolved_feature_id:
+            raise PromotionError('feature_id required')
+        part = Item(feature_id=resolved_feature_id, dependencies=draft.dependencies, **common)
+    draft.part_type = inferred
+    return inferred, part
+
+
+def _check_promoted_dependencies(promoted):
+    """Validate carried-over dependencies of a promotion batch (parts already added to the session).
+
+    Targets are checked first, then one flush gives the new parts ids for the cycle checks,
+    which run in batch order so later drafts see earlier ones. Returns (writes, errors).
+    """
+    writes, checked, errors = {}, [], []
+    for draft, kind, part in promoted:
+        if kind not in ('feature', 'item') or not part.dependencies:
+            continue
+        with db.session.no_autoflush:
+            project_id = part_project_id(kind, part)
+        if project_id not in writes:
+            writes[project_id] = DependencyWrite(project_id)
+        write = writes[project_id]
+        try:
+            tokens = write.targets(part.dependencies)
+        except DependencyError as exc:
+            errors.append({'draft_id': draft.id, **exc.to_dict()})
+            continue
+        part.dependencies = normalise(tokens)
+        checked.append((draft.id, write, kind, part, tokens))
+    if errors or not checked:
+        return writes, errors
+    db.session.flush()
+    for draft_id, write, kind, part, tokens in checked:
+        try:
+            write.apply(f'{kind}-{part.id}', tokens)
+        except DependencyError as exc:
+            errors.append({'draft_id': draft_id, **exc.to_dict()})
+    return writes, errors
+
+
+def _critical_path_for(project_id):
+    cp, _, _, _ = _recompute_critical(project_id)
+    return cp
+
+
+@drafts_bp.route('/promote_draft_auto', methods=['POST'])
+@login_required
+def promote_draft_auto():
+    """Promote a draft with an inferred type & parent context via drag/drop.
+
+    Expected JSON:
+    { draft_id, inferred_type (phase|feature|item), start, duration, phase_id?, feature_id? }
+    If draft.part_type is NULL we assign inferred_type. If it is set and differs, we return error.
+    """
+    data = request.get_json() or {}
+    draft_id = data.get('draft_id'); inferred = data.get('inferred_type')
+    if not (draft_id and inferred):
+        return {'error':'missing fields'}, 400
+    draft = DraftPart.query.get_or_404(int(draft_id))
+    project_id = draft.project_id or session.get('selected_project_id')
+    try:
+        kind, created = build_promoted_part(draft, data, project_id)
+    except PromotionError as exc:
+        return {'error': str(exc)}, 400
+    dep_write = None
+    if kind in ('feature', 'item') and created.dependencies:
+        try:
+            dep_write = _write_dependencies(kind, created, created.dependencies)
+        except DependencyError as exc:
+            return exc.to_dict(), 400
+    db.session.add(created)
+    db.session.delete(draft)
+    commit_writes(dep_write)
+    task = _build_task_for_obj(kind, created)
+    return {'status':'ok','created':{
+                'id': created.id, 'type': kind, 'title': created.title,
+                'start': task['start'], 'duration': created.duration
+            }, 'task': task, 'removed_draft_id': draft_id,
+            'critical_path': _critical_path_for(session.get('selected_project_id') or project_id)}
+
+
+@drafts_bp.route('/promote_drafts', methods=['POST'])
+@login_required
+def promote_drafts():
+    """Promote many drafts in one transaction.
+
+    Expected JSON: { drafts: [ {draft_id, inferred_type?, start?, duration?, phase_id?, feature_id?, item_id?}, ... ] }
+    All-or-nothing: any invalid entry returns 400 with per-draft errors and nothing is written.
+    On success returns the created parts, their Gantt tasks and one recomputed critical path.
+    """
+    specs = (request.get_json() or {}).get('drafts') or []
+    if not isinstance(specs, list) or not specs:
+        return {'error':'no drafts'}, 400
+    limit = current_app.config.get('DRAFT_BULK_LIMIT', 1000)
+    if len(specs) > limit:
+        return {'error': f'at most {limit} drafts per request'}, 400
+    try:
+        ids = [int(s.get('draft_id')) for s in specs]
+    except (AttributeError, TypeError, ValueError):
+        return {'error':'every entry needs a numeric draft_id'}, 400
+    drafts = {d.id: d for d in DraftPart.query.filter(DraftPart.id.in_(ids))}
+    selected = session.get('selected_project_id')
+    errors, promoted, seen = [], [], set()
+    for spec, draft_id in zip(specs, ids):
+        draft = drafts.get(draft_id)
+        if draft_id in seen:
+            errors.append({'draft_id': draft_id, 'error': 'draft listed more than once'})
+            continue
+        seen.add(draft_id)
+        if draft is None:
+            errors.append({'draft_id': draft_id, 'error': 'draft not found'})
+            continue
+        try:
+            promoted.append((draft, *build_promoted_part(draft, spec, draft.project_id or selected)))
+        except PromotionError as exc:
+            errors.append({'draft_id': draft_id, 'error': str(exc)})
+    # Parents must exist: one lookup per parent kind for the whole batch
+    for kind, parent_model, attr in (('feature', Phase, 'phase_id'), ('item', Feature, 'feature_id')):
+        wanted = {getattr(p, attr) for _, k, p in promoted if k == kind}
+        if wanted:
+            found = {pid for (pid,) in db.session.query(parent_model.id).filter(parent_model.id.in_(wanted))}
+            errors.extend({'draft_id': d.id, 'error': f'{attr} {getattr(p, attr)} not found'}
+                          for d, k, p in promoted if k == kind and getattr(p, attr) not in found)
+    if errors:
+        db.session.rollback()
+        return {'error':'promotion failed', 'errors': errors}, 400
+    draft_ids = [d.id for d, _, _ in promoted]
+    project_id = selected or next((d.project_id for d, _, _ in promoted if d.project_id), None)
+    for draft, _, part in promoted:
+        db.session.add(part)
+        db.session.delete(draft)
+    writes, errors = _check_promoted_dependencies(promoted)
+    if errors:
+        db.session.rollback()
+        for write in writes.values():
+            write.abandon()
+        return {'error':'promotion failed', 'errors': errors}, 400
+    commit_writes(*writes.values())
+    created, tasks = [], []
+    for draft_id, (_, kind, part) in zip(draft_ids, promoted):
+        task = _build_task_for_obj(kind, part, check_images=False)  # new parts have no images yet
+        tasks.append(task)
+        created.append({'id': part.id, 'type': kind, 'title': part.title, 'start': task['start'],
+                        'duration': part.duration, 'draft_id': draft_id})
+    return {'status':'ok', 'created': created, 'tasks': tasks, 'removed_draft_ids': draft_ids,
+            'critical_path': _critical_path_for(project_id)}
@@ -1,12 +1,16 @@
-import os, io, zipfile, csv
-from flask import Blueprint, request, redirect, url_for, flash, send_from_directory, current_app, send_file
+import os, io, zipfile
+from flask import Blueprint, request, redirect, url_for, flash, send_from_directory, current_app, Response
 from flask_login import login_required
-from app.models import db, Image, Phase, Feature, Item, Project
+from sqlalchemy import or_
+from app.models import db, Image, Phase, Feature, Item, Project, image_phase, image_feature, image_item
 
 media_bp = Blueprint('media', __name__, url_prefix='/media')
 
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
+# Already-compressed formats are stored as-is in archives; deflating them only burns CPU
+STORED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf'}
+ARCHIVE_CHUNK_SIZE = 64 * 1024
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -119,3 +123,117 @@ def image_links(image_id):
         'features': [simple_feature(f) for f in img.features],
         'items': [simple_item(i) for i in img.items]
     }
+
+@media_bp.route('/links/batch', methods=['POST'])
+@login_required
+def image_links_batch():
+    """Return phase/feature/item links for many images at once.
+
+    Expected JSON: { image_ids: [int, ...] }. Built from three joined queries regardless of
+    how many images are requested (image+phases, features, items). Unknown IDs are omitted.
+    """
+    data = request.get_json() or {}
+    raw_ids = data.get('image_ids') or []
+    try:
+        ids = sorted({int(i) for i in raw_ids})
+    except (TypeError, ValueError):
+        return {'error':'image_ids must be integers'},400
+    if not ids:
+        return {'images': []}
+    by_id = {}
+    # Query 1: image rows with their phase links (outer join keeps unlinked images)
+    rows = (db.session.query(Image.id, Image.filename, Image.project_id, Phase.id, Phase.title)
+            .outerjoin(image_phase, image_phase.c.image_id == Image.id)
+            .outerjoin(Phase, Phase.id == image_phase.c.phase_id)
+            .filter(Image.id.in_(ids))
+            .order_by(Image.id.asc(), Phase.id.asc()))
+    for img_id, filename, project_id, ph_id, ph_title in rows:
+        entry = by_id.get(img_id)
+        if entry is None:
+            entry = by_id[img_id] = {'image_id': img_id, 'filename': filename, 'project_id': project_id,
+                                     'phases': [], 'features': [], 'items': []}
+        if ph_id is not None:
+            entry['phases'].append({'id': ph_id, 'title': ph_title, 'type': 'phase'})
+    if not by_id:
+        return {'images': []}
+    # Queries 2 & 3: feature and item links for the images that exist
+    for model, table, fk_col, key, kind in ((Feature, image_feature, image_feature.c.feature_id, 'features', 'feature'),
+                                             (Item, image_item, image_item.c.item_id, 'items', 'item')):
+        rows = (db.session.query(table.c.image_id, model.id, model.title)
+                .join(model, model.id == fk_col)
+                .filter(table.c.image_id.in_(list(by_id)))
+                .order_by(table.c.image_id.asc(), model.id.asc()))
+        for img_id, part_id, part_title in rows:
+            by_id[img_id][key].append({'id': part_id, 'title': part_title, 'type': kind})
+    return {'images': [by_id[i] for i in ids if i in by_id]}
+
+# -------------------- Project archive (metadata + media) --------------------
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that hands finished zip bytes back to a generator."""
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+    def writable(self):
+        return True
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _project_images(project_id):
+    """Images owned by the project or linked to any of its phases/features/items (one query)."""
+    phase_ids = db.session.query(Phase.id).filter(Phase.project_id == project_id)
+    feature_ids = db.session.query(Feature.id).filter(Feature.phase_id.in_(phase_ids))
+    item_ids = db.session.query(Item.id).filter(Item.feature_id.in_(feature_ids))
+    return (Image.query
+            .filter(or_(Image.project_id == project_id,
+                        Image.id.in_(db.session.query(image_phase.c.image_id).filter(image_phase.c.phase_id.in_(phase_ids))),
+                        Image.id.in_(db.session.query(image_feature.c.image_id).filter(image_feature.c.feature_id.in_(feature_ids))),
+                        Image.id.in_(db.session.query(image_item.c.image_id).filter(image_item.c.item_id.in_(item_ids)))))
+            .order_by(Image.id.asc())
+            .all())
+
+def _iter_project_archive(payload_json, files):
+    """Yield a zip archive piece by piece; media files are read in ARCHIVE_CHUNK_SIZE chunks."""
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('project.json', payload_json)
+        for arcname, path in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            ext = arcname.rsplit('.', 1)[-1].lower()
+            info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            with open(path, 'rb') as src, z.open(info, 'w') as dest:
+                for chunk in iter(lambda: src.read(ARCHIVE_CHUNK_SIZE), b''):
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory is written on close
+    yield sink.drain()
+
+@media_bp.route('/export_project_archive/<int:project_id>')
+@login_required
+def export_project_archive(project_id):
+    """Stream one ZIP with project.json plus every upload associated with the project."""
+    from app.blueprints.planning import build_project_payload
+    proj = Project.query.get_or_404(project_id)
+    payload = build_project_payload(proj)
+    payload['images'] = []
+    files = []
+    seen = set()
+    for img in _project_images(proj.id):
+        path = os.path.join(UPLOAD_FOLDER, img.filename)
+        included = img.filename not in seen and os.path.isfile(path)
+        payload['images'].append({'id': img.id, 'filename': img.filename, 'included': included})
+        if included:
+            seen.add(img.filename)
+            files.append((f'uploads/{img.filename}', path))
+    headers = {'Content-Disposition': f'attachment; filename=project_{proj.id}_with_media.zip'}
+    # Serialise up front: the generator runs after the app context is gone
+    return Response(_iter_project_archive(current_app.json.dumps(payload, indent=2), files), mimetype='application/zip', headers=headers)
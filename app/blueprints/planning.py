@@ -1,9 +1,14 @@
-from flask import Blueprint, render_template, session, redirect, url_for, request, flash, send_file, current_app
+from flask import Blueprint, Response, render_template, session, redirect, url_for, request, flash, send_file, current_app
 from flask_login import login_required, current_user
-from app.models import db, Project, Phase, Feature, Item, Image, DraftPart, UserSession
-import os, json, io, csv, zipfile, re
+from app.models import db, part_end_date, Project, NonWorkingPeriod, Phase, Feature, Item, Image, UserSession
+import os, io, csv, zipfile, re
 from datetime import datetime, timedelta, date
 import uuid as _uuid
+from app.scheduling import auto_schedule_project, ScheduleCycleError
+from app.risk import analyse_project_risk
+from app.rollups import rollup_summary, rollup_drift
+from app.dependencies import DependencyError, DependencyWrite, commit_writes, normalise
+from app.workcal import calendar_for_project, parse_weekmask, resync_end_dates
 
 planning_bp = Blueprint('planning', __name__)
 
@@ -31,12 +36,14 @@ def _parse_dep_ids(raw: str):
             continue
     return out
 
+def _part_end(obj):
+    """Exclusive end: the materialised end_date (working-calendar aware), computed if not flushed yet."""
+    return getattr(obj, 'end_date', None) or part_end_date(obj.start_date, getattr(obj, 'duration', 0))
+
 def _task_window(obj):
     if not obj.start_date:
         return None, None
-    start = obj.start_date
-    end = obj.start_date + timedelta(days=getattr(obj, 'duration', 0))
-    return start, end
+    return obj.start_date, _part_end(obj)
 
 def compute_critical_path(phases, features, items):
     """Compute a naive critical path across phases/features/items.
@@ -127,7 +134,7 @@ def _serialize_part(kind, obj):
         'id': obj.id,
         'type': kind,
         'title': getattr(obj, 'title', None),
-        'start': obj.start_date.strftime('%Y-%m-%d') if getattr(obj, 'start_date', None) else None,
+        'start': obj.start_date.isoformat() if getattr(obj, 'start_date', None) else None,
         'duration': getattr(obj, 'duration', None),
         'dependencies': getattr(obj, 'dependencies', None),
         'is_milestone': bool(getattr(obj, 'is_milestone', False)),
@@ -141,16 +148,36 @@ def _serialize_part(kind, obj):
         base['phase_id'] = getattr(obj, 'phase_id', None)
     elif kind == 'item':
         base['feature_id'] = getattr(obj, 'feature_id', None)
+    if kind in ('feature', 'item'):
+        base['duration_optimistic'] = obj.duration_optimistic
+        base['duration_pessimistic'] = obj.duration_pessimistic
+    if kind in ('phase', 'feature'):
+        base['rollup'] = rollup_summary(obj)
     return base
 
-def _build_task_for_obj(kind, obj):
+def _apply_estimates(obj, data, prefix):
+    """Optional three-point bounds; an empty value clears the bound, invalid input is ignored."""
+    for field in ('optimistic', 'pessimistic'):
+        for key in (f'{prefix}-duration-{field}', f'duration_{field}'):
+            if key in data:
+                raw = data.get(key)
+                if raw in (None, ''):
+                    setattr(obj, f'duration_{field}', None)
+                else:
+                    try:
+                        setattr(obj, f'duration_{field}', max(0, int(raw)))
+                    except (TypeError, ValueError):
+                        pass
+                break
+
+def _build_task_for_obj(kind, obj, check_images=True):
     if not obj:
         return None
-    start = obj.start_date.strftime('%Y-%m-%d') if getattr(obj, 'start_date', None) else None
+    start = obj.start_date.isoformat() if getattr(obj, 'start_date', None) else None
     end = None
     if getattr(obj, 'start_date', None) is not None:
         try:
-            end = (obj.start_date + timedelta(days=getattr(obj, 'duration', 0))).strftime('%Y-%m-%d')
+            end = _part_end(obj).isoformat()
         except Exception:
             end = start
     cls = f"{kind}-bar"
@@ -158,12 +185,14 @@ def _build_task_for_obj(kind, obj):
         cls += ' external-bar'
     # Minimal indicators for images and notes
     try:
-        if hasattr(obj, 'images_multi') and obj.images_multi.count() > 0:
+        if check_images and hasattr(obj, 'images_multi') and obj.images_multi.count() > 0:
             cls += ' has-images'
     except Exception:
         pass
     if getattr(obj, 'notes', None):
         cls += ' has-notes'
+    if kind in ('phase', 'feature') and rollup_drift(obj):
+        cls += ' rollup-drift'
     task = {
         'id': f'{kind}-{obj.id}',
         'name': f'{kind.capitalize()}: {getattr(obj,"title","")}',
@@ -172,8 +201,43 @@ def _build_task_for_obj(kind, obj):
         'progress': 0,
         'custom_class': cls
     }
+    if kind in ('phase', 'feature'):
+        task['rollup'] = rollup_summary(obj)
     return task
 
+def _write_dependencies(kind, part, raw):
+    """Validate raw as part's dependencies and assign the normalised value (adding and flushing
+    new parts so they have an id). Returns the DependencyWrite; commit with commit_writes().
+    On DependencyError the session has been rolled back.
+    """
+    write = DependencyWrite.for_part(kind, part)
+    try:
+        tokens = write.targets(raw)
+        part.dependencies = normalise(tokens)
+        if part.id is None:
+            db.session.add(part)
+            db.session.flush()
+        write.apply(f'{kind}-{part.id}', tokens)
+    except DependencyError:
+        db.session.rollback()
+        write.abandon()
+        raise
+    return write
+
+def _json_project_id(data):
+    """project_id from a JSON body, else the selected project; None if absent, ValueError if not an id."""
+    raw = data.get('project_id') or session.get('selected_project_id')
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f'invalid project_id {raw!r}')
+
+def _attachment(data, mimetype, filename):
+    """In-memory download as a plain Response (send_file's passthrough would skip compression)."""
+    return Response(data, mimetype=mimetype, headers={'Content-Disposition': f'attachment; filename={filename}'})
+
 def _is_ajax():
     return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
@@ -268,18 +332,25 @@ def create_part():
         if ajax: return {'error':msg},400
         flash(msg); return redirect(url_for('planning.index'))
 
+    dep_write = None
+    if ptype in ('feature', 'item') and dependencies_raw:
+        try:
+            dep_write = _write_dependencies(ptype, created, dependencies_raw)
+        except DependencyError as exc:
+            if ajax: return exc.to_dict(), 400
+            flash(str(exc)); return redirect(url_for('planning.index'))
     db.session.add(created)
-    db.session.commit()
+    commit_writes(dep_write)
     resp_created = {
         'id': created.id,
         'type': ptype,
         'title': created.title,
-        'start': created.start_date.strftime('%Y-%m-%d') if created.start_date else None,
+        'start': created.start_date.isoformat() if created.start_date else None,
         'duration': getattr(created,'duration',0),
         'dependencies': getattr(created,'dependencies',None)
     }
     # Build gantt task object expected client-side as resp.task
-    end_date = (created.start_date + timedelta(days=getattr(created,'duration',0))).strftime('%Y-%m-%d') if created.start_date else None
+    end_date = _part_end(created).isoformat() if created.start_date else None
     custom_cls = f"{ptype}-bar"
     if getattr(created,'internal_external','internal') == 'external':
         custom_cls += ' external-bar'
@@ -296,179 +367,6 @@ def create_part():
     flash(f'{ptype.capitalize()} created')
     return redirect(url_for('planning.index'))
 
-@planning_bp.route('/create_draft_part', methods=['POST'])
-@login_required
-def create_draft_part():
-    """Create a lightweight draft part. Type is optional in holding area.
-
-    If omitted, part_type is stored as NULL and can be assigned during promotion.
-    """
-    title = request.form.get('draft-title','').strip()
-    ptype = request.form.get('draft-type') or None
-    internal_external = request.form.get('draft-internal-external','internal')
-    # Optional extended fields
-    start_raw = request.form.get('draft-start')
-    duration_raw = request.form.get('draft-duration')
-    milestone_flag = bool(request.form.get('draft-milestone'))
-    dependencies = request.form.get('draft-dependencies') or None
-    notes = request.form.get('draft-notes') or None
-    # Allow drafts without project context; use optional explicit project override
-    project_id_form = request.form.get('draft-project-id')
-    try:
-        project_id = int(project_id_form) if project_id_form else session.get('selected_project_id')
-    except Exception:
-        project_id = session.get('selected_project_id')
-    if not title:
-        return {'error':'missing title'}, 400
-    start_date = None
-    if start_raw:
-        try:
-            from datetime import datetime
-            start_date = datetime.strptime(start_raw, '%Y-%m-%d').date()
-        except Exception:
-            start_date = None
-    try:
-        duration = int(duration_raw) if duration_raw else None
-    except ValueError:
-        duration = None
-    # Optional pre-assigned parents to guide promotion
-    phase_id = request.form.get('draft-phase-id'); feature_id = request.form.get('draft-feature-id')
-    try:
-        phase_id_val = int(phase_id) if phase_id else None
-    except ValueError:
-        phase_id_val = None
-    try:
-        feature_id_val = int(feature_id) if feature_id else None
-    except ValueError:
-        feature_id_val = None
-    d = DraftPart(title=title, part_type=ptype, internal_external=internal_external, project_id=project_id,
-                  start_date=start_date, duration=duration, is_milestone=milestone_flag,
-                  dependencies=dependencies, notes=notes, phase_id=phase_id_val, feature_id=feature_id_val)
-    db.session.add(d)
-    db.session.commit()
-    return {'status':'ok','draft':{
-        'id': d.id, 'title': d.title, 'type': d.part_type,
-        'internal_external': d.internal_external, 'project_id': d.project_id,
-        'start': d.start_date.isoformat() if d.start_date else None,
-        'duration': d.duration,
-        'milestone': bool(d.is_milestone),
-        'dependencies': d.dependencies,
-        'notes': d.notes,
-        'needs_type': d.part_type is None
-    }}
-
-@planning_bp.route('/promote_draft/<int:draft_id>', methods=['POST'])
-@login_required
-def promote_draft(draft_id):
-    """Promote a draft into a concrete part (phase only for now)."""
-    draft = DraftPart.query.get_or_404(draft_id)
-    if draft.part_type != 'phase':
-        return {'error':'Only phase promotion implemented in partial migration'}, 400
-    project_id = draft.project_id or session.get('selected_project_id')
-    if not project_id:
-        return {'error':'project context required'}, 400
-    try:
-        start_date = datetime.strptime(request.form.get('start-date'), '%Y-%m-%d').date()
-    except Exception:
-        return {'error':'invalid start date'}, 400
-    try:
-        duration = int(request.form.get('duration') or 0)
-    except ValueError:
-        duration = 0
-    ph = Phase(title=draft.title, start_date=start_date, duration=duration, project_id=project_id,
-               internal_external=draft.internal_external)
-    db.session.add(ph)
-    db.session.delete(draft)
-    db.session.commit()
-    return {'status':'ok','created':{'id':ph.id,'type':'phase','title':ph.title}, 'removed_draft_id':draft_id}
-
-@planning_bp.route('/promote_draft_auto', methods=['POST'])
-@login_required
-def promote_draft_auto():
-    """Promote a draft with an inferred type & parent context via drag/drop.
-
-    Expected JSON:
-    { draft_id, inferred_type (phase|feature|item), start, duration, phase_id?, feature_id? }
-    If draft.part_type is NULL we assign inferred_type. If it is set and differs, we return error.
-    """
-    data = request.get_json() or {}
-    draft_id = data.get('draft_id'); inferred = data.get('inferred_type')
-    start_raw = data.get('start'); duration = data.get('duration') or 1
-    if not (draft_id and inferred):
-        return {'error':'missing fields'}, 400
-    draft = DraftPart.query.get_or_404(int(draft_id))
-    if draft.part_type and draft.part_type != inferred:
-        return {'error':'draft type conflict'}, 400
-    if not draft.part_type:
-        draft.part_type = inferred
-    # Prefer provided start; else use draft.start_date if available
-    if start_raw:
-        try:
-            start_date = datetime.strptime(start_raw, '%Y-%m-%d').date()
-        except Exception:
-            return {'error':'invalid start'}, 400
-    else:
-        start_date = draft.start_date or date.today()
-    try:
-        duration = int(duration)
-    except ValueError:
-        duration = 1
-    if duration < 1: duration = 1
-    if not data.get('duration') and draft.duration and isinstance(draft.duration, int):
-        duration = max(1, draft.duration)
-    created = None
-    project_id = draft.project_id or session.get('selected_project_id')
-    if inferred == 'phase':
-        if not project_id:
-            return {'error':'project context required'}, 400
-        created = Phase(title=draft.title, start_date=start_date, duration=duration,
-                         project_id=project_id, internal_external=draft.internal_external)
-    elif inferred == 'feature':
-        phase_id = data.get('phase_id') or draft.phase_id
-        if not phase_id:
-            return {'error':'phase_id required'}, 400
-        created = Feature(title=draft.title, start_date=start_date, duration=duration,
-                          phase_id=int(phase_id), internal_external=draft.internal_external)
-    elif inferred == 'item':
-        feature_id = data.get('feature_id') or draft.feature_id
-        item_id = data.get('item_id') or draft.item_id
-        resolved_feature_id = None
-        if feature_id:
-            try:
-                resolved_feature_id = int(feature_id)
-            except Exception:
-                resolved_feature_id = None
-        if not resolved_feature_id and item_id:
-            try:
-                it_ref = Item.query.get(int(item_id))
-                if it_ref:
-                    resolved_feature_id = it_ref.feature_id
-            except Exception:
-                resolved_feature_id = None
-        if not resolved_feature_id:
-            return {'error':'feature_id required'}, 400
-        created = Item(title=draft.title, start_date=start_date, duration=duration,
-                        feature_id=resolved_feature_id, internal_external=draft.internal_external)
-    else:
-        return {'error':'unsupported inferred type'}, 400
-    db.session.add(created)
-    db.session.delete(draft)
-    db.session.commit()
-    end_date = (created.start_date + timedelta(days=getattr(created,'duration',0))).strftime('%Y-%m-%d') if created.start_date else None
-    # classes handled by _build_task_for_obj for consistency
-    task = {
-        'id': f'{inferred}-{created.id}',
-        'name': f'{inferred.capitalize()}: {created.title}',
-        'start': created.start_date.strftime('%Y-%m-%d'),
-        'end': end_date,
-        'progress': 0,
-        'custom_class': _build_task_for_obj(inferred, created)['custom_class']
-    }
-    return {'status':'ok','created':{
-                'id': created.id, 'type': inferred, 'title': created.title,
-                'start': task['start'], 'duration': getattr(created,'duration',0)
-            }, 'task': task, 'removed_draft_id': draft_id}
-
 # -------------------- Reorder Endpoints (Phase 2 migration) --------------------
 def _apply_new_positions(model, siblings, new_position):
     """Utility to reassign sequential sort_order with one element moved to new_position."""
@@ -550,9 +448,7 @@ def export_critical_csv():
     writer.writerow(['order','id'])
     for idx, cid in enumerate(critical_ids, start=1):
         writer.writerow([idx, cid])
-    mem = io.BytesIO(output.getvalue().encode('utf-8'))
-    mem.seek(0)
-    return send_file(mem, mimetype='text/csv', as_attachment=True, download_name='critical_path.csv')
+    return _attachment(output.getvalue().encode('utf-8'), 'text/csv', 'critical_path.csv')
 
 # -------------------- Project & Part CRUD Endpoints (ported) --------------------
 @planning_bp.route('/create_project', methods=['POST'])
@@ -666,12 +562,22 @@ def edit_feature(feature_id):
             ft.duration = int(dur_val)
         except Exception:
             pass
-    ft.dependencies = data.get('feature-dependencies') or data.get('dependencies') or ft.dependencies
     ms_flag = data.get('feature-milestone') if not request.is_json else data.get('is_milestone')
     ft.is_milestone = bool(ms_flag)
     ft.internal_external = data.get('feature-type') or data.get('internal_external') or ft.internal_external
     ft.notes = data.get('feature-notes') or data.get('notes') or ft.notes
-    db.session.commit()
+    _apply_estimates(ft, data, 'feature')
+    deps_raw = data.get('feature-dependencies') or data.get('dependencies')
+    dep_write = None
+    if deps_raw and deps_raw != ft.dependencies:
+        try:
+            dep_write = _write_dependencies('feature', ft, deps_raw)
+        except DependencyError as exc:
+            if is_json:
+                return exc.to_dict(), 400
+            flash(str(exc))
+            return redirect(url_for('planning.index'))
+    commit_writes(dep_write)
     if is_json:
         project_id = session.get('selected_project_id')
         cp, _, _, _ = _recompute_critical(project_id)
@@ -714,12 +620,22 @@ def edit_item(item_id):
             it.duration = int(dur_val)
         except Exception:
             pass
-    it.dependencies = data.get('item-dependencies') or data.get('dependencies') or it.dependencies
     ms_flag = data.get('item-milestone') if not request.is_json else data.get('is_milestone')
     it.is_milestone = bool(ms_flag)
     it.internal_external = data.get('item-type') or data.get('internal_external') or it.internal_external
     it.notes = data.get('item-notes') or data.get('notes') or it.notes
-    db.session.commit()
+    _apply_estimates(it, data, 'item')
+    deps_raw = data.get('item-dependencies') or data.get('dependencies')
+    dep_write = None
+    if deps_raw and deps_raw != it.dependencies:
+        try:
+            dep_write = _write_dependencies('item', it, deps_raw)
+        except DependencyError as exc:
+            if is_json:
+                return exc.to_dict(), 400
+            flash(str(exc))
+            return redirect(url_for('planning.index'))
+    commit_writes(dep_write)
     if is_json:
         project_id = session.get('selected_project_id')
         cp, _, _, _ = _recompute_critical(project_id)
@@ -749,6 +665,41 @@ def _iter_project_parts(project_id=None):
         phases, features, items = Phase.query.all(), Feature.query.all(), Item.query.all()
     return phases, features, items
 
+def _parse_feed_day(raw):
+    """FullCalendar sends ISO dates or datetimes (2025-03-01T00:00:00-05:00); keep the day."""
+    return datetime.strptime((raw or '')[:10], '%Y-%m-%d').date()
+
+@planning_bp.route('/calendar/events')
+@login_required
+def calendar_events():
+    """FullCalendar JSON feed: parts overlapping [start, end) for the selected project.
+
+    Uses the materialised end_date, so each level is one indexed range query on
+    start_date/end_date instead of loading the whole project.
+    """
+    try:
+        win_start, win_end = _parse_feed_day(request.args.get('start')), _parse_feed_day(request.args.get('end'))
+    except ValueError:
+        return {'error':'start and end must be YYYY-MM-DD'}, 400
+    if win_end <= win_start:
+        return {'error':'end must be after start'}, 400
+    project_id = request.args.get('project_id', type=int) or session.get('selected_project_id')
+    events = []
+    for kind, model in (('phase', Phase), ('feature', Feature), ('item', Item)):
+        q = (db.session.query(model.id, model.title, model.start_date, model.end_date, model.internal_external)
+             .filter(model.start_date < win_end, model.end_date > win_start))
+        if project_id:
+            if model is Item:
+                q = q.join(Feature, Item.feature_id == Feature.id).join(Phase, Feature.phase_id == Phase.id)
+            elif model is Feature:
+                q = q.join(Phase, Feature.phase_id == Phase.id)
+            q = q.filter(Phase.project_id == project_id)
+        for pid, title, start, end, ie in q.order_by(model.start_date, model.id):
+            events.append({'id': f'{kind}-{pid}', 'title': f'{kind.capitalize()}: {title}',
+                           'start': start.isoformat(), 'end': end.isoformat(),
+                           'color': '#4B4B4B' if ie == 'external' else '#FF8200'})
+    return current_app.json.response(events)
+
 @planning_bp.route('/export_calendar_ics')
 @login_required
 def export_calendar_ics():
@@ -760,7 +711,7 @@ def export_calendar_ics():
             return
         start = obj.start_date.strftime('%Y%m%d')
         # End is exclusive: add duration days
-        end_dt = obj.start_date + timedelta(days=getattr(obj,'duration',0))
+        end_dt = _part_end(obj)
         end = end_dt.strftime('%Y%m%d')
         uid = f"{prefix}-{obj.id}@lsi-graphics"
         title = f"{prefix.capitalize()}: {obj.title}".replace('\n',' ')
@@ -770,14 +721,10 @@ def export_calendar_ics():
     for it in items: add_event('item', it)
     lines.append('END:VCALENDAR')
     data = '\r\n'.join(lines).encode('utf-8')
-    bio = io.BytesIO(data); bio.seek(0)
-    fname = 'project_calendar.ics'
-    return send_file(bio, mimetype='text/calendar', as_attachment=True, download_name=fname)
+    return _attachment(data, 'text/calendar', 'project_calendar.ics')
 
-@planning_bp.route('/export_project/<int:project_id>')
-@login_required
-def export_project(project_id):
-    proj = Project.query.get_or_404(project_id)
+def build_project_payload(proj):
+    """JSON-ready project metadata (phases/features/items) shared by the project exports."""
     payload = {
         'project': {'id': proj.id, 'title': proj.title},
         'phases': [], 'features': [], 'items': []
@@ -788,9 +735,16 @@ def export_project(project_id):
             payload['features'].append({'id': ft.id, 'title': ft.title, 'start': ft.start_date.isoformat(), 'duration': ft.duration, 'phase_id': ph.id, 'deps': ft.dependencies, 'notes': ft.notes})
             for it in ft.items:
                 payload['items'].append({'id': it.id, 'title': it.title, 'start': it.start_date.isoformat(), 'duration': it.duration, 'feature_id': ft.id, 'deps': it.dependencies, 'notes': it.notes})
+    return payload
+
+@planning_bp.route('/export_project/<int:project_id>')
+@login_required
+def export_project(project_id):
+    proj = Project.query.get_or_404(project_id)
+    payload = build_project_payload(proj)
     mem = io.BytesIO()
     with zipfile.ZipFile(mem, 'w', zipfile.ZIP_DEFLATED) as z:
-        z.writestr('project.json', json.dumps(payload, indent=2))
+        z.writestr('project.json', current_app.json.dumps(payload, indent=2))
     mem.seek(0)
     return send_file(mem, mimetype='application/zip', as_attachment=True, download_name=f'project_{proj.id}.zip')
 
@@ -841,12 +795,15 @@ def update_gantt_task():
         new_start = datetime.strptime(start_str, '%Y-%m-%d').date()
     except Exception:
         return {'error':'bad start'},400
+    project_id = session.get('selected_project_id')
+    cal = calendar_for_project(project_id)
     if end_str:
         try:
             end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
         except Exception:
-            end_date = new_start + timedelta(days=getattr(obj,'duration',0))
-        duration = max(1, (end_date - new_start).days)
+            end_date = cal.end_date(new_start, getattr(obj,'duration',0))
+        # The dragged bar spans calendar days; durations are counted in working days
+        duration = max(1, cal.count(new_start, end_date))
     else:
         duration = getattr(obj,'duration',1)
     obj.start_date = new_start
@@ -855,7 +812,6 @@ def update_gantt_task():
     db.session.commit()
 
     # Cascade (features/items only) recompute earliest starts for dependents
-    project_id = session.get('selected_project_id')
     cp, phases, features, items = [], *(_iter_project_parts(project_id))
     dependents_map = _build_dependency_graph(features, items)
     index_map = _index_objects(phases, features, items)
@@ -881,9 +837,12 @@ def update_gantt_task():
                 for d in deps:
                     kt2, parent_obj = index_map.get(d, (None,None))
                     if parent_obj and parent_obj.start_date:
-                        pend = parent_obj.start_date + timedelta(days=getattr(parent_obj,'duration',0))
+                        pend = cal.end_date(parent_obj.start_date, getattr(parent_obj,'duration',0))
                         if not latest_end or pend > latest_end:
                             latest_end = pend
+                if latest_end:
+                    # Dependents start on the next working day after the predecessor ends
+                    latest_end = cal.roll_forward(latest_end)
                 if latest_end and (latest_end != child.start_date):
                     # shift child if earlier than required; ensure not before dependency end
                     if latest_end > child.start_date:
@@ -891,7 +850,7 @@ def update_gantt_task():
                         db.session.add(child)
             adjustments.append({
                 'id': f'{kt}-{child.id}',
-                'start': child.start_date.strftime('%Y-%m-%d'),
+                'start': child.start_date.isoformat(),
                 'duration': getattr(child,'duration',0)
             })
             start_numeric_ids.append(dep)
@@ -899,6 +858,111 @@ def update_gantt_task():
         db.session.commit()
     return {'status':'ok','duration':duration,'cascade':adjustments}
 
+@planning_bp.route('/auto_schedule', methods=['POST'])
+@login_required
+def auto_schedule():
+    """Re-plan the selected project from its dependencies (forward/backward pass, one bulk write).
+
+    JSON: { project_id?, start? (YYYY-MM-DD), honour_current_starts? (default true), dry_run? }
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        project_id = _json_project_id(data)
+    except ValueError as exc:
+        return {'error': str(exc)}, 400
+    if not project_id:
+        return {'error':'project context required'}, 400
+    start = None
+    if data.get('start'):
+        try:
+            start = datetime.strptime(data['start'], '%Y-%m-%d').date()
+        except ValueError:
+            return {'error':'invalid start'}, 400
+    try:
+        result = auto_schedule_project(project_id, start=start,
+                                       honour_current_starts=data.get('honour_current_starts', True) is not False,
+                                       dry_run=bool(data.get('dry_run')))
+    except ScheduleCycleError as exc:
+        return {'error': str(exc), 'cycle': exc.sids}, 409
+    return {'status':'ok', **result}
+
+@planning_bp.route('/risk_analysis', methods=['POST'])
+@login_required
+def risk_analysis():
+    """Monte Carlo finish-date risk from three-point duration estimates.
+
+    JSON: { project_id?, simulations?, seed?, start? (YYYY-MM-DD), honour_current_starts? }
+    Returns P50/P80/P95 finish dates and each task's criticality index (share of runs on the critical path).
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        project_id = _json_project_id(data)
+    except ValueError as exc:
+        return {'error': str(exc)}, 400
+    if not project_id:
+        return {'error':'project context required'}, 400
+    cfg = current_app.config
+    try:
+        simulations = int(data.get('simulations') or cfg.get('RISK_SIMULATIONS', 2000))
+        seed = int(data['seed']) if data.get('seed') is not None else None
+        start = datetime.strptime(data['start'], '%Y-%m-%d').date() if data.get('start') else None
+    except (TypeError, ValueError):
+        return {'error':'invalid simulations, seed or start'}, 400
+    max_sims = cfg.get('RISK_MAX_SIMULATIONS', 20000)
+    if not 1 <= simulations <= max_sims:
+        return {'error': f'simulations must be between 1 and {max_sims}'}, 400
+    try:
+        result = analyse_project_risk(project_id, simulations=simulations, seed=seed,
+                                      workers=cfg.get('RISK_WORKERS', 0), start=start,
+                                      honour_current_starts=data.get('honour_current_starts', True) is not False)
+    except ScheduleCycleError as exc:
+        return {'error': str(exc), 'cycle': exc.sids}, 409
+    return {'status':'ok', **result}
+
+def _serialize_calendar(proj):
+    periods = sorted(proj.non_working_periods, key=lambda p: (p.start_date, p.id))
+    return {'project_id': proj.id, 'workweek': proj.workweek,
+            'periods': [{'id': p.id, 'start': p.start_date.isoformat(), 'end': p.end_date.isoformat(), 'label': p.label}
+                        for p in periods]}
+
+@planning_bp.route('/project_calendar', methods=['GET','POST'])
+@login_required
+def project_calendar():
+    """Working calendar of a project: workweek mask plus holidays/shutdowns (end inclusive).
+
+    POST JSON: { project_id?, workweek: '1111100' | 'Mon Tue Wed Thu Fri' | null, periods?: [{start, end?, label?}] }
+    A null workweek switches the project back to calendar days. Supplied periods replace the
+    existing ones. Every part's end_date is recomputed afterwards.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        project_id = _json_project_id({'project_id': data.get('project_id') or request.args.get('project_id')})
+    except ValueError as exc:
+        return {'error': str(exc)}, 400
+    if not project_id:
+        return {'error':'project context required'}, 400
+    proj = Project.query.get_or_404(project_id)
+    if request.method == 'GET':
+        return _serialize_calendar(proj)
+    try:
+        if 'workweek' in data:
+            proj.workweek = parse_weekmask(data['workweek']) if data['workweek'] else None
+        if 'periods' in data:
+            periods = []
+            for p in data['periods'] or []:
+                start = datetime.strptime(p['start'], '%Y-%m-%d').date()
+                end = datetime.strptime(p['end'], '%Y-%m-%d').date() if p.get('end') else start
+                if end < start:
+                    raise ValueError(f"period ending {end} starts after it ends")
+                periods.append(NonWorkingPeriod(start_date=start, end_date=end, label=(p.get('label') or '').strip()[:120] or None))
+            proj.non_working_periods = periods
+    except (KeyError, TypeError, ValueError) as exc:
+        db.session.rollback()
+        return {'error': f'invalid calendar: {exc}'}, 400
+    db.session.commit()
+    resynced = resync_end_dates(proj.id)
+    return {'status':'ok', 'resynced': resynced, **_serialize_calendar(proj)}
+
 @planning_bp.route('/')
 @login_required
 def index():
@@ -919,8 +983,8 @@ def index():
 
     gantt_tasks = []
     for phase in phases:
-        phase_start = phase.start_date.strftime('%Y-%m-%d') if phase.start_date else None
-        phase_end = (phase.start_date + timedelta(days=phase.duration)).strftime('%Y-%m-%d') if phase.start_date else None
+        phase_start = phase.start_date.isoformat() if phase.start_date else None
+        phase_end = _part_end(phase).isoformat() if phase.start_date else None
         cls = 'phase-bar'
         if phase.internal_external == 'external':
             cls += ' external-bar'
@@ -931,10 +995,13 @@ def index():
             pass
         if phase.notes:
             cls += ' has-notes'
-        gantt_tasks.append({'id': f'phase-{phase.id}','name': f'Phase: {phase.title}','start': phase_start,'end': phase_end,'progress':0,'custom_class': cls})
+        if rollup_drift(phase):
+            cls += ' rollup-drift'
+        gantt_tasks.append({'id': f'phase-{phase.id}','name': f'Phase: {phase.title}','start': phase_start,'end': phase_end,'progress':0,'custom_class': cls,
+                            'rollup': rollup_summary(phase)})
         for feature in getattr(phase, 'features', []):
-            f_start = feature.start_date.strftime('%Y-%m-%d') if feature.start_date else None
-            f_end = (feature.start_date + timedelta(days=feature.duration)).strftime('%Y-%m-%d') if feature.start_date else None
+            f_start = feature.start_date.isoformat() if feature.start_date else None
+            f_end = _part_end(feature).isoformat() if feature.start_date else None
             cls_f = 'feature-bar'
             if feature.internal_external=='external': cls_f += ' external-bar'
             try:
@@ -944,10 +1011,13 @@ def index():
                 pass
             if feature.notes:
                 cls_f += ' has-notes'
-            gantt_tasks.append({'id': f'feature-{feature.id}','name': f'Feature: {feature.title}','start': f_start,'end': f_end,'progress':0,'custom_class': cls_f})
+            if rollup_drift(feature):
+                cls_f += ' rollup-drift'
+            gantt_tasks.append({'id': f'feature-{feature.id}','name': f'Feature: {feature.title}','start': f_start,'end': f_end,'progress':0,'custom_class': cls_f,
+                                'rollup': rollup_summary(feature)})
             for item in getattr(feature, 'items', []):
-                item_start = item.start_date.strftime('%Y-%m-%d') if item.start_date else None
-                item_end = (item.start_date + timedelta(days=item.duration)).strftime('%Y-%m-%d') if item.start_date else None
+                item_start = item.start_date.isoformat() if item.start_date else None
+                item_end = _part_end(item).isoformat() if item.start_date else None
                 cls_i = 'item-bar'
                 if item.internal_external=='external': cls_i += ' external-bar'
                 try:
@@ -959,24 +1029,19 @@ def index():
                     cls_i += ' has-notes'
                 gantt_tasks.append({'id': f'item-{item.id}','name': f'Item: {item.title}','start': item_start,'end': item_end,'progress':0,'custom_class': cls_i})
 
-    gantt_json_js = json.dumps(gantt_tasks)
-    # Calendar events (simple mapping)
-    calendar_events = []
-    for t in gantt_tasks:
-        if not t['start']:
-            continue
-        # End for calendar = end +1 day for exclusive range safety handled client-side; keep end
-        calendar_events.append({'id': t['id'], 'title': t['name'], 'start': t['start'], 'end': t['end'], 'color': '#FF8200' if 'external' not in t['custom_class'] else '#4B4B4B'})
-    calendar_events_json = json.dumps(calendar_events)
-    draft_parts = DraftPart.query.order_by(DraftPart.created_at.asc()).all()
-    draft_json_js = json.dumps([
-        {'id': d.id, 'title': d.title, 'type': d.part_type, 'internal_external': d.internal_external, 'project_id': d.project_id, 'needs_type': d.part_type is None}
-        for d in draft_parts
-    ])
+    gantt_json_js = current_app.json.dumps(gantt_tasks)
+    draft_parts, draft_next = [], None
+    if current_app.config.get('ENABLE_DRAFTS', True):
+        from app.blueprints.drafts import draft_page, serialize_draft
+        draft_parts, draft_next = draft_page(selected_project_id)
+        draft_parts = [serialize_draft(d) for d in draft_parts]
+    draft_json_js = current_app.json.dumps(draft_parts)
     images = Image.query.all()
     # Active users list (simple last_seen within 5 minutes)
     recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-    active_sessions = UserSession.query.filter(UserSession.last_seen >= recent_cutoff).all()
+    active_sessions = []
+    if current_app.config.get('ENABLE_PRESENCE', True):
+        active_sessions = UserSession.query.filter(UserSession.last_seen >= recent_cutoff).all()
     active_usernames = []
     if active_sessions:
         # Map to usernames via User model if available
@@ -994,7 +1059,7 @@ def index():
     return render_template('index.html',
                            projects=projects, phases=phases, features=features, items=items,
                            images=images, uploads_folder=UPLOAD_FOLDER, gantt_json_js=gantt_json_js,
-                           draft_json_js=draft_json_js, calendar_events_json=calendar_events_json,
+                           draft_json_js=draft_json_js, draft_next=draft_next,
                            active_usernames=active_usernames,
                            critical_filter_active=critical_filter_active, selected_project_id=selected_project_id)
 
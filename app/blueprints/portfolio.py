@@ -0,0 +1,13 @@
+"""Portfolio: cross-project schedule roll-up (finish, critical path, float, external share)."""
+from flask import Blueprint, current_app
+from flask_login import login_required
+from app.portfolio import portfolio_report
+
+portfolio_bp = Blueprint('portfolio', __name__)
+
+@portfolio_bp.route('/portfolio')
+@login_required
+def portfolio():
+    cfg = current_app.config
+    return portfolio_report(workers=cfg.get('PORTFOLIO_WORKERS', 0),
+                            parallel_min_tasks=cfg.get('PORTFOLIO_PARALLEL_MIN_TASKS', 5000))
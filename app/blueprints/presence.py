@@ -0,0 +1,21 @@
+"""Presence: who has been active recently. Registered only when ENABLE_PRESENCE is on."""
+from datetime import datetime, timedelta
+from flask import Blueprint
+from flask_login import login_required
+from app.models import db, User, UserSession
+
+presence_bp = Blueprint('presence', __name__)
+
+@presence_bp.route('/active_users')
+@login_required
+def active_users():
+    cutoff = datetime.utcnow() - timedelta(minutes=15)
+    try:
+        q = (db.session.query(User.username)
+             .join(UserSession, User.id==UserSession.user_id)
+             .filter(UserSession.last_seen >= cutoff)
+             .distinct())
+        users = sorted([r[0] for r in q.all()])
+    except Exception:
+        users=[]
+    return {'users': users}
@@ -1,10 +1,11 @@
-from flask import Blueprint
-from app.models import db, User, UserSession
-from datetime import datetime, timedelta
-from flask_login import login_required
+import hmac
+from flask import Blueprint, Response, current_app, request, abort
+from app.models import db
 
 utility_bp = Blueprint('utility', __name__)
 
+LOOPBACK_ADDRS = ('127.0.0.1', '::1')
+
 @utility_bp.route('/healthz')
 def healthz():
     try:
@@ -13,16 +14,16 @@ def healthz():
     except Exception:
         return {'status':'degraded'}, 500
 
-@utility_bp.route('/active_users')
-@login_required
-def active_users():
-    cutoff = datetime.utcnow() - timedelta(minutes=15)
-    try:
-        q = (db.session.query(User.username)
-             .join(UserSession, User.id==UserSession.user_id)
-             .filter(UserSession.last_seen >= cutoff)
-             .distinct())
-        users = sorted([r[0] for r in q.all()])
-    except Exception:
-        users=[]
-    return {'users': users}
+@utility_bp.route('/metrics')
+def metrics():
+    """Prometheus text exposition of request latency and SQL counters for this worker."""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        abort(404)
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(401)
+    elif current_app.config.get('METRICS_LOOPBACK_ONLY') and request.remote_addr not in LOOPBACK_ADDRS:
+        abort(403)
+    from app.metrics import registry
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
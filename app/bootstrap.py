@@ -0,0 +1,46 @@
+"""One-time bootstrap: create the schema on an empty database and ensure the admin account.
+
+Run explicitly with `flask bootstrap` (or `python init_db.py`) after deploying; `run.py`
+does it before starting the dev server. Workers built by create_app() skip it unless
+BOOTSTRAP_ON_START is set, so they neither query nor write the database at boot.
+"""
+import os
+from sqlalchemy import inspect
+from werkzeug.security import generate_password_hash
+from app.models import db, User
+
+
+def ensure_schema():
+    """create_all only when the database has no tables; Alembic owns the schema afterwards."""
+    if inspect(db.engine).get_table_names():
+        return False
+    db.create_all()
+    return True
+
+
+def ensure_admin(username=None, password=None):
+    """Create or promote the ADMIN_USERNAME account. Returns 'created', 'promoted', 'unchanged' or None."""
+    username = username or os.getenv('ADMIN_USERNAME')
+    password = password or os.getenv('ADMIN_PASSWORD')
+    if not username or not password:
+        return None
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        db.session.add(User(username=username, password_hash=generate_password_hash(password), is_admin=True))
+        status = 'created'
+    elif not user.is_admin:
+        user.is_admin = True
+        status = 'promoted'
+    else:
+        return 'unchanged'
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return None
+    return status
+
+
+def bootstrap(app):
+    with app.app_context():
+        return {'schema_created': ensure_schema(), 'admin': ensure_admin()}
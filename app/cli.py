@@ -0,0 +1,75 @@
+"""Flask CLI commands (run with FLASK_APP=run.py, e.g. `flask uploads-gc`)."""
+import json
+import click
+from flask.cli import with_appcontext
+from app.upload_gc import scan_uploads, DEFAULT_BATCH_SIZE, DEFAULT_MIN_AGE_SECONDS
+
+
+@click.command('uploads-gc')
+@click.option('--reclaim', is_flag=True, help='Delete orphaned files and dangling Image rows (default: report only).')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True, help='Files/rows handled per batch.')
+@click.option('--min-age', default=DEFAULT_MIN_AGE_SECONDS, show_default=True, help='Ignore files modified within this many seconds.')
+@click.option('--folder', default=None, help='Upload folder to scan (defaults to the media upload folder).')
+@with_appcontext
+def uploads_gc_command(reclaim, batch_size, min_age, folder):
+    """Reconcile the upload folder with the Image table."""
+    from app.blueprints.media import UPLOAD_FOLDER
+    report = scan_uploads(folder or UPLOAD_FOLDER, reclaim=reclaim, batch_size=batch_size, min_age_seconds=min_age)
+    click.echo(json.dumps(report, indent=2))
+
+
+@click.command('seed-synthetic')
+@click.option('--parts', default=100, show_default=True, help='Parts (phases+features+items) per project, e.g. 100 / 10000 / 100000.')
+@click.option('--projects', default=1, show_default=True, help='Number of projects to generate.')
+@click.option('--seed', default=None, type=int, help='Random seed for repeatable data.')
+@click.option('--owner', default=None, help='Owning username (default: a "synthetic" user).')
+@click.option('--image-ratio', default=0.05, show_default=True, help='Image rows per part (no files are written).')
+@with_appcontext
+def seed_synthetic_command(parts, projects, seed, owner, image_ratio):
+    """Generate synthetic projects with random dependency DAGs and image links."""
+    from app.synthetic import seed_synthetic
+    summary = seed_synthetic(parts=parts, projects=projects, seed=seed, owner=owner, image_ratio=image_ratio)
+    click.echo(json.dumps(summary, indent=2))
+
+
+@click.command('bootstrap')
+def bootstrap_command():
+    """Create the schema on an empty database and ensure the ADMIN_USERNAME account."""
+    from flask import current_app
+    from app.bootstrap import bootstrap
+    click.echo(json.dumps(bootstrap(current_app._get_current_object()), indent=2))
+
+
+@click.command('auto-schedule')
+@click.option('--project-id', type=int, required=True, help='Project to re-plan.')
+@click.option('--start', default=None, help='Project start date YYYY-MM-DD (default: earliest phase start).')
+@click.option('--asap', is_flag=True, help='Allow tasks to move earlier than their current start.')
+@click.option('--dry-run', is_flag=True, help='Report changes without writing them.')
+@with_appcontext
+def auto_schedule_command(project_id, start, asap, dry_run):
+    """Re-plan a project's features/items from their dependencies."""
+    from datetime import datetime
+    from app.scheduling import auto_schedule_project
+    start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+    result = auto_schedule_project(project_id, start=start_date, honour_current_starts=not asap, dry_run=dry_run)
+    result.pop('updates')
+    click.echo(json.dumps(result, indent=2))
+
+
+@click.command('check-indexes')
+@with_appcontext
+def check_indexes_command():
+    """List indexes declared on the models but missing from the database (exit 1 if any)."""
+    from app.index_check import missing_indexes
+    missing = missing_indexes()
+    click.echo(json.dumps({'missing': missing}, indent=2))
+    if missing:
+        raise SystemExit(1)
+
+
+def register_cli(app):
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(check_indexes_command)
+    app.cli.add_command(auto_schedule_command)
+    app.cli.add_command(uploads_gc_command)
+    app.cli.add_command(seed_synthetic_command)
@@ -0,0 +1,82 @@
+"""Response compression (gzip, and brotli when the `brotli` package is installed).
+
+Applied in an after_request hook to buffered text responses (HTML, JSON, CSV, ICS, JS/CSS)
+of at least COMPRESS_MIN_SIZE bytes, negotiated from Accept-Encoding. Generated CSV/ICS
+exports are plain Responses so they qualify. File downloads sent
+with send_file/send_from_directory (uploads, PNG/JPG/PDF, ZIP exports) and streamed
+responses pass through untouched: they are either already compressed or would have to be
+buffered in full.
+"""
+import gzip
+from flask import request
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/calendar', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+))
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings, allowed=None):
+    """Best encoding by client q-value (ties favour brotli), or None for identity."""
+    best, best_q = None, 0
+    for enc in allowed or available_encodings():
+        q = accept_encodings[enc]
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps output deterministic so identical bodies compress identically
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def _should_compress(response, min_size):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or request.method == 'HEAD':
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    length = response.calculate_content_length()
+    return length is not None and length >= min_size
+
+
+def init_compression(app):
+    """Register the compression hook (no-op when COMPRESS_ENABLED is off)."""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 5)
+    allowed = tuple(e for e in app.config.get('COMPRESS_ALGORITHMS', ('br', 'gzip')) if e in available_encodings())
+
+    @app.after_request
+    def _compress_response(response):
+        if not allowed or not _should_compress(response, min_size):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, allowed)
+        if not encoding:
+            return response
+        body = compress(response.get_data(), encoding, gzip_level, brotli_quality)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # The representation changed, so a strong validator must not be reused
+            response.set_etag(etag, weak=True)
+        return response
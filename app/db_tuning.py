@@ -0,0 +1,47 @@
+"""Engine options and SQLite connect-time PRAGMAs driven by config (see config.SQLITE_PROFILES)."""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from config import SQLITE_PROFILES
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def build_engine_options(config):
+    """Pool sizing for SQLALCHEMY_ENGINE_OPTIONS; explicit options in config win."""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {'pool_pre_ping': url.get_backend_name() != 'sqlite'}
+    # In-memory SQLite uses a static single-connection pool that takes no sizing arguments
+    if not _is_sqlite_memory(url):
+        options.update(
+            pool_size=config.get('DB_POOL_SIZE', 5),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 10),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 30),
+            pool_recycle=config.get('DB_POOL_RECYCLE', 1800),
+        )
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def sqlite_pragmas(config):
+    profile = config.get('SQLITE_PROFILE', 'default')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown SQLITE_PROFILE {profile!r}; expected one of {sorted(SQLITE_PROFILES)}')
+    return SQLITE_PROFILES[profile]
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run the PRAGMAs on every new DB-API connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for stmt in statements:
+                cursor.execute(stmt)
+        finally:
+            cursor.close()
@@ -0,0 +1,246 @@
+"""Write-time dependency validation against a cached per-project dependency index.
+
+Dependencies keep the numeric-ID semantics of compute_critical_path and the scheduler:
+`feature-3`, `item-3` and `3` all make the part depend on every feature/item of the project
+whose id is 3. A write is rejected when a token is malformed, points at a phase or at a
+part outside the project, or would close a cycle.
+
+The index (per project: numeric id -> parts, numeric id -> dependents) is built once with
+one narrow select and cached under the project's schedule_version. The cycle check is a DFS
+over the edited part's descendants, with the request's uncommitted edges overlaid; the
+cached index is patched only once the transaction has committed. Any other write to the
+project moves schedule_version and the next check rebuilds.
+"""
+import re
+import threading
+from collections import defaultdict
+from sqlalchemy import select
+from app.models import db, Project, Phase, Feature, Item
+
+_TOKEN_RE = re.compile(r'^(?:(phase|feature|item)-)?(\d+)$', re.I)
+
+_indexes = {}  # project_id -> DependencyIndex
+_lock = threading.Lock()
+
+
+class DependencyError(ValueError):
+    def __init__(self, message, unknown=(), cycle=()):
+        super().__init__(message)
+        self.unknown = list(unknown)
+        self.cycle = list(cycle)
+
+    def to_dict(self):
+        return {'error': str(self), 'unknown': self.unknown, 'cycle': self.cycle}
+
+
+def parse_tokens(raw):
+    """'feature-3, item-5; 7' -> [('feature', 3, 'feature-3'), ('item', 5, 'item-5'), (None, 7, '7')]."""
+    out, bad = [], []
+    for token in re.split(r'[;,]', raw or ''):
+        token = token.strip()
+        if not token:
+            continue
+        m = _TOKEN_RE.match(token)
+        if not m:
+            bad.append(token)
+            continue
+        out.append(((m.group(1) or '').lower() or None, int(m.group(2)), token))
+    if bad:
+        raise DependencyError(f'invalid dependency {bad[0]!r} (use e.g. feature-3, item-5)', unknown=bad)
+    return out
+
+
+def _numeric(sid):
+    return int(sid.rsplit('-', 1)[1])
+
+
+class DependencyIndex:
+    def __init__(self, project_id, version):
+        self.project_id = project_id
+        self.version = version
+        self.deps = {}                      # sid -> frozenset of numeric ids it depends on
+        self.by_numeric = defaultdict(set)  # numeric id -> sids with that id
+        self.dependents = defaultdict(set)  # numeric id -> sids depending on that id
+
+    @classmethod
+    def build(cls, project_id, version):
+        from app.blueprints.planning import _parse_dep_ids
+        index = cls(project_id, version)
+        queries = (
+            ('feature', select(Feature.id, Feature.dependencies).join(Phase, Feature.phase_id == Phase.id)
+             .where(Phase.project_id == project_id)),
+            ('item', select(Item.id, Item.dependencies).join(Feature, Item.feature_id == Feature.id)
+             .join(Phase, Feature.phase_id == Phase.id).where(Phase.project_id == project_id)),
+        )
+        for kind, q in queries:
+            for pid, raw in db.session.execute(q):
+                index.set_deps(f'{kind}-{pid}', _parse_dep_ids(raw or ''))
+        return index
+
+    def set_deps(self, sid, numerics):
+        """Add the part if new and replace its dependency set."""
+        for d in self.deps.get(sid, ()):
+            self.dependents[d].discard(sid)
+        self.by_numeric[_numeric(sid)].add(sid)
+        self.deps[sid] = frozenset(numerics)
+        for d in self.deps[sid]:
+            self.dependents[d].add(sid)
+
+    def unknown(self, tokens, pending=None):
+        pending = pending or {}
+        bad = []
+        for kind, num, token in tokens:
+            if kind == 'phase':
+                bad.append(token)
+            elif kind and f'{kind}-{num}' not in self.deps and f'{kind}-{num}' not in pending:
+                bad.append(token)
+            elif not kind and not self._parts(num, pending):
+                bad.append(token)
+        return bad
+
+    def _parts(self, num, pending):
+        return self.by_numeric.get(num, set()) | {s for s in pending if _numeric(s) == num}
+
+    def _dependents(self, num, pending):
+        return ({s for s in self.dependents.get(num, ()) if s not in pending}
+                | {s for s, deps in pending.items() if num in deps})
+
+    def find_cycle(self, sid, numerics, pending=None):
+        """Path [sid, ..., pred, sid] if giving sid these dependencies closes a cycle, else None.
+
+        pending (sid -> numerics) overlays uncommitted writes without touching the index.
+        """
+        pending = pending or {}
+        preds = set()
+        for d in numerics:
+            targets = self._parts(d, pending)
+            if targets == {sid}:
+                return [sid, sid]  # depends on nothing but itself
+            preds |= targets - {sid}
+        if not preds:
+            return None
+        parent, stack = {sid: None}, [sid]
+        while stack:
+            u = stack.pop()
+            for w in self._dependents(_numeric(u), pending):
+                if w in parent or w == u:
+                    continue
+                parent[w] = u
+                if w in preds:
+                    path = [w]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    return list(reversed(path)) + [sid]
+                stack.append(w)
+        return None
+
+
+def _current_version(project_id):
+    return db.session.execute(select(Project.schedule_version).where(Project.id == project_id)).scalar()
+
+
+def _session_bumps(project_id):
+    return db.session.info.get('schedule_bumps', {}).get(project_id, 0)
+
+
+def get_index(project_id):
+    version = _current_version(project_id)
+    with _lock:
+        index = _indexes.get(project_id)
+        if index is not None and index.version == version:
+            return index
+    index = DependencyIndex.build(project_id, version)
+    with _lock:
+        _indexes[project_id] = index
+    return index
+
+
+def discard(project_id):
+    with _lock:
+        _indexes.pop(project_id, None)
+
+
+def part_project_id(kind, part):
+    if kind == 'feature':
+        return db.session.execute(select(Phase.project_id).where(Phase.id == part.phase_id)).scalar()
+    return db.session.execute(select(Phase.project_id).join(Feature, Feature.phase_id == Phase.id)
+                              .where(Feature.id == part.feature_id)).scalar()
+
+
+class DependencyWrite:
+    """Dependency changes made by one request in one project.
+
+    targets() checks tokens before anything is written, apply() runs the cycle check for a
+    part that has an id (flush new parts first) against the cached index overlaid with this
+    write's pending edges. The shared index is only patched by committed(), after the
+    transaction commits, and only if the project's version moved by this session's own
+    flushes; otherwise (or via abandon()) it is dropped and rebuilt on the next check.
+    """
+
+    def __init__(self, project_id):
+        self.project_id = project_id
+        # Pending edits of this request must not be flushed (and bump the version) yet
+        with db.session.no_autoflush:
+            self.index = get_index(project_id)
+        self.bumps = _session_bumps(project_id)
+        self.pending = {}  # sid -> frozenset of numeric ids, not yet in the shared index
+
+    @classmethod
+    def for_part(cls, kind, part):
+        with db.session.no_autoflush:
+            return cls(part_project_id(kind, part))
+
+    def targets(self, raw):
+        """Parsed tokens for raw; raises DependencyError for malformed or unknown targets."""
+        tokens = parse_tokens(raw)
+        with _lock:
+            bad = self.index.unknown(tokens, self.pending)
+        if bad:
+            raise DependencyError('unknown dependency target(s): ' + ', '.join(bad)
+                                  + ' (must be features/items of the same project)', unknown=bad)
+        return tokens
+
+    def apply(self, sid, tokens):
+        if any(kind and f'{kind}-{num}' == sid for kind, num, _ in tokens):
+            raise DependencyError(f'{sid} cannot depend on itself', cycle=[sid, sid])
+        numerics = frozenset(num for _, num, _ in tokens)
+        with _lock:
+            cycle = self.index.find_cycle(sid, numerics, self.pending)
+        if cycle:
+            raise DependencyError('dependency cycle: ' + ' -> '.join(cycle), cycle=cycle)
+        self.pending[sid] = numerics
+
+    def committed(self):
+        expected = self.index.version + _session_bumps(self.project_id) - self.bumps
+        version = _current_version(self.project_id)
+        with _lock:
+            current = _indexes.get(self.project_id) is self.index
+            if current and version == expected and (self.pending or version == self.index.version):
+                for sid, numerics in self.pending.items():
+                    self.index.set_deps(sid, numerics)
+                self.index.version = version
+            elif current:
+                _indexes.pop(self.project_id, None)
+        self.pending = {}
+
+    def abandon(self):
+        # Nothing reached the shared index; just forget the pending edges
+        self.pending = {}
+
+
+def commit_writes(*writes):
+    """Commit the session, then publish the dependency writes; abandon them if the commit fails."""
+    writes = [w for w in writes if w is not None]
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for write in writes:
+            write.abandon()
+        raise
+    for write in writes:
+        write.committed()
+
+
+def normalise(tokens):
+    return ','.join(token for _, _, token in tokens) or None
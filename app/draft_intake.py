@@ -0,0 +1,124 @@
+"""Bulk draft intake: parse pasted lists or CSV into DraftPart rows.
+
+Input is consumed line by line (uploads are read through a text wrapper, never loaded
+whole) and valid rows are inserted in batches with one multi-row INSERT each. Invalid
+rows are reported by line number and skipped; they never abort the good ones.
+
+CSV input needs a header row with at least `title`; recognised columns are title, type,
+start (YYYY-MM-DD), duration (days), dependencies, notes, milestone, internal_external.
+Anything else is a plain list: one title per line, with bullets/numbering stripped.
+"""
+import csv
+import re
+from datetime import datetime
+from sqlalchemy import insert
+from app.models import db, DraftPart
+
+COLUMNS = ('title', 'type', 'start', 'duration', 'dependencies', 'notes', 'milestone', 'internal_external')
+PART_TYPES = ('phase', 'feature', 'item')
+TITLE_MAX = 160
+DEPS_MAX = 256
+_BULLET_RE = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+_DEP_TOKEN_RE = re.compile(r'^(?:(?:phase|feature|item)-)?\d+$', re.I)
+_TRUE = ('1', 'y', 'yes', 'true', 'x')
+
+
+class RowError(ValueError):
+    pass
+
+
+def _clean_dependencies(raw):
+    tokens = [t.strip() for t in re.split(r'[;,]', raw or '') if t.strip()]
+    bad = [t for t in tokens if not _DEP_TOKEN_RE.match(t)]
+    if bad:
+        raise RowError(f'invalid dependency {bad[0]!r} (use e.g. feature-3, item-5)')
+    joined = ','.join(tokens)
+    if len(joined) > DEPS_MAX:
+        raise RowError('dependencies too long')
+    return joined or None
+
+
+def validate_row(row, project_id):
+    """Normalise one parsed row into DraftPart column values; raises RowError."""
+    title = (row.get('title') or '').strip()
+    if not title:
+        raise RowError('missing title')
+    if len(title) > TITLE_MAX:
+        raise RowError(f'title longer than {TITLE_MAX} characters')
+    ptype = (row.get('type') or '').strip().lower() or None
+    if ptype and ptype not in PART_TYPES:
+        raise RowError(f'unknown type {ptype!r}')
+    start_raw = (row.get('start') or '').strip()
+    try:
+        start_date = datetime.strptime(start_raw, '%Y-%m-%d').date() if start_raw else None
+    except ValueError:
+        raise RowError(f'invalid start {start_raw!r} (expected YYYY-MM-DD)')
+    duration_raw = (row.get('duration') or '').strip()
+    try:
+        duration = int(duration_raw) if duration_raw else None
+    except ValueError:
+        raise RowError(f'invalid duration {duration_raw!r}')
+    if duration is not None and duration < 1:
+        raise RowError('duration must be at least 1')
+    internal_external = (row.get('internal_external') or 'internal').strip().lower()
+    if internal_external not in ('internal', 'external'):
+        raise RowError(f'invalid internal_external {internal_external!r}')
+    return {
+        'title': title, 'part_type': ptype, 'internal_external': internal_external,
+        'start_date': start_date, 'duration': duration,
+        'is_milestone': (row.get('milestone') or '').strip().lower() in _TRUE,
+        'dependencies': _clean_dependencies(row.get('dependencies')),
+        'notes': (row.get('notes') or '').strip() or None,
+        'project_id': project_id,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def iter_rows(lines):
+    """Yield (line_number, row dict) from an iterable of text lines, CSV or plain list."""
+    lines = iter(lines)
+    first_no, first = 0, None
+    for first_no, first in enumerate(lines, 1):
+        if first.strip():
+            break
+    else:
+        return
+    header = [h.strip().lower() for h in next(csv.reader([first]))]
+    if 'title' in header:
+        reader = csv.reader(lines)
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            yield first_no + reader.line_num, dict(zip(header, row))
+        return
+    yield first_no, {'title': _BULLET_RE.sub('', first).strip()}
+    for line_no, line in enumerate(lines, first_no + 1):
+        if line.strip():
+            yield line_no, {'title': _BULLET_RE.sub('', line).strip()}
+
+
+def intake_drafts(lines, project_id=None, batch_size=500, max_rows=5000):
+    """Validate and bulk-insert drafts. Returns {'created', 'ids', 'errors': [{'line', 'error'}]}."""
+    created_ids, errors, batch = [], [], []
+
+    def flush():
+        if batch:
+            created_ids.extend(db.session.scalars(insert(DraftPart).returning(DraftPart.id), batch).all())
+            batch.clear()
+
+    seen = 0
+    for line_no, row in iter_rows(lines):
+        seen += 1
+        if seen > max_rows:
+            errors.append({'line': line_no, 'error': f'row limit {max_rows} reached; remaining rows ignored'})
+            break
+        try:
+            batch.append(validate_row(row, project_id))
+        except RowError as exc:
+            errors.append({'line': line_no, 'error': str(exc)})
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    db.session.commit()
+    return {'created': len(created_ids), 'ids': created_ids, 'errors': errors}
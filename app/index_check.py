@@ -0,0 +1,71 @@
+"""Compare the indexes declared on the models with those present in the database.
+
+Missing ones usually mean `alembic upgrade head` has not been run; hot queries then fall
+back to full table scans. Run with `flask check-indexes`, or at startup with
+INDEX_CHECK_ON_START=1 (logs a warning per missing index).
+"""
+import logging
+import warnings
+from sqlalchemy import Column, inspect, text
+from sqlalchemy.exc import SAWarning
+from app.models import db
+
+logger = logging.getLogger('app.index_check')
+
+
+def _index_names(engine, insp, table_name):
+    """Names of every index on the table, expression indexes included."""
+    with warnings.catch_warnings():
+        # SQLite reflection skips expression indexes with a warning; they are listed below
+        warnings.simplefilter('ignore', SAWarning)
+        names = {ix['name'] for ix in insp.get_indexes(table_name)}
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as conn:
+            names.update(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"),
+                                      {'t': table_name}).scalars())
+    return names
+
+
+def missing_indexes(engine=None, metadata=None):
+    """Declared indexes with no index on the same leading columns. Returns [{table, name, columns}].
+
+    Expression indexes (e.g. lower(username)) have no plain columns to compare, so they are
+    matched by name instead.
+    """
+    engine = engine or db.engine
+    metadata = metadata or db.metadata
+    insp = inspect(engine)
+    present_tables = set(insp.get_table_names())
+    missing = []
+    for table in metadata.sorted_tables:
+        if table.name not in present_tables or not table.indexes:
+            continue
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', SAWarning)
+            existing = {tuple(ix['column_names']) for ix in insp.get_indexes(table.name)}
+            existing |= {tuple(uc['column_names']) for uc in insp.get_unique_constraints(table.name)}
+        names = None
+        for index in sorted(table.indexes, key=lambda ix: ix.name or ''):
+            cols = tuple(c.name for c in index.columns)
+            if any(not isinstance(e, Column) for e in index.expressions):
+                if names is None:
+                    names = _index_names(engine, insp, table.name)
+                if index.name not in names:
+                    missing.append({'table': table.name, 'name': index.name,
+                                    'columns': [str(e.compile(dialect=engine.dialect)) for e in index.expressions]})
+            elif not any(have[:len(cols)] == cols for have in existing):
+                missing.append({'table': table.name, 'name': index.name, 'columns': list(cols)})
+    return missing
+
+
+def check_indexes(app):
+    with app.app_context():
+        try:
+            missing = missing_indexes()
+        except Exception as exc:  # never block startup on the check itself
+            logger.warning('Index check skipped: %s', exc)
+            return None
+    for ix in missing:
+        logger.warning('Missing index %s on %s(%s); run `alembic upgrade head`',
+                       ix['name'], ix['table'], ', '.join(ix['columns']))
+    return missing
@@ -0,0 +1,52 @@
+"""App JSON provider: orjson when installed, stdlib json otherwise.
+
+Both paths encode date/datetime as ISO 8601 (Flask's default emits HTTP dates), so API
+responses and the JSON embedded in the planning page look the same either way. Select
+with JSON_PROVIDER=auto|orjson|stdlib.
+"""
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+    # Key order is never relied on; sorting every response and embedded payload is pure cost
+    sort_keys = False
+    use_orjson = orjson is not None
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and set(kwargs) <= {'indent', 'separators', 'sort_keys'}:
+            option = orjson.OPT_NON_STR_KEYS
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option).decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+
+class StdlibJSONProvider(AppJSONProvider):
+    use_orjson = False
+
+
+def init_json_provider(app):
+    choice = (app.config.get('JSON_PROVIDER') or 'auto').lower()
+    if choice == 'orjson' and orjson is None:
+        app.logger.warning('JSON_PROVIDER=orjson but orjson is not installed; using stdlib json.')
+    app.json = StdlibJSONProvider(app) if choice == 'stdlib' else AppJSONProvider(app)
@@ -0,0 +1,146 @@
+"""Lightweight request/SQL instrumentation exposed in Prometheus text format.
+
+Per-route latency histograms plus per-route SQL statement and row counters, aggregated in
+process memory under one lock (a few dict updates per request). Each worker process keeps
+its own figures; scrape every worker or aggregate in Prometheus.
+"""
+import bisect
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the per-request query-count histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class _Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'n')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.n += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}       # (endpoint, method) -> _Histogram (seconds)
+            self.query_hist = {}    # endpoint -> _Histogram (statements per request)
+            self.responses = {}     # (endpoint, method, status) -> count
+            self.queries = {}       # endpoint -> statements executed
+            self.rows = {}          # endpoint -> rows reported by the driver (DML rowcount)
+
+    def observe_request(self, endpoint, method, status, seconds, queries, rows):
+        with self._lock:
+            hist = self.latency.get((endpoint, method))
+            if hist is None:
+                hist = self.latency[(endpoint, method)] = _Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            qh = self.query_hist.get(endpoint)
+            if qh is None:
+                qh = self.query_hist[endpoint] = _Histogram(QUERY_COUNT_BUCKETS)
+            qh.observe(queries)
+            key = (endpoint, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.queries[endpoint] = self.queries.get(endpoint, 0) + queries
+            self.rows[endpoint] = self.rows.get(endpoint, 0) + rows
+
+    def observe_background_query(self, rows):
+        """Statements run outside a request (CLI, startup) are tallied under endpoint="none"."""
+        with self._lock:
+            self.queries['none'] = self.queries.get('none', 0) + 1
+            self.rows['none'] = self.rows.get('none', 0) + rows
+
+    @staticmethod
+    def _render_histogram(lines, name, labels, hist):
+        cumulative = 0
+        for bound, count in zip(hist.bounds, hist.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.n}')
+        lines.append(f'{name}_sum{{{labels}}} {hist.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {hist.n}')
+
+    def render(self):
+        with self._lock:
+            latency = sorted(self.latency.items())
+            query_hist = sorted(self.query_hist.items())
+            responses = sorted(self.responses.items())
+            queries = sorted(self.queries.items())
+            rows = sorted(self.rows.items())
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by endpoint and method.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method), hist in latency:
+            self._render_histogram(lines, 'http_request_duration_seconds',
+                                   f'endpoint="{_escape(endpoint)}",method="{method}"', hist)
+        lines += ['# HELP http_responses_total Responses by endpoint, method and status.',
+                  '# TYPE http_responses_total counter']
+        for (endpoint, method, status), count in responses:
+            lines.append(f'http_responses_total{{endpoint="{_escape(endpoint)}",method="{method}",status="{status}"}} {count}')
+        lines += ['# HELP db_queries_per_request SQL statements issued per request.',
+                  '# TYPE db_queries_per_request histogram']
+        for endpoint, hist in query_hist:
+            self._render_histogram(lines, 'db_queries_per_request', f'endpoint="{_escape(endpoint)}"', hist)
+        lines += ['# HELP db_queries_total SQL statements executed.', '# TYPE db_queries_total counter']
+        for endpoint, count in queries:
+            lines.append(f'db_queries_total{{endpoint="{_escape(endpoint)}"}} {count}')
+        lines += ['# HELP db_rows_total Rows reported by the driver (inserted/updated/deleted).',
+                  '# TYPE db_rows_total counter']
+        for endpoint, count in rows:
+            lines.append(f'db_rows_total{{endpoint="{_escape(endpoint)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    g._metrics_queries = 0
+    g._metrics_rows = 0
+
+
+def _after_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is not None:
+        registry.observe_request(request.endpoint or 'unmatched', request.method, response.status_code,
+                                 time.perf_counter() - start, g.pop('_metrics_queries', 0), g.pop('_metrics_rows', 0))
+    return response
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+    if has_request_context() and '_metrics_start' in g:
+        g._metrics_queries += 1
+        g._metrics_rows += rows
+    else:
+        registry.observe_background_query(rows)
+
+
+def init_metrics(app, engine):
+    """Register request timing hooks and the SQL counter on engine (no-op when disabled)."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
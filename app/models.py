@@ -1,5 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, select, inspect, update
+from sqlalchemy.orm import Session
 from flask_login import UserMixin
 
 db = SQLAlchemy()
@@ -11,6 +13,8 @@ class User(UserMixin, db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     last_seen = db.Column(db.DateTime, default=datetime.utcnow)
     projects = db.relationship('Project', backref='owner', lazy=True)
+    # Serves the case-insensitive prefix search in the admin user list
+    __table_args__ = (db.Index('ix_user_username_lower', db.func.lower(username)),)
     def is_active(self):
         return True
 
@@ -18,18 +22,40 @@ class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Working days as a Mon..Sun mask ('1111100'); NULL = durations are calendar days
+    workweek = db.Column(db.String(7))
+    # Bumped whenever the project's parts or calendar change; keys cached schedule analyses
+    schedule_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     phases = db.relationship('Phase', backref='project', lazy=True)
+    non_working_periods = db.relationship('NonWorkingPeriod', backref='project', lazy=True,
+                                          cascade='all, delete-orphan')
+
+class NonWorkingPeriod(db.Model):
+    """Holiday (single day) or shutdown (range, end inclusive) in a project's working calendar."""
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    label = db.Column(db.String(120))
+    __table_args__ = (db.Index('ix_non_working_period_project_id_start_date', 'project_id', 'start_date'),)
 
 class Phase(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     duration = db.Column(db.Integer, nullable=False)  # days
+    end_date = db.Column(db.Date, index=True)  # start_date + duration, maintained on flush
     is_milestone = db.Column(db.Boolean, default=False)
     internal_external = db.Column(db.String(20), default='internal')
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     notes = db.Column(db.Text)
     sort_order = db.Column(db.Integer, default=0)
+    # Materialised roll-ups over the children (see app/rollups.py); maintained on flush
+    rollup_start = db.Column(db.Date)
+    rollup_end = db.Column(db.Date)
+    rollup_children = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rollup_milestones = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    __table_args__ = (db.Index('ix_phase_project_id_sort_order', 'project_id', 'sort_order'),)
     # Renamed: a Phase now has many Features (previously 'Item')
     features = db.relationship('Feature', backref='phase', lazy=True)
     # legacy one-to-many image relation removed; use Image.phases many-to-many (images_multi backref)
@@ -39,13 +65,23 @@ class Feature(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
-    duration = db.Column(db.Integer, nullable=False)
+    duration = db.Column(db.Integer, nullable=False)  # most likely estimate
+    # Optional three-point estimate bounds for risk analysis (NULL = duration is certain)
+    duration_optimistic = db.Column(db.Integer)
+    duration_pessimistic = db.Column(db.Integer)
+    end_date = db.Column(db.Date, index=True)  # start_date + duration, maintained on flush
     dependencies = db.Column(db.String(256))  # comma-separated IDs
     is_milestone = db.Column(db.Boolean, default=False)
     internal_external = db.Column(db.String(20), default='internal')
     phase_id = db.Column(db.Integer, db.ForeignKey('phase.id'), nullable=False)
     notes = db.Column(db.Text)
     sort_order = db.Column(db.Integer, default=0)
+    # Materialised roll-ups over the children (see app/rollups.py); maintained on flush
+    rollup_start = db.Column(db.Date)
+    rollup_end = db.Column(db.Date)
+    rollup_children = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rollup_milestones = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    __table_args__ = (db.Index('ix_feature_phase_id_sort_order', 'phase_id', 'sort_order'),)
     # Children (formerly SubItems) now called Items
     items = db.relationship('Item', backref='feature', lazy=True)
 
@@ -54,35 +90,151 @@ class Item(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
-    duration = db.Column(db.Integer, nullable=False)
+    duration = db.Column(db.Integer, nullable=False)  # most likely estimate
+    # Optional three-point estimate bounds for risk analysis (NULL = duration is certain)
+    duration_optimistic = db.Column(db.Integer)
+    duration_pessimistic = db.Column(db.Integer)
+    end_date = db.Column(db.Date, index=True)  # start_date + duration, maintained on flush
     dependencies = db.Column(db.String(256))
     is_milestone = db.Column(db.Boolean, default=False)
     internal_external = db.Column(db.String(20), default='internal')
     feature_id = db.Column(db.Integer, db.ForeignKey('feature.id'), nullable=False)
     notes = db.Column(db.Text)
     sort_order = db.Column(db.Integer, default=0)
+    __table_args__ = (db.Index('ix_item_feature_id_sort_order', 'feature_id', 'sort_order'),)
+
+def part_end_date(start_date, duration, calendar=None):
+    """Exclusive end used by the Gantt/calendar: start + duration days (working days with a calendar)."""
+    if calendar is not None:
+        return calendar.end_date(start_date, duration)
+    return start_date + timedelta(days=duration or 0) if start_date else None
+
+
+def _part_project_id(connection, target, memo):
+    if isinstance(target, Phase):
+        return target.project_id
+    key = ('feature', target.phase_id) if isinstance(target, Feature) else ('item', target.feature_id)
+    if key not in memo:
+        if key[0] == 'feature':
+            q = select(Phase.project_id).where(Phase.id == target.phase_id)
+        else:
+            q = select(Phase.project_id).join(Feature, Feature.phase_id == Phase.id).where(Feature.id == target.feature_id)
+        memo[key] = connection.execute(q).scalar()
+    return memo[key]
+
+
+def _sync_end_date(mapper, connection, target):
+    state = inspect(target)
+    if (target.end_date is not None and not state.attrs.start_date.history.has_changes()
+            and not state.attrs.duration.history.has_changes()):
+        return
+    from app.workcal import calendar_for_project
+    # Parent -> project and project -> calendar are resolved once per flush, not per part
+    memo = state.session.info.setdefault('flush_calendars', {}) if state.session is not None else {}
+    project_id = _part_project_id(connection, target, memo)
+    if ('calendar', project_id) not in memo:
+        memo[('calendar', project_id)] = calendar_for_project(project_id, connection)
+    target.end_date = part_end_date(target.start_date, target.duration, memo[('calendar', project_id)])
+
+
+@event.listens_for(Session, 'before_flush')
+@event.listens_for(Session, 'after_flush_postexec')
+def _reset_flush_calendars(session, *args):
+    session.info.pop('flush_calendars', None)
+
+
+for _part_model in (Phase, Feature, Item):
+    event.listen(_part_model, 'before_insert', _sync_end_date)
+    event.listen(_part_model, 'before_update', _sync_end_date)
+
+
+def bump_schedule_version(project_ids, bind=None, session=None):
+    """Invalidate cached analyses; call after bulk writes that bypass the ORM unit of work.
+
+    Bumps are also counted per project in session.info['schedule_bumps'], so a caller can
+    tell its own writes from concurrent ones (see app/dependencies.py).
+    """
+    ids = sorted({pid for pid in project_ids if pid})
+    if ids:
+        session = session if session is not None else db.session
+        (bind if bind is not None else session).execute(
+            update(Project).where(Project.id.in_(ids)).values(schedule_version=Project.schedule_version + 1))
+        counts = session.info.setdefault('schedule_bumps', {})
+        for pid in ids:
+            counts[pid] = counts.get(pid, 0) + 1
+
+
+def _touched_projects(session, connection):
+    project_ids, phase_ids, feature_ids = set(), set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Phase, NonWorkingPeriod)):
+            project_ids.add(obj.project_id)
+        elif isinstance(obj, Feature):
+            phase_ids.add(obj.phase_id)
+        elif isinstance(obj, Item):
+            feature_ids.add(obj.feature_id)
+        elif isinstance(obj, Project) and obj in session.dirty and inspect(obj).attrs.workweek.history.has_changes():
+            project_ids.add(obj.id)
+    if feature_ids:
+        phase_ids.update(connection.execute(select(Feature.phase_id).where(Feature.id.in_(feature_ids))).scalars())
+    if phase_ids:
+        project_ids.update(connection.execute(select(Phase.project_id).where(Phase.id.in_(phase_ids))).scalars())
+    return project_ids
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_versions_after_flush(session, flush_context):
+    # new/dirty/deleted still describe the flushed changes at this point
+    if not any(isinstance(o, (Phase, Feature, Item, NonWorkingPeriod, Project))
+               for o in (*session.new, *session.dirty, *session.deleted)):
+        return
+    connection = session.connection()
+    bump_schedule_version(_touched_projects(session, connection), connection, session)
+
+
+def _history_values(obj, attr):
+    """Current and previous values of a foreign key (a moved child touches both parents)."""
+    hist = inspect(obj).attrs[attr].history
+    return {v for v in (*hist.added, *hist.unchanged, *hist.deleted) if v is not None} or {getattr(obj, attr)}
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_rollups_after_flush(session, flush_context):
+    feature_ids, phase_ids = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Item):
+            feature_ids |= _history_values(obj, 'feature_id')
+        elif isinstance(obj, Feature):
+            phase_ids |= _history_values(obj, 'phase_id')
+    if feature_ids or phase_ids:
+        from app.rollups import refresh_rollups
+        refresh_rollups(feature_ids, phase_ids, session.connection())
 
 """Association tables to allow images to be linked to multiple hierarchical parts."""
 image_phase = db.Table(
     'image_phase',
     db.Column('image_id', db.Integer, db.ForeignKey('image.id'), primary_key=True),
-    db.Column('phase_id', db.Integer, db.ForeignKey('phase.id'), primary_key=True)
+    db.Column('phase_id', db.Integer, db.ForeignKey('phase.id'), primary_key=True),
+    # The primary key covers image -> parts; this covers part -> images
+    db.Index('ix_image_phase_phase_id', 'phase_id')
 )
 image_feature = db.Table(
     'image_feature',
     db.Column('image_id', db.Integer, db.ForeignKey('image.id'), primary_key=True),
-    db.Column('feature_id', db.Integer, db.ForeignKey('feature.id'), primary_key=True)
+    db.Column('feature_id', db.Integer, db.ForeignKey('feature.id'), primary_key=True),
+    db.Index('ix_image_feature_feature_id', 'feature_id')
 )
 image_item = db.Table(
     'image_item',
     db.Column('image_id', db.Integer, db.ForeignKey('image.id'), primary_key=True),
-    db.Column('item_id', db.Integer, db.ForeignKey('item.id'), primary_key=True)
+    db.Column('item_id', db.Integer, db.ForeignKey('item.id'), primary_key=True),
+    db.Index('ix_image_item_item_id', 'item_id')
 )
 
 class Image(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(256), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'))  # still track owning project/container
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), index=True)  # still track owning project/container
     # Many-to-many relationships (optional links to parts)
     phases = db.relationship('Phase', secondary=image_phase, backref=db.backref('images_multi', lazy='dynamic'))
     features = db.relationship('Feature', secondary=image_feature, backref=db.backref('images_multi', lazy='dynamic'))
@@ -105,10 +257,20 @@ class DraftPart(db.Model):
     phase_id = db.Column(db.Integer, db.ForeignKey('phase.id'))
     feature_id = db.Column(db.Integer, db.ForeignKey('feature.id'))
     item_id = db.Column(db.Integer, db.ForeignKey('item.id'))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    __table_args__ = (db.Index('ix_draft_part_project_id_created_at', 'project_id', 'created_at'),)
 
 class UserSession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     session_uuid = db.Column(db.String(64), unique=True, nullable=False)
     last_seen = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class LoginThrottle(db.Model):
+    """Server-side login token bucket; one row per throttle key (user+address pair, or address)."""
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), unique=True, nullable=False)
+    tokens = db.Column(db.Float, nullable=False)
+    failures = db.Column(db.Integer, default=0, nullable=False)
+    locked_until = db.Column(db.Float, default=0.0, nullable=False)  # epoch seconds
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # epoch seconds
@@ -0,0 +1,134 @@
+"""Portfolio roll-up: one schedule analysis per project, merged into a single summary.
+
+Each project's analysis (forward/backward pass in its working calendar) is cached under
+its schedule_version, which the ORM bumps on every change to the project's parts or
+calendar. A request only reloads projects whose version moved; their graphs are loaded
+with narrow column selects and the passes run in a process pool when the stale work is
+large enough (PORTFOLIO_WORKERS, PORTFOLIO_PARALLEL_MIN_TASKS), otherwise in-process.
+Entries for deleted projects are dropped on the next report.
+"""
+import threading
+from sqlalchemy import select, func, case
+from app.models import db, Project, Phase, Feature, Item
+from app.process_pool import get_pool
+from app.scheduling import load_project_graph, project_start_date, schedule, ScheduleCycleError
+from app.workcal import calendar_for_project, get_calendar
+
+_cache = {}  # project_id -> (schedule_version, analysis)
+_lock = threading.Lock()
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+def analyse_schedule(graph, start_ordinal, weekmask=None, holidays=()):
+    """Schedule metrics for one project graph; picklable so it can run in a worker process."""
+    if not len(graph):
+        return {'tasks': 0, 'finish': None, 'critical_tasks': 0, 'critical_path_days': 0, 'total_float_days': 0}
+    calendar = get_calendar(weekmask, holidays)
+    try:
+        result = schedule(graph, start_ordinal, True, calendar)
+    except ScheduleCycleError as exc:
+        return {'tasks': len(graph), 'error': str(exc)}
+    es, ls, finish = result['es'], result['ls'], result['finish']
+    critical = [v for v in range(len(graph)) if ls[v] == es[v]]
+    return {
+        'tasks': len(graph),
+        # finish is an exclusive working-day index; the date is the day after its last working day
+        'finish': calendar.end_at(finish - 1, 1).isoformat(),
+        'critical_tasks': len(critical),
+        'critical_path_days': finish - min(es[v] for v in critical) if critical else 0,
+        'total_float_days': sum(ls[v] - es[v] for v in range(len(graph))),
+    }
+
+
+def _external_shares(project_ids):
+    """(parts, external parts, duration, external duration) per project, in two grouped queries."""
+    shares = {pid: [0, 0, 0, 0] for pid in project_ids}
+    external = lambda model: case((model.internal_external == 'external', 1), else_=0)
+    queries = (
+        select(Phase.project_id, func.count(Feature.id), func.sum(external(Feature)),
+               func.sum(Feature.duration), func.sum(external(Feature) * Feature.duration))
+        .join(Phase, Feature.phase_id == Phase.id),
+        select(Phase.project_id, func.count(Item.id), func.sum(external(Item)),
+               func.sum(Item.duration), func.sum(external(Item) * Item.duration))
+        .join(Feature, Item.feature_id == Feature.id).join(Phase, Feature.phase_id == Phase.id),
+    )
+    for q in queries:
+        for pid, *values in db.session.execute(q.where(Phase.project_id.in_(project_ids)).group_by(Phase.project_id)):
+            shares[pid] = [a + (b or 0) for a, b in zip(shares[pid], values)]
+    return shares
+
+
+def _phase_ends(project_ids):
+    q = (select(Phase.project_id, func.max(Phase.end_date))
+         .where(Phase.project_id.in_(project_ids)).group_by(Phase.project_id))
+    return {pid: end for pid, end in db.session.execute(q)}
+
+
+def _compute(projects, workers, parallel_min_tasks):
+    ids = [p.id for p in projects]
+    jobs = []
+    for p in projects:
+        cal = calendar_for_project(p.id)
+        start = project_start_date(p.id)
+        jobs.append((load_project_graph(p.id), start.toordinal() if start else None,
+                     None if cal.calendar_days else cal.weekmask, cal.holidays))
+    runnable = [j for j in jobs if j[1] is not None]
+    used = 0
+    if workers > 1 and len(runnable) > 1 and sum(len(j[0]) for j in runnable) >= parallel_min_tasks:
+        used = min(workers, len(runnable))
+        done = iter(list(get_pool(workers).map(analyse_schedule, *zip(*runnable))))
+    else:
+        done = iter([analyse_schedule(*j) for j in runnable])
+    shares, phase_ends = _external_shares(ids), _phase_ends(ids)
+    out = {}
+    for p, job in zip(projects, jobs):
+        row = next(done) if job[1] is not None else analyse_schedule(job[0], None)
+        parts, ext, duration, ext_duration = shares[p.id]
+        phase_end = phase_ends.get(p.id)
+        if phase_end and 'error' not in row and (row['finish'] is None or phase_end.isoformat() > row['finish']):
+            row['finish'] = phase_end.isoformat()
+        row.update({
+            'project_id': p.id, 'title': p.title,
+            'external_share': round(ext / parts, 4) if parts else 0.0,
+            'external_duration_share': round(ext_duration / duration, 4) if duration else 0.0,
+            '_parts': parts, '_external': ext,
+        })
+        out[p.id] = row
+    return out, used
+
+
+def portfolio_report(workers=0, parallel_min_tasks=5000):
+    """Per-project analyses (cached by schedule_version) plus a merged portfolio summary."""
+    projects = db.session.execute(select(Project.id, Project.title, Project.schedule_version).order_by(Project.id)).all()
+    with _lock:
+        live = {p.id for p in projects}
+        for pid in [pid for pid in _cache if pid not in live]:
+            del _cache[pid]
+        cached = {p.id: _cache[p.id][1] for p in projects
+                  if p.id in _cache and _cache[p.id][0] == p.schedule_version}
+    stale = [p for p in projects if p.id not in cached]
+    fresh, used = _compute(stale, workers, parallel_min_tasks) if stale else ({}, 0)
+    with _lock:
+        for p in stale:
+            _cache[p.id] = (p.schedule_version, fresh[p.id])
+    rows = [dict(cached.get(p.id) or fresh[p.id]) for p in projects]
+    ok = [r for r in rows if 'error' not in r]
+    parts = sum(r['_parts'] for r in rows)
+    summary = {
+        'projects': len(rows),
+        'tasks': sum(r['tasks'] for r in rows),
+        'finish': max((r['finish'] for r in ok if r['finish']), default=None),
+        'critical_tasks': sum(r['critical_tasks'] for r in ok),
+        'total_float_days': sum(r['total_float_days'] for r in ok),
+        'external_share': round(sum(r['_external'] for r in rows) / parts, 4) if parts else 0.0,
+        'errors': len(rows) - len(ok),
+    }
+    for r in rows:
+        r.pop('_parts')
+        r.pop('_external')
+    return {'summary': summary, 'projects': rows,
+            'recomputed': len(stale), 'cached': len(cached), 'workers': used}
@@ -0,0 +1,42 @@
+"""Shared, lazily created process pool for CPU-bound analyses (portfolio, risk).
+
+Workers are started once per process with forkserver (spawn where unavailable), never
+forked from the threaded web process with its open database connections, and reused
+across requests. The pool is shut down at interpreter exit.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+_size = 0
+_lock = threading.Lock()
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_pool(workers):
+    """Pool with at least `workers` processes; a larger request replaces the pool."""
+    global _pool, _size
+    with _lock:
+        if _pool is None or _size < workers:
+            old = _pool
+            _pool, _size = ProcessPoolExecutor(max_workers=workers, mp_context=_context()), workers
+            if old is not None:
+                old.shutdown(wait=False)
+        return _pool
+
+
+def shutdown():
+    global _pool, _size
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _size = None, 0
+
+
+atexit.register(shutdown)
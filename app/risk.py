@@ -0,0 +1,157 @@
+"""Monte Carlo schedule risk: sample three-point durations, replay the forward/backward pass.
+
+Features and items may carry duration_optimistic / duration_pessimistic around their
+(most likely) duration; each simulation draws every duration from a triangular
+distribution and runs the same level-by-level passes as the auto-scheduler. With NumPy the
+simulations run as one (tasks x simulations) array per batch, so each dependency level is
+a single maximum.at/minimum.at call for every simulation at once. Batches can be spread
+across the shared process pool (RISK_WORKERS); without NumPy each simulation is a plain loop.
+
+Reported: P50/P80/P95 finish dates and, per task, how often it was critical (zero float).
+"""
+import math
+import random
+from datetime import date
+from app.process_pool import get_pool
+from app.scheduling import load_project_graph, prepare_passes, schedule, project_start_date
+from app.workcal import calendar_for_project
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+PERCENTILES = (50, 80, 95)
+# Upper bound on tasks x simulations held in memory per batch (~16 MB per float64 matrix)
+BATCH_CELLS = 2_000_000
+
+
+def _simulate_numpy(model, simulations, seed):
+    rng = np.random.default_rng(seed)
+    lo = np.asarray(model['optimistic'], dtype=np.float64)
+    mode = np.asarray(model['likely'], dtype=np.float64)
+    hi = np.asarray(model['pessimistic'], dtype=np.float64)
+    n = lo.size
+    dur = np.repeat(mode[:, None], simulations, axis=1)
+    varying = np.flatnonzero(hi > lo)
+    if varying.size:
+        dur[varying] = rng.triangular(lo[varying, None], mode[varying, None], hi[varying, None],
+                                      size=(varying.size, simulations))
+    pred = np.asarray(model['pred'], dtype=np.int64)
+    succ = np.asarray(model['succ'], dtype=np.int64)
+    pinned = np.asarray(model['pinned'], dtype=bool)
+    es = np.repeat(np.asarray(model['floor'], dtype=np.float64)[:, None], simulations, axis=1)
+    for edges in model['fwd']:
+        e = np.asarray(edges, dtype=np.int64)
+        e = e[~pinned[succ[e]]]
+        if e.size:
+            np.maximum.at(es, succ[e], es[pred[e]] + dur[pred[e]])
+    ef = es + dur
+    finish = ef.max(axis=0)
+    lf = np.repeat(finish[None, :], n, axis=0)
+    for edges in model['bwd']:
+        e = np.asarray(edges, dtype=np.int64)
+        np.minimum.at(lf, pred[e], lf[succ[e]] - dur[succ[e]])
+    critical = np.abs(lf - ef) < 1e-9
+    return finish.tolist(), critical.sum(axis=1).tolist()
+
+
+def _simulate_python(model, simulations, seed):
+    rng = random.Random(seed)
+    lo, mode, hi = model['optimistic'], model['likely'], model['pessimistic']
+    pred, succ, pinned = model['pred'], model['succ'], model['pinned']
+    n = len(lo)
+    finishes, counts = [], [0] * n
+    for _ in range(simulations):
+        dur = [rng.triangular(lo[v], hi[v], mode[v]) if hi[v] > lo[v] else mode[v] for v in range(n)]
+        es = list(model['floor'])
+        for edges in model['fwd']:
+            for e in edges:
+                p, s = pred[e], succ[e]
+                if not pinned[s] and es[p] + dur[p] > es[s]:
+                    es[s] = es[p] + dur[p]
+        ef = [es[v] + dur[v] for v in range(n)]
+        finish = max(ef)
+        lf = [finish] * n
+        for edges in model['bwd']:
+            for e in edges:
+                p, s = pred[e], succ[e]
+                if lf[s] - dur[s] < lf[p]:
+                    lf[p] = lf[s] - dur[s]
+        finishes.append(finish)
+        for v in range(n):
+            if abs(lf[v] - ef[v]) < 1e-9:
+                counts[v] += 1
+    return finishes, counts
+
+
+def simulate_batch(model, simulations, seed):
+    """One batch of simulations: (finish index per simulation, times-critical per task). Picklable."""
+    if np is not None:
+        return _simulate_numpy(model, simulations, seed)
+    return _simulate_python(model, simulations, seed)
+
+
+def _batches(total, n_tasks, workers):
+    size = max(1, min(total, BATCH_CELLS // max(1, n_tasks)))
+    if workers > 1:
+        size = min(size, math.ceil(total / workers))
+    out = []
+    while total > 0:
+        out.append(min(size, total))
+        total -= out[-1]
+    return out
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def analyse_project_risk(project_id, simulations=2000, seed=None, workers=0, start=None, honour_current_starts=True):
+    """Run the Monte Carlo analysis for a project (see module docstring)."""
+    graph = load_project_graph(project_id)
+    calendar = calendar_for_project(project_id)
+    start = start or project_start_date(project_id) or date.today()
+    if not len(graph):
+        return {'tasks': 0, 'simulations': 0, 'start': start.isoformat(), 'deterministic_finish': None,
+                **{f'p{p}': None for p in PERCENTILES}, 'criticality': [], 'uncertain_tasks': 0}
+    floor, fwd, bwd, depth = prepare_passes(graph, start.toordinal(), honour_current_starts, calendar)
+    model = {
+        'floor': floor, 'likely': graph.duration, 'optimistic': graph.optimistic, 'pessimistic': graph.pessimistic,
+        'pinned': graph.pinned, 'pred': graph.pred, 'succ': graph.succ,
+        'fwd': [fwd[lv] for lv in range(1, depth) if fwd.get(lv)],
+        'bwd': [bwd[lv] for lv in range(depth - 2, -1, -1) if bwd.get(lv)],
+    }
+    sizes = _batches(simulations, len(graph), workers)
+    if np is not None:
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(sizes))]
+    else:
+        base = seed if seed is not None else random.randrange(2 ** 32)
+        seeds = [base + i for i in range(len(sizes))]
+    if workers > 1 and len(sizes) > 1:
+        results = list(get_pool(workers).map(simulate_batch, [model] * len(sizes), sizes, seeds))
+    else:
+        results = [simulate_batch(model, size, s) for size, s in zip(sizes, seeds)]
+    finishes, counts = [], [0] * len(graph)
+    for batch_finishes, batch_counts in results:
+        finishes.extend(batch_finishes)
+        counts = [a + b for a, b in zip(counts, batch_counts)]
+    finishes.sort()
+
+    def to_date(index):
+        # Finish indices are exclusive ends; partial working days round up
+        return calendar.end_at(math.ceil(index - 1e-9) - 1, 1).isoformat()
+
+    deterministic = schedule(graph, start.toordinal(), honour_current_starts, calendar)['finish']
+    criticality = sorted(({'id': graph.sids[v], 'index': round(counts[v] / simulations, 4)}
+                          for v in range(len(graph)) if counts[v]), key=lambda c: (-c['index'], c['id']))
+    return {
+        'tasks': len(graph), 'simulations': simulations, 'batches': len(sizes),
+        'workers': workers if workers > 1 and len(sizes) > 1 else 0,
+        'engine': 'numpy' if np is not None else 'python', 'start': start.isoformat(),
+        'uncertain_tasks': sum(1 for o, p in zip(graph.optimistic, graph.pessimistic) if p > o),
+        'deterministic_finish': to_date(deterministic),
+        **{f'p{p}': to_date(_percentile(finishes, p)) for p in PERCENTILES},
+        'criticality': criticality,
+    }
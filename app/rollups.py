@@ -0,0 +1,76 @@
+"""Materialised roll-ups on Feature (over its items) and Phase (over its features and items).
+
+rollup_start / rollup_end   envelope of the children (end exclusive, like end_date)
+rollup_children             direct children (items of a feature, features of a phase)
+rollup_milestones           milestones anywhere below
+
+The ORM after_flush hook (models.py) refreshes only the parents of the parts that changed:
+each refresh is one UPDATE with correlated aggregates over that parent's direct children
+(indexed by feature_id / phase_id), and a phase aggregates its features' own dates plus
+their roll-ups rather than rescanning items. Bulk Core writers call refresh_project_rollups.
+"""
+from sqlalchemy import select, update, func, case
+from app.models import db, Phase, Feature, Item
+
+
+def _feature_values():
+    def agg(expr, *extra):
+        return select(expr).where(Item.feature_id == Feature.id, *extra).scalar_subquery()
+    return {
+        'rollup_start': agg(func.min(Item.start_date)),
+        'rollup_end': agg(func.max(Item.end_date)),
+        'rollup_children': agg(func.count(Item.id)),
+        'rollup_milestones': agg(func.count(Item.id), Item.is_milestone.is_(True)),
+    }
+
+
+def _phase_values():
+    def agg(expr):
+        return select(expr).where(Feature.phase_id == Phase.id).scalar_subquery()
+    # Per feature: its own dates widened by its items' envelope (NULL roll-ups compare false)
+    start = case((Feature.rollup_start < Feature.start_date, Feature.rollup_start), else_=Feature.start_date)
+    end = case((Feature.rollup_end > Feature.end_date, Feature.rollup_end), else_=Feature.end_date)
+    milestones = case((Feature.is_milestone.is_(True), 1), else_=0) + func.coalesce(Feature.rollup_milestones, 0)
+    return {
+        'rollup_start': agg(func.min(start)),
+        'rollup_end': agg(func.max(end)),
+        'rollup_children': agg(func.count(Feature.id)),
+        'rollup_milestones': agg(func.coalesce(func.sum(milestones), 0)),
+    }
+
+
+def refresh_rollups(feature_ids=(), phase_ids=(), bind=None):
+    """Recompute the given features, then the given phases plus the phases of those features."""
+    bind = bind if bind is not None else db.session
+    feature_ids = {i for i in feature_ids if i}
+    phase_ids = {i for i in phase_ids if i}
+    if feature_ids:
+        bind.execute(update(Feature).where(Feature.id.in_(feature_ids)).values(**_feature_values()))
+        phase_ids.update(bind.execute(select(Feature.phase_id).where(Feature.id.in_(feature_ids))).scalars())
+    if phase_ids:
+        bind.execute(update(Phase).where(Phase.id.in_(phase_ids)).values(**_phase_values()))
+
+
+def refresh_project_rollups(project_id, bind=None):
+    bind = bind if bind is not None else db.session
+    phase_ids = bind.execute(select(Phase.id).where(Phase.project_id == project_id)).scalars().all()
+    feature_ids = bind.execute(select(Feature.id).where(Feature.phase_id.in_(phase_ids))).scalars().all() if phase_ids else []
+    refresh_rollups(feature_ids, phase_ids, bind)
+
+
+def rollup_summary(obj):
+    """Roll-up fields for JSON payloads, or None when the part has no children."""
+    if not getattr(obj, 'rollup_children', 0):
+        return None
+    return {'start': obj.rollup_start.isoformat() if obj.rollup_start else None,
+            'end': obj.rollup_end.isoformat() if obj.rollup_end else None,
+            'children': obj.rollup_children, 'milestones': obj.rollup_milestones}
+
+
+def rollup_drift(obj):
+    """True when the children's envelope sticks out of the part's own start/end."""
+    if not getattr(obj, 'rollup_children', 0) or not obj.start_date:
+        return False
+    end = obj.end_date
+    return bool((obj.rollup_start and obj.rollup_start < obj.start_date) or
+                (obj.rollup_end and end and obj.rollup_end > end))
@@ -0,0 +1,236 @@
+"""Whole-project auto-scheduler: forward/backward pass over the feature/item dependency DAG.
+
+The project is loaded into flat arrays (day ordinals, durations, edge lists) and processed
+one topological level at a time. Every edge into a level is relaxed in one batched
+operation (NumPy `maximum.at`/`minimum.at` when installed, plain loops otherwise), which
+keeps 100k-task programmes to a handful of array passes. Changed rows are written back
+with a single bulk UPDATE.
+
+Dependencies use the same numeric-ID matching as compute_critical_path: `feature-3`, `item-3`
+and `3` all refer to every feature/item whose id is 3. Milestones are pinned to their
+current start; a predecessor finishing after a milestone is reported as a conflict.
+
+The passes run in the project's working-day index space (app.workcal), so durations skip
+weekends, holidays and shutdowns when the project has a working calendar.
+"""
+from collections import defaultdict
+from datetime import date
+from sqlalchemy import update
+from app.models import db, bump_schedule_version, Phase, Feature, Item
+from app.workcal import calendar_for_project, CALENDAR_DAYS
+from app.rollups import refresh_project_rollups
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class ScheduleCycleError(ValueError):
+    def __init__(self, sids):
+        super().__init__('dependency cycle involving ' + ', '.join(sids[:10]))
+        self.sids = sids
+
+
+class ProjectGraph:
+    """Compact array form of a project's schedulable parts."""
+    __slots__ = ('sids', 'ids', 'kinds', 'start', 'duration', 'optimistic', 'pessimistic', 'pinned', 'pred', 'succ')
+
+    def __init__(self):
+        self.sids, self.ids, self.kinds = [], [], []
+        self.start, self.duration, self.pinned = [], [], []
+        self.optimistic, self.pessimistic = [], []   # three-point bounds, defaulting to duration
+        self.pred, self.succ = [], []   # edge e: pred[e] must finish before succ[e] starts
+
+    def __len__(self):
+        return len(self.sids)
+
+
+def load_project_graph(project_id):
+    """Select only the scheduling columns of the project's features and items."""
+    # Local import: the planning blueprint imports this module
+    from app.blueprints.planning import _parse_dep_ids
+    g = ProjectGraph()
+    deps_raw = []
+    queries = (
+        ('feature', db.session.query(Feature.id, Feature.start_date, Feature.duration, Feature.is_milestone, Feature.dependencies,
+                                     Feature.duration_optimistic, Feature.duration_pessimistic)
+         .join(Phase, Feature.phase_id == Phase.id).filter(Phase.project_id == project_id)),
+        ('item', db.session.query(Item.id, Item.start_date, Item.duration, Item.is_milestone, Item.dependencies,
+                                  Item.duration_optimistic, Item.duration_pessimistic)
+         .join(Feature, Item.feature_id == Feature.id).join(Phase, Feature.phase_id == Phase.id)
+         .filter(Phase.project_id == project_id)),
+    )
+    for kind, q in queries:
+        for pid, start, duration, milestone, deps, optimistic, pessimistic in q:
+            likely = max(0, duration or 0)
+            g.sids.append(f'{kind}-{pid}')
+            g.ids.append(pid)
+            g.kinds.append(kind)
+            g.start.append(start.toordinal() if start else None)
+            g.duration.append(likely)
+            g.optimistic.append(min(likely, max(0, optimistic)) if optimistic is not None else likely)
+            g.pessimistic.append(max(likely, pessimistic) if pessimistic is not None else likely)
+            g.pinned.append(bool(milestone))
+            deps_raw.append(deps)
+    by_numeric = defaultdict(list)
+    for idx, pid in enumerate(g.ids):
+        by_numeric[pid].append(idx)
+    for idx, raw in enumerate(deps_raw):
+        for dep in set(_parse_dep_ids(raw or '')):
+            for p in by_numeric.get(dep, ()):
+                if p != idx:
+                    g.pred.append(p)
+                    g.succ.append(idx)
+    return g
+
+
+def topological_levels(n, pred, succ):
+    """Kahn's algorithm grouped by depth. Returns (level per node, nodes per level, nodes left on cycles)."""
+    indeg = [0] * n
+    out = [[] for _ in range(n)]
+    for p, s in zip(pred, succ):
+        indeg[s] += 1
+        out[p].append(s)
+    level = [0] * n
+    frontier = [v for v in range(n) if indeg[v] == 0]
+    levels, seen = [], 0
+    while frontier:
+        levels.append(frontier)
+        seen += len(frontier)
+        nxt = []
+        for v in frontier:
+            for s in out[v]:
+                indeg[s] -= 1
+                if indeg[s] == 0:
+                    level[s] = len(levels)
+                    nxt.append(s)
+        frontier = nxt
+    return level, levels, [v for v in range(n) if indeg[v] > 0] if seen < n else []
+
+
+def _edges_by_level(level, pred, succ, key):
+    """Group edge indices by the level of their succ (forward) or pred (backward) endpoint."""
+    groups = defaultdict(list)
+    for e in range(len(pred)):
+        groups[level[succ[e]] if key == 'succ' else level[pred[e]]].append(e)
+    return groups
+
+
+def prepare_passes(graph, project_start, honour_current_starts=True, calendar=CALENDAR_DAYS):
+    """Shared set-up for the passes: (floor index per node, forward edge groups, backward edge groups, depth).
+
+    project_start and graph.start are day ordinals; floors are calendar indices (for the
+    calendar-days calendar these are ordinals again).
+    """
+    n = len(graph)
+    level, levels, cyclic = topological_levels(n, graph.pred, graph.succ)
+    if cyclic:
+        raise ScheduleCycleError([graph.sids[v] for v in cyclic])
+    project_start = calendar.index_ordinal(project_start)
+    starts = iter(calendar.indices([o for o in graph.start if o is not None]))
+    floor = [project_start] * n
+    for v in range(n):
+        cur = next(starts) if graph.start[v] is not None else None
+        if graph.pinned[v] and cur is not None:
+            floor[v] = cur
+        elif honour_current_starts and cur is not None and cur > project_start:
+            floor[v] = cur
+    fwd = _edges_by_level(level, graph.pred, graph.succ, 'succ')
+    bwd = _edges_by_level(level, graph.pred, graph.succ, 'pred')
+    return floor, fwd, bwd, len(levels)
+
+
+def schedule(graph, project_start, honour_current_starts=True, calendar=CALENDAR_DAYS):
+    """Forward and backward pass. Returns dict of working-day index lists: es, ef, ls, lf plus finish."""
+    n = len(graph)
+    floor, fwd, bwd, depth = prepare_passes(graph, project_start, honour_current_starts, calendar)
+    project_start = calendar.index_ordinal(project_start)
+    if np is not None and n:
+        dur = np.asarray(graph.duration, dtype=np.int64)
+        pred = np.asarray(graph.pred, dtype=np.int64)
+        succ = np.asarray(graph.succ, dtype=np.int64)
+        es = np.asarray(floor, dtype=np.int64)
+        # Edges into milestones are skipped: they stay put even when a predecessor runs late
+        free = ~np.asarray(graph.pinned, dtype=bool)[succ] if succ.size else np.zeros(0, dtype=bool)
+        for lv in range(1, depth):
+            e = np.asarray(fwd.get(lv, ()), dtype=np.int64)
+            if e.size:
+                e = e[free[e]]
+                np.maximum.at(es, succ[e], es[pred[e]] + dur[pred[e]])
+        ef = es + dur
+        finish = int(ef.max())
+        lf = np.full(n, finish, dtype=np.int64)
+        for lv in range(depth - 2, -1, -1):
+            e = np.asarray(bwd.get(lv, ()), dtype=np.int64)
+            if e.size:
+                np.minimum.at(lf, pred[e], lf[succ[e]] - dur[succ[e]])
+        ls = lf - dur
+        return {'es': es.tolist(), 'ef': ef.tolist(), 'ls': ls.tolist(), 'lf': lf.tolist(), 'finish': finish}
+    es = list(floor)
+    dur = graph.duration
+    for lv in range(1, depth):
+        for e in fwd.get(lv, ()):
+            p, s = graph.pred[e], graph.succ[e]
+            if not graph.pinned[s] and es[p] + dur[p] > es[s]:
+                es[s] = es[p] + dur[p]
+    ef = [es[v] + dur[v] for v in range(n)]
+    finish = max(ef) if ef else project_start
+    lf = [finish] * n
+    for lv in range(depth - 2, -1, -1):
+        for e in bwd.get(lv, ()):
+            p, s = graph.pred[e], graph.succ[e]
+            if lf[s] - dur[s] < lf[p]:
+                lf[p] = lf[s] - dur[s]
+    ls = [lf[v] - dur[v] for v in range(n)]
+    return {'es': es, 'ef': ef, 'ls': ls, 'lf': lf, 'finish': finish}
+
+
+def project_start_date(project_id):
+    return db.session.query(db.func.min(Phase.start_date)).filter(Phase.project_id == project_id).scalar()
+
+
+def auto_schedule_project(project_id, start=None, honour_current_starts=True, dry_run=False):
+    """Re-plan a project's features/items from their dependencies and write back changed starts.
+
+    start: project start date (default: earliest phase start, else today).
+    honour_current_starts: never move a task earlier than its current start; when False
+    unconstrained tasks move to the project start (pure ASAP plan).
+    """
+    graph = load_project_graph(project_id)
+    calendar = calendar_for_project(project_id)
+    start = start or project_start_date(project_id) or date.today()
+    result = schedule(graph, start.toordinal(), honour_current_starts, calendar)
+    es, ls = result['es'], result['ls']
+    changes = {'feature': [], 'item': []}
+    tasks = []
+    finish = None
+    for v in range(len(graph)):
+        end = calendar.end_at(es[v], graph.duration[v])
+        finish = end if finish is None or end > finish else finish
+        if graph.pinned[v] and graph.start[v] is not None:
+            continue  # milestones keep their date, even on a non-working day
+        new_start = calendar.day_at(es[v])
+        if graph.start[v] == new_start.toordinal():
+            continue
+        changes[graph.kinds[v]].append({'id': graph.ids[v], 'start_date': new_start, 'end_date': end})
+        tasks.append({'id': graph.sids[v], 'start': new_start.isoformat(),
+                      'end': end.isoformat(), 'duration': graph.duration[v]})
+    conflicts = [{'milestone': graph.sids[s], 'blocked_by': graph.sids[p]}
+                 for p, s in zip(graph.pred, graph.succ)
+                 if graph.pinned[s] and es[p] + graph.duration[p] > es[s]]
+    if not dry_run:
+        for kind, model in (('feature', Feature), ('item', Item)):
+            if changes[kind]:
+                # Bulk UPDATE by primary key; end_date set explicitly as the ORM hooks do not run
+                db.session.execute(update(model), changes[kind])
+        if tasks:
+            bump_schedule_version([project_id])
+            refresh_project_rollups(project_id)
+        db.session.commit()
+    critical = [graph.sids[v] for v in sorted(range(len(graph)), key=lambda v: (es[v], v)) if ls[v] == es[v]]
+    return {
+        'tasks': len(graph), 'changed': len(tasks), 'updates': tasks, 'dry_run': dry_run,
+        'start': start.isoformat(), 'finish': finish.isoformat() if finish else None,
+        'critical': critical, 'conflicts': conflicts, 'engine': 'numpy' if np is not None else 'python',
+    }
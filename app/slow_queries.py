@@ -0,0 +1,94 @@
+"""Slow-query log: statements over SLOW_QUERY_MS are logged with the issuing route and (on
+SQLite) their EXPLAIN QUERY PLAN, and kept in a bounded in-process ring buffer shown at
+/admin/slow_queries.
+
+Bound parameters can hold password hashes, throttle keys and other user data, so only
+their count is recorded unless SLOW_QUERY_LOG_PARAMS is enabled.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import request, has_request_context
+from sqlalchemy import event
+
+logger = logging.getLogger('app.slow_queries')
+
+_lock = threading.Lock()
+_entries = deque(maxlen=200)
+_PARAM_REPR_LIMIT = 500
+
+
+def recent(limit=None):
+    """Newest-first copy of the captured slow queries."""
+    with _lock:
+        items = list(reversed(_entries))
+    return items[:limit] if limit else items
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def _format_params(parameters, log_params):
+    if log_params:
+        return repr(parameters)[:_PARAM_REPR_LIMIT]
+    if not parameters:
+        return '<none>'
+    count = len(parameters) if isinstance(parameters, (list, tuple, dict)) else 1
+    return f'<{count} redacted>'
+
+
+def _explain(conn, statement, parameters):
+    """EXPLAIN QUERY PLAN via a raw DB-API cursor so the lookup itself is not re-instrumented."""
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+            return [row[-1] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except Exception as exc:  # plan capture must never break the request
+        return [f'<plan unavailable: {exc}>']
+
+
+def init_slow_query_log(app, engine):
+    global _entries
+    threshold_ms = app.config.get('SLOW_QUERY_MS') or 0
+    if threshold_ms <= 0:
+        return
+    with _lock:
+        _entries = deque(_entries, maxlen=max(1, app.config.get('SLOW_QUERY_LOG_SIZE', 200)))
+    threshold = threshold_ms / 1000.0
+    explain = engine.dialect.name == 'sqlite' and app.config.get('SLOW_QUERY_EXPLAIN', True)
+    log_params = app.config.get('SLOW_QUERY_LOG_PARAMS', False)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_slow_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get('_slow_query_start')
+        if not stack:
+            return
+        elapsed = time.perf_counter() - stack.pop()
+        if elapsed < threshold:
+            return
+        route = None
+        if has_request_context():
+            route = f'{request.method} {request.path} ({request.endpoint or "unmatched"})'
+        entry = {
+            'at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'ms': round(elapsed * 1000, 2),
+            'statement': statement,
+            'parameters': _format_params(parameters, log_params),
+            'route': route,
+            'plan': _explain(conn, statement, parameters) if explain and not executemany else [],
+        }
+        with _lock:
+            _entries.append(entry)
+        logger.warning('Slow query %.1f ms [%s]: %s | params=%s | plan=%s',
+                       entry['ms'], route or 'no request', statement, entry['parameters'], '; '.join(entry['plan']))
@@ -0,0 +1,120 @@
+"""Synthetic planning data for load tests and benchmarks.
+
+Generates projects with a realistic Phase -> Feature -> Item shape, random dependency DAGs
+and image links using bulk inserts, so 100k-part projects seed in seconds. Dependencies only
+point at lower IDs of the same kind, which keeps the graph acyclic under the numeric ID
+matching used by compute_critical_path. Image rows are created without files on disk.
+"""
+import random
+from datetime import date, timedelta
+from sqlalchemy import func, insert
+from werkzeug.security import generate_password_hash
+from app.models import db, part_end_date, User, Project, Phase, Feature, Item, Image, image_phase, image_feature, image_item
+from app.rollups import refresh_project_rollups
+
+# Share of parts at each level; items take the remainder
+PHASE_SHARE = 0.02
+FEATURE_SHARE = 0.18
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _owner_id(owner):
+    if owner:
+        user = User.query.filter_by(username=owner).first()
+        if user:
+            return user.id
+    user = User.query.filter_by(username='synthetic').first()
+    if not user:
+        user = User(username='synthetic', password_hash=generate_password_hash('synthetic'))
+        db.session.add(user)
+        db.session.flush()
+    return user.id
+
+
+def _deps(rng, earlier, max_deps, prefix, density):
+    if not earlier or rng.random() > density:
+        return None
+    picks = rng.sample(earlier[-50:], min(len(earlier[-50:]), rng.randint(1, max_deps)))
+    return ','.join(f'{prefix}-{p}' for p in sorted(picks))
+
+
+def seed_synthetic(parts=100, projects=1, seed=None, owner=None, image_ratio=0.05,
+                   max_deps=3, dep_density=0.6, start=date(2025, 1, 6)):
+    """Create `projects` projects of roughly `parts` parts each. Returns a summary dict."""
+    rng = random.Random(seed)
+    owner_id = _owner_id(owner)
+    n_phases = max(1, round(parts * PHASE_SHARE))
+    n_features = max(1, round(parts * FEATURE_SHARE))
+    n_items = max(0, parts - n_phases - n_features)
+    n_images = round(parts * image_ratio)
+    next_phase, next_feature, next_item, next_image = (_next_id(m) for m in (Phase, Feature, Item, Image))
+    summary = {'projects': [], 'phases': 0, 'features': 0, 'items': 0, 'images': 0, 'links': 0}
+    for p in range(projects):
+        proj = Project(title=f'Synthetic {parts} #{p + 1}', owner_id=owner_id)
+        db.session.add(proj)
+        db.session.flush()
+        project_id = proj.id
+        phase_rows, feature_rows, item_rows = [], [], []
+        cursor = start
+        for i in range(n_phases):
+            duration = rng.randint(10, 40)
+            phase_rows.append({'id': next_phase, 'title': f'Phase {i + 1}', 'start_date': cursor, 'duration': duration,
+                               'is_milestone': False, 'internal_external': 'internal', 'project_id': project_id, 'sort_order': i})
+            next_phase += 1
+            cursor += timedelta(days=duration)
+        feature_ids = []
+        for i in range(n_features):
+            ph = phase_rows[i * n_phases // n_features]
+            feature_rows.append({'id': next_feature, 'title': f'Feature {i + 1}',
+                                 'start_date': ph['start_date'] + timedelta(days=rng.randint(0, max(0, ph['duration'] - 1))),
+                                 'duration': rng.randint(1, 10), 'is_milestone': rng.random() < 0.03,
+                                 'internal_external': 'external' if rng.random() < 0.2 else 'internal',
+                                 'dependencies': _deps(rng, feature_ids, max_deps, 'feature', dep_density),
+                                 'phase_id': ph['id'], 'sort_order': i})
+            feature_ids.append(next_feature)
+            next_feature += 1
+        item_ids = []
+        for i in range(n_items):
+            ft = feature_rows[i * n_features // n_items]
+            item_rows.append({'id': next_item, 'title': f'Item {i + 1}',
+                              'start_date': ft['start_date'] + timedelta(days=rng.randint(0, 5)),
+                              'duration': rng.randint(1, 5), 'is_milestone': rng.random() < 0.02,
+                              'internal_external': 'external' if rng.random() < 0.2 else 'internal',
+                              'dependencies': _deps(rng, item_ids, max_deps, 'item', dep_density),
+                              'feature_id': ft['id'], 'sort_order': i})
+            item_ids.append(next_item)
+            next_item += 1
+        for model, rows in ((Phase, phase_rows), (Feature, feature_rows), (Item, item_rows)):
+            for r in rows:  # Core inserts skip the ORM hook that maintains end_date
+                r['end_date'] = part_end_date(r['start_date'], r['duration'])
+            if rows:
+                db.session.execute(insert(model), rows)
+        image_rows, links = [], {image_phase: [], image_feature: [], image_item: []}
+        targets = ((image_phase, 'phase_id', [r['id'] for r in phase_rows]),
+                   (image_feature, 'feature_id', feature_ids),
+                   (image_item, 'item_id', item_ids))
+        for i in range(n_images):
+            image_rows.append({'id': next_image, 'filename': f'synthetic-{project_id}-{i + 1}.png', 'project_id': project_id})
+            for _ in range(rng.randint(1, 3)):
+                table, col, pool = rng.choice(targets)
+                if pool:
+                    links[table].append({'image_id': next_image, col: rng.choice(pool)})
+            next_image += 1
+        if image_rows:
+            db.session.execute(insert(Image), image_rows)
+        for table, rows in links.items():
+            unique = list({tuple(sorted(r.items())): r for r in rows}.values())
+            if unique:
+                db.session.execute(insert(table), unique)
+                summary['links'] += len(unique)
+        refresh_project_rollups(project_id)
+        db.session.commit()
+        summary['projects'].append(project_id)
+        summary['phases'] += len(phase_rows)
+        summary['features'] += len(feature_rows)
+        summary['items'] += len(item_rows)
+        summary['images'] += len(image_rows)
+    return summary
@@ -0,0 +1,127 @@
+"""Server-side login throttling.
+
+Each attempt spends a token from two buckets stored in the login_throttle table, so the
+limits hold across worker processes and cannot be reset by dropping the session cookie:
+
+- pair:<username>|<address>  small bucket; repeated failures add exponential backoff
+- addr:<address>             larger, faster-refilling bucket that caps username spraying
+
+Callers check `acquire()` *before* verifying the password, so rejected attempts never
+reach the (deliberately slow) password hash.
+"""
+import math
+import time
+from flask import current_app
+from sqlalchemy import select, update, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from app.models import db, LoginThrottle
+
+
+def _buckets(username, addr):
+    cfg = current_app.config
+    addr = addr or 'unknown'
+    return [
+        (f'pair:{(username or "").lower()}|{addr}', cfg['LOGIN_THROTTLE_USER_CAPACITY'], cfg['LOGIN_THROTTLE_USER_REFILL_SECONDS']),
+        (f'addr:{addr}', cfg['LOGIN_THROTTLE_ADDR_CAPACITY'], cfg['LOGIN_THROTTLE_ADDR_REFILL_SECONDS']),
+    ]
+
+
+def _prune(now):
+    retention = current_app.config['LOGIN_THROTTLE_RETENTION_SECONDS']
+    (LoginThrottle.query
+     .filter(LoginThrottle.updated_at < now - retention, LoginThrottle.locked_until < now)
+     .delete(synchronize_session=False))
+
+
+def _ensure(buckets, now):
+    """Create missing bucket rows (full) with an upsert, so concurrent creators cannot collide."""
+    table = LoginThrottle.__table__
+    dialect = db.session.get_bind().dialect.name
+    created = 0
+    for key, capacity, _ in buckets:
+        values = dict(key=key, tokens=float(capacity), failures=0, locked_until=0.0, updated_at=now)
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+            created += db.session.execute(insert(table).values(**values).on_conflict_do_nothing(index_elements=['key'])).rowcount
+        elif not db.session.execute(select(table.c.id).where(table.c.key == key)).first():
+            try:
+                with db.session.begin_nested():  # only this insert is undone if another worker won
+                    db.session.execute(table.insert().values(**values))
+                created += 1
+            except IntegrityError:
+                pass
+    if created:
+        _prune(now)
+    db.session.commit()
+
+
+def _refilled(capacity, refill, now):
+    """SQL expression for the bucket's tokens after refilling up to now."""
+    col = LoginThrottle.__table__.c
+    elapsed = case((col.updated_at < now, now - col.updated_at), else_=0.0)
+    tokens = col.tokens + elapsed / refill
+    return case((tokens > capacity, float(capacity)), else_=tokens)
+
+
+def acquire(username, addr, now=None):
+    """Spend one token per bucket. Returns 0 when the attempt may proceed, else seconds to wait.
+
+    Each bucket is spent with one conditional UPDATE (refill, check and decrement in the
+    database), so parallel attempts from several workers cannot all pass on the same tokens.
+    """
+    now = time.time() if now is None else now
+    buckets = _buckets(username, addr)
+    _ensure(buckets, now)
+    table = LoginThrottle.__table__
+    spent = True
+    for key, capacity, refill in buckets:
+        tokens = _refilled(capacity, refill, now)
+        result = db.session.execute(
+            update(table)
+            .where(table.c.key == key, table.c.locked_until <= now, tokens >= 1)
+            .values(tokens=tokens - 1, updated_at=now))
+        if result.rowcount != 1:
+            spent = False
+            break
+    if spent:
+        db.session.commit()
+        return 0
+    db.session.rollback()  # neither bucket is charged for a rejected attempt
+    wait = 0.0
+    for key, capacity, refill in buckets:
+        row = db.session.execute(select(_refilled(capacity, refill, now), table.c.locked_until)
+                                 .where(table.c.key == key)).first()
+        if row is None:
+            continue
+        tokens, locked_until = row
+        if locked_until > now:
+            wait = max(wait, locked_until - now)
+        elif tokens < 1:
+            wait = max(wait, (1 - tokens) * refill)
+    return max(1, int(math.ceil(wait)))
+
+
+def record_failure(username, addr, now=None):
+    """Count a failed password check; past the threshold the pair is locked with doubling delays."""
+    now = time.time() if now is None else now
+    cfg = current_app.config
+    bucket = _buckets(username, addr)[0]
+    _ensure([bucket], now)
+    table = LoginThrottle.__table__
+    db.session.execute(update(table).where(table.c.key == bucket[0]).values(failures=table.c.failures + 1))
+    failures = db.session.execute(select(table.c.failures).where(table.c.key == bucket[0])).scalar() or 0
+    over = failures - cfg['LOGIN_THROTTLE_BACKOFF_AFTER']
+    if over >= 0:
+        delay = min(cfg['LOGIN_THROTTLE_BACKOFF_MAX_SECONDS'], cfg['LOGIN_THROTTLE_BACKOFF_BASE_SECONDS'] * (2 ** min(over, 32)))
+        db.session.execute(update(table).where(table.c.key == bucket[0], table.c.locked_until < now + delay)
+                           .values(locked_until=now + delay))
+    db.session.commit()
+
+
+def record_success(username, addr):
+    """Clear the user+address bucket after a successful sign-in."""
+    key = _buckets(username, addr)[0][0]
+    LoginThrottle.query.filter_by(key=key).delete(synchronize_session=False)
+    db.session.commit()
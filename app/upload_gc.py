@@ -0,0 +1,111 @@
+"""Upload folder <-> Image table reconciliation.
+
+Walks the upload directory with os.scandir (streaming, one entry at a time) and diffs it
+against a set index of Image.filename values. Reports orphaned blobs (files without a row)
+and dangling rows (rows whose file is gone); optionally reclaims both in batches.
+"""
+import os
+import time
+from app.models import db, Image
+
+DEFAULT_BATCH_SIZE = 500
+# Files younger than this may belong to an upload whose row is not committed yet
+DEFAULT_MIN_AGE_SECONDS = 300
+# Cap on sample names kept in the report; counts are always exact
+REPORT_SAMPLE_LIMIT = 100
+
+
+def _filename_index(batch_size):
+    """Set of filenames referenced by Image rows, streamed from the DB in batches."""
+    index = set()
+    rows = db.session.query(Image.filename).execution_options(yield_per=batch_size)
+    for (filename,) in rows:
+        index.add(filename)
+    return index
+
+
+def _iter_upload_files(folder):
+    """Yield (name, path, mtime) for regular, non-hidden files directly inside folder."""
+    if not os.path.isdir(folder):
+        return
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                mtime = entry.stat(follow_symlinks=False).st_mtime
+            except OSError:
+                continue
+            yield entry.name, entry.path, mtime
+
+
+def _remove_files(paths):
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _remove_dangling_rows(filenames, batch_size):
+    removed = 0
+    names = sorted(filenames)
+    for i in range(0, len(names), batch_size):
+        chunk = names[i:i + batch_size]
+        for img in Image.query.filter(Image.filename.in_(chunk)).all():
+            # Deleting through the session also clears the image_phase/feature/item link rows
+            db.session.delete(img)
+            removed += 1
+        db.session.commit()
+    return removed
+
+
+def scan_uploads(folder, reclaim=False, batch_size=DEFAULT_BATCH_SIZE, min_age_seconds=DEFAULT_MIN_AGE_SECONDS):
+    """Diff folder against Image rows; with reclaim=True delete orphans and dangling rows.
+
+    Must run inside an app context. Returns a JSON-ready report dict.
+    """
+    batch_size = max(1, int(batch_size))
+    expected = _filename_index(batch_size)
+    unseen = set(expected)
+    cutoff = time.time() - max(0, min_age_seconds)
+    report = {
+        'folder': folder, 'reclaim': bool(reclaim),
+        'scanned_files': 0, 'referenced_rows': len(expected),
+        'orphan_count': 0, 'orphan_sample': [], 'skipped_recent': 0,
+        'dangling_count': 0, 'dangling_sample': [],
+        'reclaimed_files': 0, 'removed_rows': 0,
+    }
+    if not os.path.isdir(folder):
+        # Never treat a missing/misconfigured folder as "every row is dangling"
+        report['error'] = 'upload folder not found'
+        return report
+    pending = []
+    for name, path, mtime in _iter_upload_files(folder):
+        report['scanned_files'] += 1
+        if name in expected:
+            unseen.discard(name)
+            continue
+        if mtime > cutoff:
+            report['skipped_recent'] += 1
+            continue
+        report['orphan_count'] += 1
+        if len(report['orphan_sample']) < REPORT_SAMPLE_LIMIT:
+            report['orphan_sample'].append(name)
+        if reclaim:
+            pending.append(path)
+            if len(pending) >= batch_size:
+                report['reclaimed_files'] += _remove_files(pending)
+                pending = []
+    if pending:
+        report['reclaimed_files'] += _remove_files(pending)
+    report['dangling_count'] = len(unseen)
+    report['dangling_sample'] = sorted(unseen)[:REPORT_SAMPLE_LIMIT]
+    if reclaim and unseen:
+        report['removed_rows'] = _remove_dangling_rows(unseen, batch_size)
+    return report
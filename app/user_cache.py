@@ -0,0 +1,38 @@
+"""Short-TTL identity cache for the Flask-Login user_loader.
+
+Flask-Login already memoises current_user for the duration of a request; this cache lets
+the *next* requests (presence polls, drag updates) skip the User lookup entirely. Only a
+column snapshot is cached; each hit is re-attached to the request's session without a
+query, so lazy relationships and writes (e.g. change_password) behave as usual.
+"""
+from sqlalchemy.orm import make_transient_to_detached
+from app.cache import TTLCache
+from app.models import db, User
+
+_cache = TTLCache(ttl_seconds=30, maxsize=1024)
+_COLUMNS = tuple(c.key for c in User.__table__.columns)
+
+
+def init_user_cache(app):
+    _cache.ttl_seconds = app.config.get('USER_CACHE_TTL_SECONDS', 30)
+    _cache.maxsize = app.config.get('USER_CACHE_MAXSIZE', 1024)
+    _cache.clear()
+
+
+def load_cached_user(user_id):
+    snapshot = _cache.get(user_id) if _cache.ttl_seconds > 0 else None
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        if _cache.ttl_seconds > 0:
+            _cache.set(user_id, {k: getattr(user, k) for k in _COLUMNS})
+        return user
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def invalidate_user(user_id):
+    """Drop a cached identity after its password, role or existence changes."""
+    _cache.pop(user_id)
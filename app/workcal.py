@@ -0,0 +1,248 @@
+"""Per-project working calendars (weekends, holidays, shutdown periods).
+
+A project without a workweek keeps the original behaviour: durations are calendar days.
+With a workweek, durations count working days. Each distinct calendar compiles
+business-day offset arrays (numpy busday-style) for a window of dates around those in use:
+
+    cum[i]  = working days in [HORIZON_START, lo + i)
+    days[j] = ordinal of the j-th working day in the window
+
+so "roll forward to a working day", "add N working days" and "count working days between"
+are single lookups, and numpy (when installed) does them for a whole project at once.
+
+Scheduling code works in working-day *index* space (index(day) -> k, day_at(k) -> date);
+for the calendar-days calendar the index is simply the date ordinal.
+"""
+import threading
+from bisect import bisect_left
+from datetime import date, timedelta
+from functools import lru_cache
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+HORIZON_START = date(1970, 1, 1)
+HORIZON_END = date(2199, 12, 31)
+# Offsets are compiled this many days either side of the dates in use
+WINDOW_PAD_DAYS = 730
+ALL_DAYS = '1111111'
+DEFAULT_WORKWEEK = '1111100'
+_DAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def parse_weekmask(raw):
+    """'1111100' or day names ('Mon Tue Wed Thu Fri') -> 7-char mask, Monday first."""
+    raw = (raw or '').strip()
+    if len(raw) == 7 and set(raw) <= {'0', '1'}:
+        mask = raw
+    else:
+        names = {tok[:3].lower() for tok in raw.replace(',', ' ').split()}
+        unknown = names - set(_DAY_NAMES)
+        if unknown or not names:
+            raise ValueError(f'invalid workweek {raw!r} (use e.g. 1111100 or "Mon Tue Wed Thu Fri")')
+        mask = ''.join('1' if d in names else '0' for d in _DAY_NAMES)
+    if '1' not in mask:
+        raise ValueError('workweek needs at least one working day')
+    return mask
+
+
+class WorkCalendar:
+    """Compiled working calendar; build through get_calendar() so instances are shared.
+
+    Offsets are only materialised for a window of dates around what has been asked for
+    (WINDOW_PAD_DAYS either side), and the window grows on demand. Indices stay absolute
+    (counted from HORIZON_START, computed arithmetically for the part before the window),
+    so growing the window never renumbers working days another caller already holds.
+    """
+
+    def __init__(self, weekmask=ALL_DAYS, holidays=()):
+        self.weekmask = weekmask
+        self.holidays = tuple(sorted(set(holidays)))
+        self.calendar_days = weekmask == ALL_DAYS and not self.holidays
+        if self.calendar_days:
+            return
+        self._base = HORIZON_START.toordinal()
+        self._end = HORIZON_END.toordinal() + 1
+        self._per_week = weekmask.count('1')
+        # Only holidays on otherwise working weekdays change the counts
+        self._holidays = [o for o in self.holidays if weekmask[(o - 1) % 7] == '1']
+        self._win = None  # (lo ordinal, cum list, days list, cum array or None), swapped atomically
+        self._grow_lock = threading.Lock()
+
+    def _count_before(self, ordinal):
+        """Working days in [HORIZON_START, ordinal), without materialising the range."""
+        weeks, rem = divmod(ordinal - self._base, 7)
+        start = (self._base - 1) % 7
+        partial = sum(1 for i in range(rem) if self.weekmask[(start + i) % 7] == '1')
+        return weeks * self._per_week + partial - bisect_left(self._holidays, ordinal)
+
+    def _compile(self, lo, hi):
+        hol = set(self._holidays)
+        n = self._count_before(lo)
+        cum, days = [n], []
+        for o in range(lo, hi):
+            # date.fromordinal(1) is a Monday, so (o - 1) % 7 is the weekday
+            if self.weekmask[(o - 1) % 7] == '1' and o not in hol:
+                days.append(o)
+                n += 1
+            cum.append(n)
+        return lo, cum, days, (np.asarray(cum, dtype=np.int64) if np is not None else None)
+
+    def _window(self, lo, hi=None):
+        """Window covering ordinals [lo, hi], compiling or growing it if needed."""
+        hi = lo if hi is None else hi
+        if not (self._base <= lo and hi < self._end):
+            raise ValueError(f'{date.fromordinal(max(1, min(lo, hi)))} is outside the working calendar horizon')
+        win = self._win
+        if win is not None and win[0] <= lo and hi < win[0] + len(win[1]) - 1:
+            return win
+        with self._grow_lock:
+            win = self._win
+            if win is None or not (win[0] <= lo and hi < win[0] + len(win[1]) - 1):
+                new_lo, new_hi = lo - WINDOW_PAD_DAYS, hi + 1 + WINDOW_PAD_DAYS
+                if win is not None:
+                    new_lo, new_hi = min(new_lo, win[0]), max(new_hi, win[0] + len(win[1]) - 1)
+                win = self._win = self._compile(max(self._base, new_lo), min(self._end, new_hi))
+        return win
+
+    def _cum_at(self, ordinal):
+        win = self._window(ordinal)
+        return win[1][ordinal - win[0]]
+
+    def is_working(self, day):
+        if self.calendar_days:
+            return True
+        o = day.toordinal()
+        win = self._window(o)
+        return win[1][o - win[0] + 1] > win[1][o - win[0]]
+
+    def index(self, day):
+        """Working-day index of day, rolled forward to the next working day if it is not one."""
+        if self.calendar_days:
+            return day.toordinal()
+        return self._cum_at(day.toordinal())
+
+    def index_ordinal(self, ordinal):
+        return ordinal if self.calendar_days else self._cum_at(ordinal)
+
+    def day_at(self, k):
+        if self.calendar_days:
+            return date.fromordinal(k)
+        if k < 0:
+            raise ValueError('working day index outside the working calendar horizon')
+        win = self._win
+        if win is None or not win[1][0] <= k < win[1][-1]:
+            # Each working week holds _per_week days; holidays only push the day later
+            guess = self._base + (k // self._per_week) * 7
+            span = 7 + (k % self._per_week) * 7
+            while True:
+                win = self._window(min(guess, self._end - 1), min(guess + span, self._end - 1))
+                if win[1][0] <= k < win[1][-1] or win[0] + len(win[1]) - 1 >= self._end:
+                    break
+                span *= 2
+        i = k - win[1][0]
+        if not 0 <= i < len(win[2]):
+            raise ValueError('working day index outside the working calendar horizon')
+        return date.fromordinal(win[2][i])
+
+    def end_at(self, k, duration):
+        """Exclusive end of a task starting at working-day index k lasting duration working days."""
+        if duration <= 0:
+            return self.day_at(k)
+        if self.calendar_days:
+            return date.fromordinal(k + duration)
+        return self.day_at(k + duration - 1) + timedelta(days=1)
+
+    def roll_forward(self, day):
+        return day if self.calendar_days else self.day_at(self.index(day))
+
+    def add_workdays(self, day, n):
+        """Working day n working days after day (day itself rolled forward first)."""
+        return self.day_at(self.index(day) + n)
+
+    def end_date(self, start, duration):
+        """Exclusive end for a part, e.g. 5 working days from a Friday ends the next Friday."""
+        if start is None:
+            return None
+        duration = duration or 0
+        if self.calendar_days:
+            return start + timedelta(days=duration)
+        return self.end_at(self.index(start), duration)
+
+    def count(self, start, end):
+        """Working days in [start, end)."""
+        if self.calendar_days:
+            return (end - start).days
+        return self._cum_at(end.toordinal()) - self._cum_at(start.toordinal())
+
+    def indices(self, ordinals):
+        """Vectorised index_ordinal (list in, list out)."""
+        if self.calendar_days:
+            return list(ordinals)
+        if not len(ordinals):
+            return []
+        win = self._window(min(ordinals), max(ordinals))
+        if np is not None:
+            return win[3][np.asarray(ordinals, dtype=np.int64) - win[0]].tolist()
+        return [win[1][o - win[0]] for o in ordinals]
+
+
+CALENDAR_DAYS = WorkCalendar()
+
+
+@lru_cache(maxsize=64)
+def get_calendar(weekmask=None, holidays=()):
+    """Shared compiled calendar for (weekmask, holiday ordinals); None mask = calendar days."""
+    if not weekmask:
+        return CALENDAR_DAYS
+    return WorkCalendar(weekmask, holidays)
+
+
+def expand_periods(periods):
+    """[(start, end inclusive), ...] -> sorted tuple of non-working day ordinals."""
+    out = set()
+    for start, end in periods:
+        out.update(range(start.toordinal(), (end or start).toordinal() + 1))
+    return tuple(sorted(out))
+
+
+def calendar_for_project(project_id, bind=None):
+    """Load a project's calendar; bind may be a Connection (flush-time listeners) or the session."""
+    from sqlalchemy import select
+    from app.models import db, Project, NonWorkingPeriod
+    if not project_id:
+        return CALENDAR_DAYS
+    bind = bind if bind is not None else db.session
+    workweek = bind.execute(select(Project.workweek).where(Project.id == project_id)).scalar()
+    if not workweek:
+        return CALENDAR_DAYS
+    periods = bind.execute(select(NonWorkingPeriod.start_date, NonWorkingPeriod.end_date)
+                           .where(NonWorkingPeriod.project_id == project_id)).all()
+    return get_calendar(workweek, expand_periods(periods))
+
+
+def resync_end_dates(project_id):
+    """Recompute the materialised end_date of every part after the project's calendar changed."""
+    from sqlalchemy import update, select
+    from app.models import db, bump_schedule_version, Phase, Feature, Item
+    from app.rollups import refresh_project_rollups
+    cal = calendar_for_project(project_id)
+    queries = (
+        (Phase, select(Phase.id, Phase.start_date, Phase.duration).where(Phase.project_id == project_id)),
+        (Feature, select(Feature.id, Feature.start_date, Feature.duration)
+         .join(Phase, Feature.phase_id == Phase.id).where(Phase.project_id == project_id)),
+        (Item, select(Item.id, Item.start_date, Item.duration).join(Feature, Item.feature_id == Feature.id)
+         .join(Phase, Feature.phase_id == Phase.id).where(Phase.project_id == project_id)),
+    )
+    changed = 0
+    for model, q in queries:
+        rows = [{'id': pid, 'end_date': cal.end_date(start, duration)} for pid, start, duration in db.session.execute(q)]
+        if rows:
+            db.session.execute(update(model), rows)
+            changed += len(rows)
+    bump_schedule_version([project_id])
+    refresh_project_rollups(project_id)
+    db.session.commit()
+    return changed
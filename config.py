@@ -1,5 +1,21 @@
 import os
 base_dir = os.path.abspath(os.path.dirname(__file__))
+
+# SQLite connect-time PRAGMA profiles (ignored for other databases). Keys are applied in order.
+SQLITE_PROFILES = {
+    # SQLite defaults plus a busy timeout so writers wait instead of raising "database is locked"
+    'default': {'busy_timeout': 5000},
+    # WAL lets readers proceed during a write; NORMAL sync is durable across app crashes in WAL mode
+    'development': {'busy_timeout': 5000, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+    'production': {
+        'busy_timeout': 10000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,   # 256 MiB memory-mapped reads
+        'cache_size': -65536,     # 64 MiB page cache (negative = KiB)
+        'temp_store': 'MEMORY',
+    },
+}
 class BaseConfig:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-insecure')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(base_dir, 'app.db'))
@@ -9,12 +25,74 @@ class BaseConfig:
     # Feature flags (future-proof)
     ENABLE_PRESENCE = os.getenv('ENABLE_PRESENCE', '1') == '1'
     ENABLE_DRAFTS = os.getenv('ENABLE_DRAFTS', '1') == '1'
+    # Drafts shown per page in the holding area, and max drafts per bulk promotion
+    DRAFT_PAGE_SIZE = int(os.getenv('DRAFT_PAGE_SIZE', '50'))
+    DRAFT_BULK_LIMIT = int(os.getenv('DRAFT_BULK_LIMIT', '1000'))
+    # Bulk draft intake (CSV / pasted list): rows per INSERT batch and max rows per request
+    DRAFT_INTAKE_BATCH_SIZE = int(os.getenv('DRAFT_INTAKE_BATCH_SIZE', '500'))
+    DRAFT_INTAKE_MAX_ROWS = int(os.getenv('DRAFT_INTAKE_MAX_ROWS', '5000'))
+    # Monte Carlo risk analysis: default/max simulations per request, and worker processes (0 = in-process)
+    RISK_SIMULATIONS = int(os.getenv('RISK_SIMULATIONS', '2000'))
+    RISK_MAX_SIMULATIONS = int(os.getenv('RISK_MAX_SIMULATIONS', '20000'))
+    RISK_WORKERS = int(os.getenv('RISK_WORKERS', '0'))
+    # Portfolio roll-up: worker processes for stale projects (0 = in-process) and the
+    # minimum stale task count before a pool is worth starting
+    PORTFOLIO_WORKERS = int(os.getenv('PORTFOLIO_WORKERS', '0'))
+    PORTFOLIO_PARALLEL_MIN_TASKS = int(os.getenv('PORTFOLIO_PARALLEL_MIN_TASKS', '5000'))
+    # Run schema/admin bootstrap inside create_app (normally done once via `flask bootstrap`)
+    BOOTSTRAP_ON_START = os.getenv('BOOTSTRAP_ON_START', '0') == '1'
+    # Log declared-but-missing indexes at startup (also `flask check-indexes`)
+    INDEX_CHECK_ON_START = os.getenv('INDEX_CHECK_ON_START', '0') == '1'
+    # Database engine profile: SQLite PRAGMAs by name (see SQLITE_PROFILES) and pool sizing
+    SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    # Seconds the admin dashboard counts may be served from cache (writes invalidate sooner)
+    ADMIN_STATS_TTL_SECONDS = int(os.getenv('ADMIN_STATS_TTL_SECONDS', '30'))
+    # /metrics (Prometheus text); set METRICS_TOKEN to require "Authorization: Bearer <token>".
+    # Without a token, METRICS_LOOPBACK_ONLY limits it to requests from 127.0.0.1 / ::1
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+    METRICS_LOOPBACK_ONLY = os.getenv('METRICS_LOOPBACK_ONLY', '0') == '1'
+    # Slow-query log (0 disables): statements over the threshold keep route and query plan;
+    # bound parameters (may include password hashes) are only recorded with SLOW_QUERY_LOG_PARAMS=1
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '250'))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '200'))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') == '1'
+    SLOW_QUERY_LOG_PARAMS = os.getenv('SLOW_QUERY_LOG_PARAMS', '0') == '1'
+    # JSON encoder for responses and embedded page data: auto (orjson if installed) | orjson | stdlib
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    # Response compression for text payloads (brotli used only if the package is installed)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_ALGORITHMS = tuple(a.strip() for a in os.getenv('COMPRESS_ALGORITHMS', 'br,gzip').split(',') if a.strip())
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+    # Identity cache for the Flask-Login user_loader (0 disables)
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+    USER_CACHE_MAXSIZE = int(os.getenv('USER_CACHE_MAXSIZE', '1024'))
+    # Server-side login throttle (token buckets per user+address and per address)
+    LOGIN_THROTTLE_USER_CAPACITY = int(os.getenv('LOGIN_THROTTLE_USER_CAPACITY', '5'))
+    LOGIN_THROTTLE_USER_REFILL_SECONDS = float(os.getenv('LOGIN_THROTTLE_USER_REFILL_SECONDS', '60'))
+    LOGIN_THROTTLE_ADDR_CAPACITY = int(os.getenv('LOGIN_THROTTLE_ADDR_CAPACITY', '20'))
+    LOGIN_THROTTLE_ADDR_REFILL_SECONDS = float(os.getenv('LOGIN_THROTTLE_ADDR_REFILL_SECONDS', '3'))
+    LOGIN_THROTTLE_BACKOFF_AFTER = int(os.getenv('LOGIN_THROTTLE_BACKOFF_AFTER', '5'))
+    LOGIN_THROTTLE_BACKOFF_BASE_SECONDS = int(os.getenv('LOGIN_THROTTLE_BACKOFF_BASE_SECONDS', '30'))
+    LOGIN_THROTTLE_BACKOFF_MAX_SECONDS = int(os.getenv('LOGIN_THROTTLE_BACKOFF_MAX_SECONDS', '3600'))
+    LOGIN_THROTTLE_RETENTION_SECONDS = int(os.getenv('LOGIN_THROTTLE_RETENTION_SECONDS', '86400'))
 
 class ProductionConfig(BaseConfig):
-    pass
+    SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'production')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    # Route names, latencies and table counts are not public in production
+    METRICS_LOOPBACK_ONLY = os.getenv('METRICS_LOOPBACK_ONLY', '1') == '1'
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
+    SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'development')
 
 config_by_name = {
     'development': DevelopmentConfig,
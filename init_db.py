@@ -1,8 +1,5 @@
 from app import create_app
-from app.models import db
+from app.bootstrap import bootstrap
 
 app = create_app()
-
-with app.app_context():
-    db.create_all()
-    print('Database initialized.')
+print('Database initialized.', bootstrap(app))
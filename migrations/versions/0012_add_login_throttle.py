@@ -0,0 +1,29 @@
+"""add login_throttle table
+
+Revision ID: 0012_add_login_throttle
+Revises: 0011_add_draft_scheduling
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0012_add_login_throttle'
+down_revision = '0011_add_draft_scheduling'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('login_throttle',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('key', sa.String(length=255), nullable=False, unique=True),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('failures', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('locked_until', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.Float(), nullable=False)
+    )
+    op.create_index('ix_login_throttle_updated_at', 'login_throttle', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_login_throttle_updated_at', table_name='login_throttle')
+    op.drop_table('login_throttle')
@@ -0,0 +1,41 @@
+"""add indexes for hierarchy, ordering and image link lookups
+
+Revision ID: 0013_add_hot_path_indexes
+Revises: 0012_add_login_throttle
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0013_add_hot_path_indexes'
+down_revision = '0012_add_login_throttle'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns); parent + sort_order serves both the parent filter and the ORDER BY
+INDEXES = (
+    ('ix_phase_project_id_sort_order', 'phase', ['project_id', 'sort_order']),
+    ('ix_feature_phase_id_sort_order', 'feature', ['phase_id', 'sort_order']),
+    ('ix_item_feature_id_sort_order', 'item', ['feature_id', 'sort_order']),
+    ('ix_image_phase_phase_id', 'image_phase', ['phase_id']),
+    ('ix_image_feature_feature_id', 'image_feature', ['feature_id']),
+    ('ix_image_item_item_id', 'image_item', ['item_id']),
+    ('ix_image_project_id', 'image', ['project_id']),
+    ('ix_draft_part_created_at', 'draft_part', ['created_at']),
+)
+
+def upgrade():
+    # 0007 created image_subitem.sub_item_id but 0010 only renamed 'subitem_id', so migrated
+    # databases still carry sub_item_id where the model expects item_id. Align it first (kept on downgrade).
+    conn = op.get_bind()
+    cols = [c['name'] for c in sa.inspect(conn).get_columns('image_item')]
+    if 'sub_item_id' in cols and 'item_id' not in cols:
+        with op.batch_alter_table('image_item') as batch:
+            batch.alter_column('sub_item_id', new_column_name='item_id', existing_type=sa.Integer())
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,19 @@
+"""add draft_part (project_id, created_at) index for project-scoped draft paging
+
+Revision ID: 0014_add_draft_project_index
+Revises: 0013_add_hot_path_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '0014_add_draft_project_index'
+down_revision = '0013_add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_draft_part_project_id_created_at', 'draft_part', ['project_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_draft_part_project_id_created_at', table_name='draft_part')
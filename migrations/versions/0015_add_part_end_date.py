@@ -0,0 +1,40 @@
+"""add materialised, indexed end_date to phase, feature and item
+
+Revision ID: 0015_add_part_end_date
+Revises: 0014_add_draft_project_index
+Create Date: 2026-10-19
+"""
+from datetime import timedelta
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0015_add_part_end_date'
+down_revision = '0014_add_draft_project_index'
+branch_labels = None
+depends_on = None
+
+TABLES = ('phase', 'feature', 'item')
+
+def upgrade():
+    conn = op.get_bind()
+    for table in TABLES:
+        op.add_column(table, sa.Column('end_date', sa.Date(), nullable=True))
+        # Backfill start_date + duration days (exclusive end, as rendered in the Gantt)
+        if conn.dialect.name == 'sqlite':
+            conn.execute(sa.text(f"UPDATE {table} SET end_date = date(start_date, '+' || COALESCE(duration, 0) || ' days') "
+                                 "WHERE start_date IS NOT NULL"))
+        else:
+            t = sa.table(table, sa.column('id', sa.Integer), sa.column('start_date', sa.Date),
+                         sa.column('duration', sa.Integer), sa.column('end_date', sa.Date))
+            rows = conn.execute(sa.select(t.c.id, t.c.start_date, t.c.duration).where(t.c.start_date.isnot(None))).all()
+            for row in rows:
+                conn.execute(t.update().where(t.c.id == row.id)
+                             .values(end_date=row.start_date + timedelta(days=row.duration or 0)))
+        op.create_index(f'ix_{table}_end_date', table, ['end_date'])
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_index(f'ix_{table}_end_date', table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('end_date')
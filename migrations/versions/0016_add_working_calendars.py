@@ -0,0 +1,35 @@
+"""add per-project working calendars (workweek mask, holidays and shutdown periods)
+
+Revision ID: 0016_add_working_calendars
+Revises: 0015_add_part_end_date
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0016_add_working_calendars'
+down_revision = '0015_add_part_end_date'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL workweek keeps existing projects on calendar days, so end_date needs no backfill
+    with op.batch_alter_table('project') as batch:
+        batch.add_column(sa.Column('workweek', sa.String(length=7), nullable=True))
+    op.create_table(
+        'non_working_period',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('project.id'), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('label', sa.String(length=120), nullable=True),
+    )
+    op.create_index('ix_non_working_period_project_id_start_date', 'non_working_period', ['project_id', 'start_date'])
+
+
+def downgrade():
+    op.drop_index('ix_non_working_period_project_id_start_date', table_name='non_working_period')
+    op.drop_table('non_working_period')
+    with op.batch_alter_table('project') as batch:
+        batch.drop_column('workweek')
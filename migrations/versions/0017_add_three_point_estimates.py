@@ -0,0 +1,29 @@
+"""add optional optimistic/pessimistic duration estimates to feature and item
+
+Revision ID: 0017_add_three_point_estimates
+Revises: 0016_add_working_calendars
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0017_add_three_point_estimates'
+down_revision = '0016_add_working_calendars'
+branch_labels = None
+depends_on = None
+
+TABLES = ('feature', 'item')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column('duration_optimistic', sa.Integer(), nullable=True))
+            batch.add_column(sa.Column('duration_pessimistic', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('duration_pessimistic')
+            batch.drop_column('duration_optimistic')
@@ -0,0 +1,23 @@
+"""add project.schedule_version (cache key for portfolio analyses)
+
+Revision ID: 0018_add_project_schedule_version
+Revises: 0017_add_three_point_estimates
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0018_add_project_schedule_version'
+down_revision = '0017_add_three_point_estimates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('project') as batch:
+        batch.add_column(sa.Column('schedule_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('project') as batch:
+        batch.drop_column('schedule_version')
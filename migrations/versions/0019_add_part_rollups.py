@@ -0,0 +1,48 @@
+"""add materialised roll-up columns to phase and feature
+
+Revision ID: 0019_add_part_rollups
+Revises: 0018_add_project_schedule_version
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0019_add_part_rollups'
+down_revision = '0018_add_project_schedule_version'
+branch_labels = None
+depends_on = None
+
+TABLES = ('phase', 'feature')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column('rollup_start', sa.Date(), nullable=True))
+            batch.add_column(sa.Column('rollup_end', sa.Date(), nullable=True))
+            batch.add_column(sa.Column('rollup_children', sa.Integer(), nullable=False, server_default='0'))
+            batch.add_column(sa.Column('rollup_milestones', sa.Integer(), nullable=False, server_default='0'))
+    conn = op.get_bind()
+    # Backfill features from their items first, then phases from their features (see app/rollups.py)
+    conn.execute(sa.text(
+        "UPDATE feature SET "
+        "rollup_start = (SELECT min(item.start_date) FROM item WHERE item.feature_id = feature.id), "
+        "rollup_end = (SELECT max(item.end_date) FROM item WHERE item.feature_id = feature.id), "
+        "rollup_children = (SELECT count(item.id) FROM item WHERE item.feature_id = feature.id), "
+        "rollup_milestones = (SELECT count(item.id) FROM item WHERE item.feature_id = feature.id AND item.is_milestone)"))
+    conn.execute(sa.text(
+        "UPDATE phase SET "
+        "rollup_start = (SELECT min(CASE WHEN f.rollup_start < f.start_date THEN f.rollup_start ELSE f.start_date END) "
+        "FROM feature f WHERE f.phase_id = phase.id), "
+        "rollup_end = (SELECT max(CASE WHEN f.rollup_end > f.end_date THEN f.rollup_end ELSE f.end_date END) "
+        "FROM feature f WHERE f.phase_id = phase.id), "
+        "rollup_children = (SELECT count(f.id) FROM feature f WHERE f.phase_id = phase.id), "
+        "rollup_milestones = (SELECT coalesce(sum(CASE WHEN f.is_milestone THEN 1 ELSE 0 END + f.rollup_milestones), 0) "
+        "FROM feature f WHERE f.phase_id = phase.id)"))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            for col in ('rollup_milestones', 'rollup_children', 'rollup_end', 'rollup_start'):
+                batch.drop_column(col)
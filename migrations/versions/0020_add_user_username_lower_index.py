@@ -0,0 +1,21 @@
+"""add lower(username) index for case-insensitive admin prefix search
+
+Revision ID: 0020_add_user_username_lower_index
+Revises: 0019_add_part_rollups
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0020_add_user_username_lower_index'
+down_revision = '0019_add_part_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_username_lower', 'user', [sa.text('lower(username)')])
+
+
+def downgrade():
+    op.drop_index('ix_user_username_lower', table_name='user')
@@ -1,9 +1,12 @@
 from app import create_app
+from app.bootstrap import bootstrap
 import os
 
 app = create_app()
 
 if __name__ == '__main__':
+    # Dev server first run: empty DB gets a schema, ADMIN_USERNAME gets an account
+    bootstrap(app)
     debug = os.getenv('FLASK_DEBUG','1') == '1'
     app.run(debug=debug, host='127.0.0.1', port=5000)
 
@@ -0,0 +1,169 @@
+"""Repeatable benchmarks for the planning hot paths on synthetic data.
+
+Each size runs against a fresh temporary SQLite database seeded with app.synthetic, then
+times compute_critical_path, update_gantt_task, index() and the exports, recording wall
+time and SQL statement counts. Results are JSON so runs can be diffed or compared:
+
+    python scripts/benchmark.py --sizes 100,10000 --repeat 5 --output bench.json
+    python scripts/benchmark.py --sizes 100,10000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CASES = ('load_parts', 'critical_path', 'update_gantt_task', 'index',
+         'export_project', 'export_calendar_ics', 'export_critical_csv')
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._hit)
+
+    def _hit(self, *args, **kwargs):
+        self.count += 1
+
+
+def _time(fn, repeat, counter):
+    samples, queries = [], 0
+    for _ in range(repeat):
+        before = counter.count
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+        queries = counter.count - before
+    return {
+        'ms_min': round(min(samples), 3),
+        'ms_median': round(statistics.median(samples), 3),
+        'ms_mean': round(statistics.fmean(samples), 3),
+        'ms_max': round(max(samples), 3),
+        'queries': queries,
+        'repeat': repeat,
+    }
+
+
+def _check(resp, case):
+    if resp.status_code >= 400:
+        raise RuntimeError(f'{case} returned HTTP {resp.status_code}')
+    resp.close()
+
+
+def run_size(parts, repeat, seed, cases):
+    import config
+    from werkzeug.security import generate_password_hash
+    with tempfile.TemporaryDirectory() as tmp:
+        config.BaseConfig.SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        config.BaseConfig.SLOW_QUERY_MS = 0  # EXPLAIN capture would skew the timings
+        from app import create_app
+        from app.models import db, User, Feature, Phase
+        from app.blueprints.planning import compute_critical_path, _iter_project_parts
+        from app.synthetic import seed_synthetic
+        app = create_app()
+        out = {'parts': parts, 'cases': {}}
+        with app.app_context():
+            db.create_all()
+            db.session.add(User(username='bench', password_hash=generate_password_hash('bench'), is_admin=True))
+            db.session.commit()
+            t0 = time.perf_counter()
+            summary = seed_synthetic(parts=parts, projects=1, seed=seed, owner='bench')
+            out['seed_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+            out['rows'] = {k: v for k, v in summary.items() if k != 'projects'}
+            pid = summary['projects'][0]
+            feature_ids = [f for (f,) in db.session.query(Feature.id).join(Phase).filter(Phase.project_id == pid).order_by(Feature.id)]
+            counter = QueryCounter(db.engine)
+            if 'load_parts' in cases:
+                out['cases']['load_parts'] = _time(lambda: _iter_project_parts(pid), repeat, counter)
+            if 'critical_path' in cases:
+                parts_loaded = _iter_project_parts(pid)
+                out['cases']['critical_path'] = _time(lambda: compute_critical_path(*parts_loaded), repeat, counter)
+            db.session.remove()
+        client = app.test_client()
+        client.post('/login', data={'username': 'bench', 'password': 'bench'})
+        client.post('/set_project', data={'project-id': str(pid)})
+        target = feature_ids[len(feature_ids) // 2] if feature_ids else None
+        shift = {'n': 0}
+
+        def drag():
+            shift['n'] += 1
+            day = 10 + shift['n'] % 2
+            _check(client.post('/update_gantt_task', json={'id': f'feature-{target}', 'start': f'2025-03-{day:02d}'}), 'update_gantt_task')
+
+        http_cases = {
+            'update_gantt_task': drag if target else None,
+            'index': lambda: _check(client.get('/'), 'index'),
+            'export_project': lambda: _check(client.get(f'/export_project/{pid}'), 'export_project'),
+            'export_calendar_ics': lambda: _check(client.get('/export_calendar_ics'), 'export_calendar_ics'),
+            'export_critical_csv': lambda: _check(client.get('/export_critical_csv'), 'export_critical_csv'),
+        }
+        for case, fn in http_cases.items():
+            if case in cases and fn:
+                out['cases'][case] = _time(fn, repeat, counter)
+        with app.app_context():
+            db.engine.dispose()
+        return out
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(current, previous):
+    """Print median ratios (current / previous) for matching size+case pairs."""
+    prev = {(r['parts'], c): v for r in previous.get('runs', []) for c, v in r['cases'].items()}
+    for run in current['runs']:
+        for case, v in run['cases'].items():
+            old = prev.get((run['parts'], case))
+            if not old or not old['ms_median']:
+                continue
+            ratio = v['ms_median'] / old['ms_median']
+            print(f"{run['parts']:>7} {case:<22} {old['ms_median']:>10.2f} -> {v['ms_median']:>10.2f} ms "
+                  f"(x{ratio:.2f}), queries {old['queries']} -> {v['queries']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help='Comma-separated part counts (e.g. 100,10000,100000).')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case.')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed.')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated subset of: ' + ', '.join(CASES))
+    parser.add_argument('--output', help='Write results JSON here (default: stdout).')
+    parser.add_argument('--compare', help='Previous results JSON to compare medians against.')
+    args = parser.parse_args(argv)
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    cases = {c.strip() for c in args.cases.split(',') if c.strip()}
+    results = {
+        'meta': {
+            'started': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'git_rev': _git_rev(), 'python': platform.python_version(), 'platform': platform.platform(),
+            'repeat': args.repeat, 'seed': args.seed,
+        },
+        'runs': [run_size(int(s), args.repeat, args.seed, cases) for s in args.sizes.split(',') if s.strip()],
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fh:
+            compare(results, json.load(fh))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""Load-test harness: N concurrent virtual planners replaying realistic sessions.
+
+Each virtual user loops: log in, load the index, poll presence, drag a Gantt task, open and
+edit a part, sometimes upload an image, log out. Reports throughput, per-action latency
+percentiles, HTTP errors and SQLite "database is locked" failures.
+
+In-process (default): drives wsgi.application with one test client per user against a
+throwaway SQLite database seeded by app.synthetic:
+
+    python scripts/loadtest.py --users 20 --duration 30 --parts 1000
+
+Against a locally started server (mutates its data; point it at a disposable database and
+raise LOGIN_THROTTLE_ADDR_CAPACITY, since every virtual user shares one client address):
+
+    python scripts/loadtest.py --url http://127.0.0.1:5000 --users 10 --project-id 1
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+GANTT_RE = re.compile(r'<script id="gantt-data" type="application/json">(.*?)</script>', re.S)
+# Smallest valid PNG (1x1 transparent pixel)
+PNG_BYTES = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082')
+
+
+class InProcessTransport:
+    def __init__(self, app, addr):
+        self.client = app.test_client()
+        # Distinct client addresses so the per-address login bucket models real users
+        self.client.environ_base['REMOTE_ADDR'] = addr
+
+    def request(self, method, path, form=None, json_body=None, upload=None):
+        kwargs = {}
+        if json_body is not None:
+            kwargs['json'] = json_body
+        elif upload is not None:
+            kwargs['data'] = {'file': (io.BytesIO(upload[1]), upload[0])}
+            kwargs['content_type'] = 'multipart/form-data'
+        elif form is not None:
+            kwargs['data'] = form
+        resp = self.client.open(path, method=method, **kwargs)
+        body = resp.get_data()
+        resp.close()
+        return resp.status_code, body
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        self.base = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, form=None, json_body=None, upload=None):
+        headers, data = {}, None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif upload is not None:
+            boundary = uuid.uuid4().hex
+            data = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{upload[0]}"\r\n'
+                    f'Content-Type: application/octet-stream\r\n\r\n').encode() + upload[1] + f'\r\n--{boundary}--\r\n'.encode()
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        req = urllib.request.Request(self.base + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.lock_errors = 0
+        self.exceptions = 0
+
+    def record(self, action, seconds, status):
+        with self.lock:
+            self.samples.setdefault(action, []).append(seconds * 1000)
+            if status >= 400:
+                key = f'{action}:{status}'
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def db_locked(self):
+        with self.lock:
+            self.lock_errors += 1
+
+
+def _pct(sorted_vals, p):
+    if not sorted_vals:
+        return None
+    k = (len(sorted_vals) - 1) * p / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return round(sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo), 2)
+
+
+def virtual_user(transport, username, password, project_id, deadline, rec, think_ms, upload_ratio, rng):
+    def call(action, method, path, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            status, body = transport.request(method, path, **kwargs)
+        except Exception:
+            with rec.lock:
+                rec.exceptions += 1
+            return None, b''
+        rec.record(action, time.perf_counter() - t0, status)
+        return status, body
+
+    def think():
+        if think_ms:
+            time.sleep(rng.uniform(0, think_ms) / 1000.0)
+
+    while time.monotonic() < deadline:
+        call('login', 'POST', '/login', form={'username': username, 'password': password})
+        if project_id:
+            call('set_project', 'POST', '/set_project', form={'project-id': str(project_id)})
+        status, body = call('index', 'GET', '/')
+        tasks = []
+        m = GANTT_RE.search(body.decode('utf-8', 'replace')) if body else None
+        if m:
+            try:
+                tasks = [t['id'] for t in json.loads(m.group(1)) if not t['id'].startswith('phase-')]
+            except ValueError:
+                tasks = []
+        think()
+        call('active_users', 'GET', '/active_users')
+        if tasks:
+            sid = rng.choice(tasks)
+            day = rng.randint(1, 28)
+            call('drag', 'POST', '/update_gantt_task', json_body={'id': sid, 'start': f'2025-04-{day:02d}'})
+            think()
+            kind, num = sid.split('-', 1)
+            status, body = call('get_part', 'GET', f'/get_part?type={kind}&id={num}')
+            if status == 200:
+                part = json.loads(body).get('part') or {}
+                call('edit', 'POST', f'/edit_{kind}/{num}', json_body={
+                    'title': part.get('title'), 'notes': f'load test {rng.randint(0, 1 << 30)}',
+                    'is_milestone': part.get('is_milestone'), 'internal_external': part.get('internal_external')})
+        if rng.random() < upload_ratio:
+            call('upload', 'POST', '/media/upload', upload=(f'lt-{uuid.uuid4().hex[:12]}.png', PNG_BYTES))
+        for _ in range(2):
+            think()
+            call('active_users', 'GET', '/active_users')
+        call('logout', 'GET', '/logout')
+
+
+def _prepare_in_process(args, tmp):
+    os.environ['DATABASE_URL'] = args.database or 'sqlite:///' + os.path.join(tmp, 'loadtest.db')
+    os.environ.setdefault('SECRET_KEY', 'loadtest')
+    os.environ.setdefault('SLOW_QUERY_MS', '0')
+    from wsgi import application
+    from werkzeug.security import generate_password_hash
+    from app.models import db, User
+    from app.blueprints import media
+    from app.synthetic import seed_synthetic
+    media.UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+    os.makedirs(media.UPLOAD_FOLDER, exist_ok=True)
+    with application.app_context():
+        db.create_all()
+        # One cheap hash for all virtual users keeps setup fast
+        pw_hash = generate_password_hash(args.password)
+        for i in range(args.users):
+            name = f'{args.user_prefix}{i}'
+            if not User.query.filter_by(username=name).first():
+                db.session.add(User(username=name, password_hash=pw_hash))
+        db.session.commit()
+        project_id = args.project_id
+        if not project_id and not args.database:
+            project_id = seed_synthetic(parts=args.parts, projects=1, seed=args.seed, owner=f'{args.user_prefix}0')['projects'][0]
+        db.session.remove()
+    return application, project_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent virtual-planner load test.')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users.')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run.')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process wsgi.application).')
+    parser.add_argument('--database', help='In-process only: DATABASE_URL to use instead of a seeded temp DB.')
+    parser.add_argument('--parts', type=int, default=500, help='In-process only: parts in the seeded project.')
+    parser.add_argument('--project-id', type=int, help='Project to select (default: the seeded one).')
+    parser.add_argument('--user-prefix', default='loadtest-', help='Virtual user name prefix.')
+    parser.add_argument('--password', default='loadtest-pass', help='Virtual user password.')
+    parser.add_argument('--think-ms', type=float, default=100, help='Max random think time between steps.')
+    parser.add_argument('--upload-ratio', type=float, default=0.2, help='Share of sessions that upload an image.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report here as well as stdout.')
+    args = parser.parse_args(argv)
+    rec = Recorder()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            transports = [HttpTransport(args.url) for _ in range(args.users)]
+            for i, t in enumerate(transports):
+                t.request('POST', '/register', form={'username': f'{args.user_prefix}{i}', 'password': args.password})
+            project_id = args.project_id
+            mode = 'http'
+        else:
+            app, project_id = _prepare_in_process(args, tmp)
+            from flask import got_request_exception
+
+            def _on_exception(sender, exception, **extra):
+                if 'database is locked' in str(exception):
+                    rec.db_locked()
+            got_request_exception.connect(_on_exception, app, weak=False)
+            transports = [InProcessTransport(app, f'10.0.{i // 250}.{i % 250 + 1}') for i in range(args.users)]
+            mode = 'in-process'
+        deadline = time.monotonic() + args.duration
+        threads = [threading.Thread(target=virtual_user, daemon=True, args=(
+            t, f'{args.user_prefix}{i}', args.password, project_id, deadline, rec,
+            args.think_ms, args.upload_ratio, random.Random(args.seed + i))) for i, t in enumerate(transports)]
+        started = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        wall = time.perf_counter() - started
+    total = sum(len(v) for v in rec.samples.values())
+    actions = {}
+    for action, vals in sorted(rec.samples.items()):
+        vals.sort()
+        actions[action] = {'count': len(vals), 'mean_ms': round(statistics.fmean(vals), 2),
+                           'p50_ms': _pct(vals, 50), 'p90_ms': _pct(vals, 90), 'p95_ms': _pct(vals, 95),
+                           'p99_ms': _pct(vals, 99), 'max_ms': round(vals[-1], 2)}
+    report = {
+        'mode': mode, 'users': args.users, 'duration_s': round(wall, 2), 'requests': total,
+        'throughput_rps': round(total / wall, 2) if wall else None,
+        'http_errors': rec.errors, 'exceptions': rec.exceptions,
+        'sqlite_lock_errors': rec.lock_errors if mode == 'in-process' else None,
+        'actions': actions,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ Param(
     [switch]$Verify,
   [switch]$Run,
   [switch]$Integrity,
+  [switch]$UploadsGC,
+  [switch]$Reclaim,
   [string]$BindHost = '127.0.0.1',
     [int]$Port = 5000,
     [switch]$NoInstall
@@ -86,6 +88,10 @@ print(json.dumps({'association_counts':counts,'legacy_columns_remaining':legacy}
 "@
   python -c $code
 }
+function Do-UploadsGC(){
+  Write-Info 'Upload folder consistency scan'
+  if($Reclaim){ python -m flask uploads-gc --reclaim } else { python -m flask uploads-gc }
+}
 function Do-Run(){ Write-Info ("Starting app on http://{0}:{1}" -f $BindHost, $Port); python run.py }
 
 if($Revision){ Do-Revision }
@@ -95,12 +101,14 @@ if($Current){ Do-Current }
 if($Verify){ Do-Verify }
 if($Run){ Do-Run }
 if($Integrity){ Do-Integrity }
+if($UploadsGC){ Do-UploadsGC }
 
-if(-not ($Upgrade -or $Downgrade -or $Revision -or $Current -or $Verify -or $Run -or $Integrity)){
+if(-not ($Upgrade -or $Downgrade -or $Revision -or $Current -or $Verify -or $Run -or $Integrity -or $UploadsGC)){
   Write-Host 'Usage examples:' -ForegroundColor Green
   Write-Host '  ./scripts/manage.ps1 -Upgrade' -ForegroundColor Gray
   Write-Host '  ./scripts/manage.ps1 -Revision -RevisionMessage "add new table"' -ForegroundColor Gray
   Write-Host '  ./scripts/manage.ps1 -Verify' -ForegroundColor Gray
   Write-Host '  ./scripts/manage.ps1 -Run' -ForegroundColor Gray
   Write-Host '  ./scripts/manage.ps1 -Integrity' -ForegroundColor Gray
+  Write-Host '  ./scripts/manage.ps1 -UploadsGC [-Reclaim]' -ForegroundColor Gray
 }
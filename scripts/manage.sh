@@ -17,6 +17,7 @@ source "$VENV_DIR/bin/activate"
 NO_INSTALL=0
 ACTION=""
 REV_MSG=""
+RECLAIM=""
 for arg in "$@"; do
   case "$arg" in
     -Upgrade) ACTION="upgrade";;
@@ -26,6 +27,8 @@ for arg in "$@"; do
     -Verify) ACTION="verify";;
     -Run) ACTION="run";;
     -Integrity) ACTION="integrity";;
+    -UploadsGC) ACTION="uploadsgc";;
+    -Reclaim) RECLAIM="--reclaim";;
     -NoInstall) NO_INSTALL=1;;
     -RevisionMessage=*) REV_MSG="${arg#*=}";;
   esac
@@ -61,6 +64,7 @@ legacy=[c for c in ('phase_id','item_id','subitem_id') if c in cols]
 print(json.dumps({'association_counts':counts,'legacy_columns_remaining':legacy}))
 PY
 }
+function do_uploadsgc(){ info "Upload folder consistency scan"; flask uploads-gc $RECLAIM; }
 function do_run(){ info "Running dev server"; python run.py; }
 case "$ACTION" in
   revision) do_revision;;
@@ -69,6 +73,7 @@ case "$ACTION" in
   current) do_current;;
   verify) do_verify;;
   integrity) do_integrity;;
+  uploadsgc) do_uploadsgc;;
   run) do_run;;
   *) cat <<USAGE
 Usage: ./scripts/manage.sh [options]
@@ -78,6 +83,7 @@ Usage: ./scripts/manage.sh [options]
   -Current            Show current revision
   -Verify             Verify schema columns
   -Integrity          Association table counts
+  -UploadsGC [-Reclaim]  Diff upload folder vs image rows (reclaim orphans with -Reclaim)
   -Run                Run development server
   -NoInstall          Skip dependency install
 USAGE
@@ -0,0 +1,23 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature, Image
+from app.blueprints.admin import dashboard_stats, _stats_cache
+
+def test_stats_cached_and_invalidated(app, client):
+    client.post('/login', data={'username':'tester','password':'pass'})
+    _stats_cache.clear()
+    with app.app_context():
+        u = User.query.filter_by(username='tester').first()
+        proj = Project(title='Stats', owner_id=u.id); db.session.add(proj); db.session.commit()
+        ph = Phase(title='P', start_date=date.today(), duration=3, project_id=proj.id)
+        db.session.add(ph); db.session.commit()
+        db.session.add_all([Feature(title='F', start_date=date.today(), duration=2, phase_id=ph.id),
+                            Image(filename='a.png', project_id=proj.id)])
+        db.session.commit()
+        first = dashboard_stats()
+        assert first['stats'] == {'users':1,'projects':1,'phases':1,'features':1,'items':0,'images':1}
+        assert first['projects'] == [{'id': proj.id, 'title':'Stats', 'parts':2, 'images':1, 'scheduled_days':5}]
+        assert dashboard_stats() is first  # served from cache
+        db.session.add(Image(filename='b.png')); db.session.commit()
+        assert dashboard_stats()['stats']['images'] == 2
+    r = client.get('/admin/')
+    assert r.status_code == 200 and b'Scheduled days' in r.data
@@ -0,0 +1,18 @@
+from app.models import db, User
+
+def test_keyset_pages_and_prefix(app, client):
+    with app.app_context():
+        for name in ('alice', 'albert', 'bob', 'carol', 'alfred'):
+            db.session.add(User(username=name, password_hash='x'))
+        db.session.commit()
+    client.post('/login', data={'username':'tester','password':'pass'})
+    first = client.get('/admin/users?format=json&limit=2').get_json()
+    assert [u['username'] for u in first['users']] == ['albert', 'alfred']
+    second = client.get(f"/admin/users?format=json&limit=2&after={first['next']}").get_json()
+    assert [u['username'] for u in second['users']] == ['alice', 'bob']
+    prefix = client.get('/admin/users?format=json&q=Al').get_json()
+    assert [u['username'] for u in prefix['users']] == ['albert', 'alfred', 'alice'] and prefix['next'] is None
+    contains = client.get('/admin/users?format=json&q=r&mode=contains').get_json()
+    assert [u['username'] for u in contains['users']] == ['albert', 'alfred', 'carol', 'tester']
+    page = client.get('/admin/users?limit=2')
+    assert page.status_code == 200 and b'Load more' in page.data
@@ -0,0 +1,54 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature
+
+def _project(app, auth_client):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        proj = Project(title='Sched', owner_id=uid)
+        db.session.add(proj)
+        db.session.flush()
+        ph = Phase(title='P', start_date=date(2025, 3, 1), duration=30, project_id=proj.id)
+        db.session.add(ph)
+        db.session.flush()
+        rows = [
+            Feature(id=1, title='Dig', start_date=date(2025, 3, 1), duration=5, phase_id=ph.id),
+            Feature(id=2, title='Pour', start_date=date(2025, 3, 1), duration=2, dependencies='feature-1', phase_id=ph.id),
+            Feature(id=3, title='Inspect', start_date=date(2025, 3, 7), duration=0, dependencies='feature-2',
+                    is_milestone=True, phase_id=ph.id),
+            Feature(id=4, title='Order', start_date=date(2025, 3, 20), duration=1, phase_id=ph.id),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        pid = proj.id
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    return pid
+
+def test_forward_pass_moves_dependents_and_pins_milestones(app, auth_client):
+    _project(app, auth_client)
+    r = auth_client.post('/auto_schedule', json={})
+    data = r.get_json()
+    assert r.status_code == 200 and data['changed'] == 1
+    assert data['updates'] == [{'id': 'feature-2', 'start': '2025-03-06', 'end': '2025-03-08', 'duration': 2}]
+    assert data['conflicts'] == [{'milestone': 'feature-3', 'blocked_by': 'feature-2'}]
+    assert data['finish'] == '2025-03-21' and 'feature-4' in data['critical']
+    with app.app_context():
+        pour = db.session.get(Feature, 2)
+        assert pour.start_date == date(2025, 3, 6) and pour.end_date == date(2025, 3, 8)
+        assert db.session.get(Feature, 3).start_date == date(2025, 3, 7)
+
+def test_dry_run_and_asap_mode(app, auth_client):
+    _project(app, auth_client)
+    r = auth_client.post('/auto_schedule', json={'honour_current_starts': False, 'dry_run': True})
+    moved = {u['id']: u['start'] for u in r.get_json()['updates']}
+    assert moved == {'feature-2': '2025-03-06', 'feature-4': '2025-03-01'}
+    with app.app_context():
+        assert db.session.get(Feature, 4).start_date == date(2025, 3, 20)
+    assert auth_client.post('/auto_schedule', json={'project_id': 'abc'}).status_code == 400
+
+def test_cycle_rejected(app, auth_client):
+    _project(app, auth_client)
+    with app.app_context():
+        db.session.get(Feature, 1).dependencies = 'feature-2'
+        db.session.commit()
+    r = auth_client.post('/auto_schedule', json={})
+    assert r.status_code == 409 and set(r.get_json()['cycle']) >= {'feature-1', 'feature-2'}
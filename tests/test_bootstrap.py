@@ -0,0 +1,33 @@
+import config
+from app import create_app
+from app.bootstrap import bootstrap, ensure_admin
+from app.models import db, User
+
+def test_create_app_does_not_touch_admin(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///:memory:')
+    monkeypatch.setenv('ADMIN_USERNAME', 'boot-admin')
+    monkeypatch.setenv('ADMIN_PASSWORD', 'secret')
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        assert User.query.filter_by(username='boot-admin').first() is None
+        assert ensure_admin() == 'created'
+        assert ensure_admin() == 'unchanged'
+        assert User.query.filter_by(username='boot-admin').one().is_admin
+
+def test_bootstrap_creates_schema_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.BaseConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'boot.db'}")
+    monkeypatch.delenv('ADMIN_USERNAME', raising=False)
+    app = create_app()
+    assert bootstrap(app) == {'schema_created': True, 'admin': None}
+    assert bootstrap(app)['schema_created'] is False
+    with app.app_context():
+        db.engine.dispose()
+
+def test_disabled_feature_blueprints_not_registered(monkeypatch):
+    monkeypatch.setattr(config.BaseConfig, 'ENABLE_DRAFTS', False)
+    monkeypatch.setattr(config.BaseConfig, 'ENABLE_PRESENCE', False)
+    app = create_app()
+    assert 'drafts' not in app.blueprints and 'presence' not in app.blueprints
+    rules = {r.rule for r in app.url_map.iter_rules()}
+    assert '/create_draft_part' not in rules and '/active_users' not in rules
@@ -0,0 +1,43 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature, Item
+
+def _seed(app):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        p1, p2 = Project(title='Cal', owner_id=uid), Project(title='Other', owner_id=uid)
+        db.session.add_all([p1, p2])
+        db.session.flush()
+        ph = Phase(title='Build', start_date=date(2025, 3, 1), duration=60, project_id=p1.id)
+        db.session.add_all([ph, Phase(title='Elsewhere', start_date=date(2025, 3, 5), duration=3, project_id=p2.id)])
+        db.session.flush()
+        ft = Feature(title='March', start_date=date(2025, 3, 3), duration=5, phase_id=ph.id)
+        db.session.add(ft)
+        db.session.flush()
+        db.session.add_all([Item(title='April', start_date=date(2025, 4, 10), duration=2, feature_id=ft.id),
+                            Item(title='Edge', start_date=date(2025, 2, 27), duration=2, feature_id=ft.id)])
+        db.session.commit()
+        return p1.id, ft.id
+
+def test_feed_returns_only_overlapping_parts_of_project(app, auth_client):
+    pid, ft_id = _seed(app)
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    r = auth_client.get('/calendar/events?start=2025-03-01T00:00:00-05:00&end=2025-04-01T00:00:00-05:00')
+    assert r.status_code == 200
+    titles = {e['title'] for e in r.get_json()}
+    # 'Edge' ends (exclusive) on 2025-03-01, so it does not overlap; 'Elsewhere' is another project
+    assert titles == {'Phase: Build', 'Feature: March'}
+    march = next(e for e in r.get_json() if e['id'] == f'feature-{ft_id}')
+    assert (march['start'], march['end']) == ('2025-03-03', '2025-03-08')
+    assert auth_client.get('/calendar/events?start=bad&end=2025-04-01').status_code == 400
+
+def test_end_date_kept_in_sync_on_edit_and_drag(app, auth_client):
+    pid, ft_id = _seed(app)
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    auth_client.post(f'/edit_feature/{ft_id}', json={'duration': 10})
+    with app.app_context():
+        assert db.session.get(Feature, ft_id).end_date == date(2025, 3, 13)
+    auth_client.post('/update_gantt_task', json={'id': f'feature-{ft_id}', 'start': '2025-03-20'})
+    with app.app_context():
+        ft = db.session.get(Feature, ft_id)
+        assert ft.start_date == date(2025, 3, 20)
+        assert (ft.end_date - ft.start_date).days == ft.duration
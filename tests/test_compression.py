@@ -0,0 +1,43 @@
+import gzip
+from app import compression
+
+def test_index_gzipped_when_accepted(auth_client):
+    plain = auth_client.get('/')
+    assert plain.status_code == 200 and 'Content-Encoding' not in plain.headers
+    resp = auth_client.get('/', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert resp.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resp.headers['Vary']
+    body = gzip.decompress(resp.get_data())
+    assert body == plain.get_data()
+    assert int(resp.headers['Content-Length']) < len(body) / 3
+
+def test_small_and_binary_responses_untouched(auth_client, app):
+    small = auth_client.get('/active_users', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    static = auth_client.get('/static/Power_T.svg', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in static.headers  # send_file passthrough
+    static.close()
+
+def test_ics_export_gzipped_when_accepted(auth_client, app):
+    from datetime import date
+    from app.models import db, User, Project, Phase
+    with app.app_context():
+        proj = Project(title='Ics', owner_id=User.query.filter_by(username='tester').one().id)
+        db.session.add(proj)
+        db.session.flush()
+        db.session.add_all([Phase(title=f'Phase {i}', start_date=date(2025, 1, 1), duration=3, project_id=proj.id)
+                            for i in range(40)])
+        db.session.commit()
+        pid = proj.id
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    resp = auth_client.get('/export_calendar_ics', headers={'Accept-Encoding': 'gzip'})
+    assert resp.headers['Content-Encoding'] == 'gzip' and resp.mimetype == 'text/calendar'
+    assert resp.headers['Content-Disposition'] == 'attachment; filename=project_calendar.ics'
+    assert gzip.decompress(resp.get_data()).startswith(b'BEGIN:VCALENDAR')
+
+def test_choose_encoding_respects_q_values():
+    from werkzeug.datastructures import Accept
+    accept = Accept([('gzip', 0.5), ('br', 1)])
+    assert compression.choose_encoding(accept, ('br', 'gzip')) == 'br'
+    assert compression.choose_encoding(accept, ('gzip',)) == 'gzip'
+    assert compression.choose_encoding(Accept([('identity', 1)]), ('gzip',)) is None
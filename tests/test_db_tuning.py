@@ -0,0 +1,23 @@
+from sqlalchemy import text
+from app.models import db
+from app.db_tuning import build_engine_options, install_sqlite_pragmas
+from sqlalchemy import create_engine
+
+def test_pragmas_applied_on_connect(app):
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+def test_file_profile_enables_wal(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'x.db'}")
+    install_sqlite_pragmas(engine, {'busy_timeout': 250, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'})
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 250
+
+def test_engine_options_skip_pool_sizing_for_memory():
+    mem = build_engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+    assert 'pool_size' not in mem
+    disk = build_engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:////tmp/a.db', 'DB_POOL_SIZE': 7,
+                                 'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 60}})
+    assert disk['pool_size'] == 7 and disk['pool_recycle'] == 60
@@ -0,0 +1,65 @@
+from app.models import db, Project, Phase, Feature
+from app import dependencies
+
+AJAX = {'X-Requested-With': 'XMLHttpRequest'}
+
+def _feature(client, phase_id, title, deps=''):
+    r = client.post('/create_part', headers=AJAX, data={'part-type': 'feature', 'part-title': title, 'phase-id': str(phase_id),
+                                                        'part-start': '2025-01-01', 'duration': '2', 'part-dependencies': deps})
+    return r
+
+def test_dependency_writes_are_validated_incrementally(app, auth_client, monkeypatch):
+    auth_client.post('/create_project', data={'project-title': 'Deps'})
+    with app.app_context():
+        pid = Project.query.filter_by(title='Deps').one().id
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    auth_client.post('/create_part', data={'part-type': 'phase', 'part-title': 'P', 'part-start': '2025-01-01', 'duration': '9'})
+    with app.app_context():
+        phase_id = Phase.query.filter_by(project_id=pid).one().id
+    f1 = _feature(auth_client, phase_id, 'F1').get_json()['created']['id']
+    f2 = _feature(auth_client, phase_id, 'F2', f' feature-{f1} ').get_json()['created']['id']
+    r = _feature(auth_client, phase_id, 'F9', 'feature-999')
+    assert r.status_code == 400 and r.get_json()['unknown'] == ['feature-999']
+
+    builds = []
+    real_build = dependencies.DependencyIndex.build.__func__
+    monkeypatch.setattr(dependencies.DependencyIndex, 'build',
+                        classmethod(lambda cls, *a: builds.append(a) or real_build(cls, *a)))
+    r = auth_client.post(f'/edit_feature/{f1}', json={'dependencies': f'feature-{f2}'})
+    assert r.status_code == 400 and r.get_json()['cycle'] == [f'feature-{f1}', f'feature-{f2}', f'feature-{f1}']
+    for bad, key in ((f'phase-{phase_id}', 'unknown'), ('later!', 'unknown'), (f'feature-{f1}', 'cycle')):
+        r = auth_client.post(f'/edit_feature/{f1}', json={'dependencies': bad})
+        assert r.status_code == 400 and r.get_json()[key]
+    f3 = _feature(auth_client, phase_id, 'F3').get_json()['created']['id']
+    r = auth_client.post(f'/edit_feature/{f3}', json={'dependencies': f'feature-{f1}; {f2}'})
+    assert r.status_code == 200 and r.get_json()['part']['dependencies'] == f'feature-{f1},{f2}'
+    # The patched index still knows F3 -> F1, without a rebuild after F3's own write
+    builds.clear()
+    r = auth_client.post(f'/edit_feature/{f1}', json={'dependencies': f'feature-{f3}'})
+    assert r.status_code == 400 and f'feature-{f3}' in r.get_json()['cycle']
+    assert builds == []
+    with app.app_context():
+        assert db.session.get(Feature, f1).dependencies is None
+
+def test_failed_commit_leaves_cached_index_untouched(app, auth_client, monkeypatch):
+    auth_client.post('/create_project', data={'project-title': 'Deps2'})
+    with app.app_context():
+        pid = Project.query.filter_by(title='Deps2').one().id
+    auth_client.post('/set_project', data={'project-id': str(pid)})
+    auth_client.post('/create_part', data={'part-type': 'phase', 'part-title': 'P', 'part-start': '2025-01-01', 'duration': '9'})
+    with app.app_context():
+        phase_id = Phase.query.filter_by(project_id=pid).one().id
+    f1 = _feature(auth_client, phase_id, 'F1').get_json()['created']['id']
+    f2 = _feature(auth_client, phase_id, 'F2').get_json()['created']['id']
+
+    def failing_commit():
+        raise RuntimeError('disk full')
+    monkeypatch.setattr(db.session, 'commit', failing_commit)
+    try:
+        auth_client.post(f'/edit_feature/{f2}', json={'dependencies': f'feature-{f1}'})
+    except RuntimeError:
+        pass
+    monkeypatch.undo()
+    # F2 -> F1 was never saved, so F1 -> F2 is not a cycle
+    r = auth_client.post(f'/edit_feature/{f1}', json={'dependencies': f'feature-{f2}'})
+    assert r.status_code == 200
@@ -0,0 +1,76 @@
+from app.models import db, DraftPart, Project, Phase, Feature, Item
+
+def _setup(app, client):
+    client.post('/login', data={'username': 'tester', 'password': 'pass'})
+    client.post('/create_project', data={'project-title': 'Bulk'})
+    with app.app_context():
+        pid = Project.query.filter_by(title='Bulk').one().id
+    client.post('/set_project', data={'project-id': str(pid)})
+    client.post('/create_part', data={'part-type': 'phase', 'part-title': 'P1', 'part-start': '2025-01-01', 'part-duration': '10'})
+    with app.app_context():
+        return pid, Phase.query.first().id
+
+def _draft(client, title, **extra):
+    return client.post('/create_draft_part', data={'draft-title': title, **extra}).get_json()['draft']['id']
+
+def test_drafts_paged_by_project(app, client):
+    pid, _ = _setup(app, client)
+    with app.app_context():
+        other = Project(title='Other', owner_id=1)
+        db.session.add(other)
+        db.session.commit()
+        db.session.add(DraftPart(title='elsewhere', project_id=other.id))
+        db.session.commit()
+    ids = [_draft(client, f'D{i}') for i in range(5)]
+    page = client.get('/drafts?limit=2').get_json()
+    assert [d['id'] for d in page['drafts']] == ids[:2] and page['next'] == ids[1]
+    rest = client.get(f"/drafts?limit=10&after={page['next']}").get_json()
+    assert [d['id'] for d in rest['drafts']] == ids[2:] and rest['next'] is None
+
+def test_bulk_promotion_single_transaction(app, client):
+    _, phase_id = _setup(app, client)
+    client.post('/create_part', data={'part-type': 'feature', 'part-title': 'Base', 'phase-id': str(phase_id),
+                                      'part-start': '2025-01-01', 'duration': '1'})
+    with app.app_context():
+        base_id = Feature.query.filter_by(title='Base').one().id
+    d_phase = _draft(client, 'New phase', **{'draft-start': '2025-02-01', 'draft-duration': '3'})
+    d_feat = _draft(client, 'Feat', **{'draft-dependencies': f'feature-{base_id}', 'draft-notes': 'n'})
+    r = client.post('/promote_drafts', json={'drafts': [
+        {'draft_id': d_phase, 'inferred_type': 'phase'},
+        {'draft_id': d_feat, 'inferred_type': 'feature', 'phase_id': phase_id, 'start': '2025-01-02', 'duration': 4},
+    ]})
+    assert r.status_code == 200
+    data = r.get_json()
+    assert [c['type'] for c in data['created']] == ['phase', 'feature']
+    assert data['removed_draft_ids'] == [d_phase, d_feat]
+    assert {t['id'] for t in data['tasks']} == {f"{c['type']}-{c['id']}" for c in data['created']}
+    assert isinstance(data['critical_path'], list) and data['critical_path']
+    with app.app_context():
+        assert DraftPart.query.count() == 0
+        ft = Feature.query.filter_by(title='Feat').one()
+        assert ft.duration == 4 and ft.dependencies == f'feature-{base_id}' and ft.notes == 'n'
+        assert Phase.query.filter_by(title='New phase').one().duration == 3
+
+def test_bulk_promotion_rejects_all_on_error(app, client):
+    _setup(app, client)
+    ok = _draft(client, 'Fine')
+    bad = _draft(client, 'Orphan item')
+    r = client.post('/promote_drafts', json={'drafts': [
+        {'draft_id': ok, 'inferred_type': 'phase'},
+        {'draft_id': bad, 'inferred_type': 'item', 'feature_id': 424242},
+        {'draft_id': 999999, 'inferred_type': 'phase'},
+    ]})
+    assert r.status_code == 400
+    errors = {e['draft_id']: e['error'] for e in r.get_json()['errors']}
+    assert errors == {bad: 'feature_id 424242 not found', 999999: 'draft not found'}
+    with app.app_context():
+        assert DraftPart.query.count() == 2 and Item.query.count() == 0 and Phase.query.count() == 1
+
+def test_bulk_promotion_rejects_duplicate_draft(app, client):
+    _setup(app, client)
+    d = _draft(client, 'Twice')
+    r = client.post('/promote_drafts', json={'drafts': [
+        {'draft_id': d, 'inferred_type': 'phase'}, {'draft_id': d, 'inferred_type': 'phase'}]})
+    assert r.status_code == 400 and r.get_json()['errors'] == [{'draft_id': d, 'error': 'draft listed more than once'}]
+    with app.app_context():
+        assert DraftPart.query.count() == 1 and Phase.query.count() == 1
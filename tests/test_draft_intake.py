@@ -0,0 +1,45 @@
+import io
+from app.models import DraftPart, Project
+
+def _login(app, client):
+    client.post('/login', data={'username': 'tester', 'password': 'pass'})
+    client.post('/create_project', data={'project-title': 'Intake'})
+    with app.app_context():
+        pid = Project.query.filter_by(title='Intake').one().id
+    client.post('/set_project', data={'project-id': str(pid)})
+    return pid
+
+def test_pasted_list_creates_title_drafts(app, client):
+    pid = _login(app, client)
+    r = client.post('/drafts/intake', data={'text': '- Survey site\n\n2. Order steel\n* Pour slab\n'})
+    data = r.get_json()
+    assert r.status_code == 200 and data['created'] == 3 and data['errors'] == []
+    with app.app_context():
+        drafts = DraftPart.query.order_by(DraftPart.id).all()
+        assert [d.title for d in drafts] == ['Survey site', 'Order steel', 'Pour slab']
+        assert {d.project_id for d in drafts} == {pid}
+
+def test_csv_upload_keeps_good_rows_and_reports_bad(app, client):
+    _login(app, client)
+    csv_text = ('\ufefftitle,type,start,duration,dependencies,notes\n'
+                'Foundations,feature,2025-03-01,5,"feature-1, item-2",first\n'
+                ',item,,,,\n'
+                'Framing,widget,,,,\n'
+                'Roof,item,03/01/2025,2,,\n'
+                'Fit-out,,,0,,\n'
+                'Handover,item,,3,bogus dep,\n'
+                'Snag list,item,,2,7,"multi\nline"\n')
+    r = client.post('/drafts/intake', data={'file': (io.BytesIO(csv_text.encode('utf-8')), 'drafts.csv')},
+                    content_type='multipart/form-data')
+    data = r.get_json()
+    assert data['created'] == 2
+    assert [e['line'] for e in data['errors']] == [3, 4, 5, 6, 7]
+    assert 'missing title' in data['errors'][0]['error'] and 'unknown type' in data['errors'][1]['error']
+    with app.app_context():
+        first = DraftPart.query.filter_by(title='Foundations').one()
+        assert first.part_type == 'feature' and first.duration == 5 and first.dependencies == 'feature-1,item-2'
+        assert DraftPart.query.filter_by(title='Snag list').one().notes == 'multi\nline'
+
+def test_intake_requires_input(app, client):
+    _login(app, client)
+    assert client.post('/drafts/intake', data={'text': '  '}).status_code == 400
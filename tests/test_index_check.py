@@ -0,0 +1,22 @@
+from sqlalchemy import text
+from app.models import db
+from app.index_check import missing_indexes
+
+def test_declared_indexes_present_after_create_all(app):
+    with app.app_context():
+        assert missing_indexes() == []
+
+def test_dropped_index_reported_and_used_by_hierarchy_query(app):
+    with app.app_context():
+        plan = db.session.execute(text('EXPLAIN QUERY PLAN SELECT id FROM feature WHERE phase_id = 1 ORDER BY sort_order')).all()
+        assert 'ix_feature_phase_id_sort_order' in plan[0][-1]
+        db.session.execute(text('DROP INDEX ix_image_item_item_id'))
+        db.session.commit()
+        assert [m['name'] for m in missing_indexes()] == ['ix_image_item_item_id']
+
+def test_expression_index_matched_by_name(app):
+    # A database stuck at 0019 lacks 0020's lower(username) index; the unique username index must not stand in for it
+    with app.app_context():
+        db.session.execute(text('DROP INDEX ix_user_username_lower'))
+        db.session.commit()
+        assert missing_indexes() == [{'table': 'user', 'name': 'ix_user_username_lower', 'columns': ['lower(user.username)']}]
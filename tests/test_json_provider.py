@@ -0,0 +1,21 @@
+import json
+from datetime import date, datetime
+from app import json_provider
+from app.json_provider import AppJSONProvider, StdlibJSONProvider
+
+def test_dates_encoded_as_iso_by_both_paths(app):
+    payload = {'d': date(2025, 3, 4), 'dt': datetime(2025, 3, 4, 5, 6, 7)}
+    for cls in (AppJSONProvider, StdlibJSONProvider):
+        out = json.loads(cls(app).dumps(payload))
+        assert out == {'d': '2025-03-04', 'dt': '2025-03-04T05:06:07'}
+
+def test_provider_selected_from_config(app):
+    assert isinstance(app.json, AppJSONProvider)
+    assert app.json.use_orjson == (json_provider.orjson is not None)
+    with app.test_request_context():
+        resp = app.json.response({'when': date(2025, 1, 2)})
+        assert json.loads(resp.get_data()) == {'when': '2025-01-02'}
+
+def test_keys_keep_insertion_order(app):
+    for cls in (AppJSONProvider, StdlibJSONProvider):
+        assert cls(app).dumps({'b': 1, 'a': 2}).replace(' ', '') == '{"b":1,"a":2}'
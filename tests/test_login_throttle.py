@@ -0,0 +1,35 @@
+from app.blueprints import auth
+
+def test_throttle_survives_cookie_drop_and_skips_hash(app, client, monkeypatch):
+    app.config.update(LOGIN_THROTTLE_USER_CAPACITY=3, LOGIN_THROTTLE_BACKOFF_AFTER=2)
+    calls = []
+    real = auth.check_password_hash
+    monkeypatch.setattr(auth, 'check_password_hash', lambda h, p: calls.append(p) or real(h, p))
+    for _ in range(2):
+        r = client.post('/login', data={'username':'tester','password':'wrong'})
+        assert r.status_code == 302
+        client.delete_cookie('session')
+    # Backoff kicks in: further attempts are rejected without hashing, even with the right password
+    r = client.post('/login', data={'username':'tester','password':'pass'})
+    assert r.status_code == 429 and b'Too many attempts' in r.data
+    assert calls == ['wrong', 'wrong']
+    # Other users from the same address are unaffected by the pair lock
+    r = client.post('/login', data={'username':'someone','password':'x'})
+    assert r.status_code == 302
+
+def test_success_resets_pair(app, client):
+    client.post('/login', data={'username':'tester','password':'wrong'})
+    r = client.post('/login', data={'username':'tester','password':'pass'})
+    assert r.status_code == 302 and r.headers['Location'].endswith('/')
+    from app.models import LoginThrottle
+    with app.app_context():
+        assert LoginThrottle.query.filter(LoginThrottle.key.like('pair:%')).count() == 0
+
+def test_acquire_spends_atomically(app):
+    from app import throttle
+    with app.test_request_context():
+        app.config.update(LOGIN_THROTTLE_USER_CAPACITY=1)
+        assert throttle.acquire('bob', '10.0.0.1', now=1000.0) == 0
+        # Same instant: the only token is gone, and the rejected attempt charges neither bucket
+        assert throttle.acquire('bob', '10.0.0.1', now=1000.0) > 0
+        assert throttle.acquire('carol', '10.0.0.1', now=1000.0) == 0
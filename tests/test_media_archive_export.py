@@ -0,0 +1,34 @@
+import io, json, zipfile
+from datetime import date
+from app.models import db, Project, Phase, Image, User
+from app.blueprints import media
+
+def login(client):
+    return client.post('/login', data={'username':'tester','password':'pass'}, follow_redirects=True)
+
+def test_project_archive_includes_media(app, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(media, 'UPLOAD_FOLDER', str(tmp_path))
+    (tmp_path / 'photo.jpg').write_bytes(b'\xff\xd8' + b'x' * 200000)
+    (tmp_path / 'other.png').write_bytes(b'png')
+    login(client)
+    with app.app_context():
+        u = User.query.filter_by(username='tester').first()
+        proj = Project(title='Arc', owner_id=u.id)
+        db.session.add(proj); db.session.commit()
+        ph = Phase(title='P', start_date=date(2025, 1, 1), duration=2, project_id=proj.id)
+        db.session.add(ph); db.session.commit()
+        owned = Image(filename='photo.jpg', project_id=proj.id)
+        linked = Image(filename='other.png')
+        linked.phases.append(ph)
+        missing = Image(filename='gone.pdf', project_id=proj.id)
+        db.session.add_all([owned, linked, missing, Image(filename='unrelated.png')]); db.session.commit()
+        pid = proj.id
+    r = client.get(f'/media/export_project_archive/{pid}')
+    assert r.status_code == 200 and r.mimetype == 'application/zip'
+    z = zipfile.ZipFile(io.BytesIO(r.data))
+    assert set(z.namelist()) == {'project.json', 'uploads/photo.jpg', 'uploads/other.png'}
+    assert z.getinfo('uploads/photo.jpg').compress_type == zipfile.ZIP_STORED
+    assert z.read('uploads/photo.jpg') == (tmp_path / 'photo.jpg').read_bytes()
+    meta = json.loads(z.read('project.json'))
+    assert meta['phases'][0]['title'] == 'P'
+    assert {i['filename']: i['included'] for i in meta['images']} == {'photo.jpg': True, 'other.png': True, 'gone.pdf': False}
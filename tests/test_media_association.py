@@ -15,16 +15,16 @@ def test_media_association_flow(app, client):
         phase = Phase(title='Phase 1', start_date=date.today(), duration=1, project_id=proj_id)
         db.session.add(phase)
         db.session.commit()
-    feature = Feature(title='Feature 1', start_date=date.today(), duration=2, phase_id=phase.id)
-    db.session.add(feature); db.session.commit()
-    item = Item(title='Item 1', start_date=date.today(), duration=2, feature_id=feature.id)
-    db.session.add(item); db.session.commit()
+        feature = Feature(title='Feature 1', start_date=date.today(), duration=2, phase_id=phase.id)
+        db.session.add(feature); db.session.commit()
+        item = Item(title='Item 1', start_date=date.today(), duration=2, feature_id=feature.id)
+        db.session.add(item); db.session.commit()
         img = Image(filename='f.png', project_id=proj_id)
         db.session.add(img)
         db.session.commit()
         iid = img.id
         phase_id = phase.id
-    feature_id = feature.id; item_id = item.id
+        feature_id = feature.id; item_id = item.id
     # associate to phase
     r = client.post('/media/associate', json={'image_id':iid,'target_type':'phase','target_id':phase_id})
     assert r.status_code==200
@@ -0,0 +1,30 @@
+from app.models import db, Project, Phase, Feature, Item, Image, User
+from datetime import date
+
+def login(client):
+    return client.post('/login', data={'username':'tester','password':'pass'}, follow_redirects=True)
+
+def test_batch_links(app, client):
+    login(client)
+    with app.app_context():
+        u = User.query.filter_by(username='tester').first()
+        proj = Project(title='Batch', owner_id=u.id)
+        db.session.add(proj); db.session.commit()
+        ph = Phase(title='P', start_date=date.today(), duration=1, project_id=proj.id)
+        db.session.add(ph); db.session.commit()
+        ft = Feature(title='F', start_date=date.today(), duration=1, phase_id=ph.id)
+        db.session.add(ft); db.session.commit()
+        it = Item(title='I', start_date=date.today(), duration=1, feature_id=ft.id)
+        db.session.add(it); db.session.commit()
+        linked = Image(filename='a.png', project_id=proj.id)
+        linked.phases.append(ph); linked.features.append(ft); linked.items.append(it)
+        bare = Image(filename='b.png', project_id=proj.id)
+        db.session.add_all([linked, bare]); db.session.commit()
+        linked_id, bare_id = linked.id, bare.id
+    r = client.post('/media/links/batch', json={'image_ids':[bare_id, linked_id, 9999]})
+    assert r.status_code == 200
+    images = {m['image_id']: m for m in r.get_json()['images']}
+    assert set(images) == {linked_id, bare_id}
+    assert [len(images[linked_id][k]) for k in ('phases','features','items')] == [1,1,1]
+    assert images[bare_id]['phases'] == [] and images[bare_id]['filename'] == 'b.png'
+    assert client.post('/media/links/batch', json={'image_ids':['x']}).status_code == 400
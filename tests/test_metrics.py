@@ -0,0 +1,22 @@
+from app.metrics import registry
+
+def test_metrics_exposes_route_latency_and_queries(app, client):
+    registry.reset()
+    client.post('/login', data={'username':'tester','password':'pass'})
+    client.get('/active_users')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{endpoint="presence.active_users",method="GET"} 1' in body
+    assert 'http_responses_total{endpoint="auth.login",method="POST",status="302"} 1' in body
+    line = next(l for l in body.splitlines() if l.startswith('db_queries_total{endpoint="presence.active_users"}'))
+    assert int(line.split()[-1]) >= 1
+
+def test_metrics_token(app, client):
+    app.config['METRICS_TOKEN'] = 's3cret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+
+def test_metrics_loopback_only_without_token(app, client):
+    app.config.update(METRICS_TOKEN=None, METRICS_LOOPBACK_ONLY=True)
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 403
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 200
@@ -0,0 +1,55 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature
+from app.portfolio import clear_cache
+
+def _seed(app):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        for n, (title, ext) in enumerate((('Alpha', 'internal'), ('Beta', 'external'))):
+            proj = Project(title=title, owner_id=uid)
+            db.session.add(proj)
+            db.session.flush()
+            ph = Phase(title='P', start_date=date(2025, 3, 1), duration=5, project_id=proj.id)
+            db.session.add(ph)
+            db.session.flush()
+            db.session.add_all([
+                Feature(id=10 * n + 1, title='A', start_date=date(2025, 3, 1), duration=4, phase_id=ph.id),
+                Feature(id=10 * n + 2, title='B', start_date=date(2025, 3, 1), duration=2 + n, internal_external=ext,
+                        dependencies=f'feature-{10 * n + 1}', phase_id=ph.id),
+                Feature(id=10 * n + 3, title='C', start_date=date(2025, 3, 1), duration=1, phase_id=ph.id),
+            ])
+        db.session.commit()
+
+def test_portfolio_rollup_is_cached_per_project_version(app, auth_client):
+    clear_cache()
+    _seed(app)
+    r = auth_client.get('/portfolio').get_json()
+    assert (r['recomputed'], r['cached']) == (2, 0)
+    alpha, beta = r['projects']
+    assert alpha['finish'] == '2025-03-07' and beta['finish'] == '2025-03-08'
+    assert alpha['critical_tasks'] == 2 and alpha['total_float_days'] == 5
+    assert beta['external_share'] == round(1 / 3, 4) and alpha['external_share'] == 0
+    assert r['summary'] == {'projects': 2, 'tasks': 6, 'finish': '2025-03-08', 'critical_tasks': 4,
+                            'total_float_days': 11, 'external_share': round(1 / 6, 4), 'errors': 0}
+    assert auth_client.get('/portfolio').get_json()['cached'] == 2
+    auth_client.post('/edit_feature/2', json={'duration': 6})
+    r = auth_client.get('/portfolio').get_json()
+    assert (r['recomputed'], r['cached']) == (1, 1)
+    assert r['projects'][0]['finish'] == '2025-03-11'
+
+def test_portfolio_process_pool_matches_serial(app, auth_client, monkeypatch):
+    clear_cache()
+    _seed(app)
+    serial = auth_client.get('/portfolio').get_json()
+    clear_cache()
+    monkeypatch.setitem(app.config, 'PORTFOLIO_WORKERS', 2)
+    monkeypatch.setitem(app.config, 'PORTFOLIO_PARALLEL_MIN_TASKS', 0)
+    pooled = auth_client.get('/portfolio').get_json()
+    assert pooled['workers'] == 2
+    assert pooled['projects'] == serial['projects'] and pooled['summary'] == serial['summary']
+    # The pool outlives the request
+    from app import process_pool
+    pool = process_pool.get_pool(2)
+    clear_cache()
+    auth_client.get('/portfolio')
+    assert process_pool.get_pool(2) is pool
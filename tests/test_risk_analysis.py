@@ -0,0 +1,55 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature
+
+def _project(app):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        proj = Project(title='Risk', owner_id=uid)
+        db.session.add(proj)
+        db.session.flush()
+        ph = Phase(title='P', start_date=date(2025, 3, 1), duration=30, project_id=proj.id)
+        db.session.add(ph)
+        db.session.flush()
+        db.session.add_all([
+            Feature(id=1, title='Design', start_date=date(2025, 3, 1), duration=5, phase_id=ph.id),
+            Feature(id=2, title='Build', start_date=date(2025, 3, 6), duration=5, dependencies='feature-1', phase_id=ph.id),
+            Feature(id=3, title='Permits', start_date=date(2025, 3, 1), duration=10, phase_id=ph.id),
+        ])
+        db.session.commit()
+        return proj.id
+
+def test_estimates_editable_and_certain_durations_reproduce_plan(app, auth_client):
+    pid = _project(app)
+    r = auth_client.post('/risk_analysis', json={'project_id': pid, 'simulations': 50, 'seed': 1}).get_json()
+    assert r['uncertain_tasks'] == 0
+    assert r['deterministic_finish'] == r['p50'] == r['p95'] == '2025-03-11'
+    assert {c['id'] for c in r['criticality'] if c['index'] == 1.0} == {'feature-1', 'feature-2', 'feature-3'}
+    part = auth_client.post('/edit_feature/2', json={'duration_optimistic': 4, 'duration_pessimistic': 20}).get_json()['part']
+    assert (part['duration_optimistic'], part['duration_pessimistic']) == (4, 20)
+
+def test_pessimistic_tail_moves_percentiles_and_criticality(app, auth_client):
+    pid = _project(app)
+    with app.app_context():
+        f = db.session.get(Feature, 2)
+        f.duration_optimistic, f.duration_pessimistic = 4, 20
+        db.session.commit()
+    r = auth_client.post('/risk_analysis', json={'project_id': pid, 'simulations': 2000, 'seed': 7}).get_json()
+    assert r['uncertain_tasks'] == 1 and r['deterministic_finish'] == '2025-03-11'
+    assert '2025-03-11' <= r['p50'] <= r['p80'] <= r['p95'] <= '2025-03-26'
+    assert r['p95'] > '2025-03-18'
+    index = {c['id']: c['index'] for c in r['criticality']}
+    assert index['feature-2'] > 0.8 and index['feature-3'] < 0.2
+    assert auth_client.post('/risk_analysis', json={'project_id': pid, 'simulations': 10 ** 9}).status_code == 400
+    assert auth_client.post('/risk_analysis', json={'project_id': 'x1'}).status_code == 400
+
+def test_pooled_batches_are_reproducible(app, auth_client):
+    pid = _project(app)
+    with app.app_context():
+        f = db.session.get(Feature, 2)
+        f.duration_optimistic, f.duration_pessimistic = 4, 20
+        db.session.commit()
+        from app.risk import analyse_project_risk
+        first = analyse_project_risk(pid, simulations=400, seed=3, workers=2)
+        again = analyse_project_risk(pid, simulations=400, seed=3, workers=2)
+    assert first['workers'] == 2 and first['batches'] == 2
+    assert first == again
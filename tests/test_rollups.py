@@ -0,0 +1,45 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature, Item
+
+def _rollup(model, pid):
+    obj = db.session.get(model, pid)
+    return obj.rollup_start, obj.rollup_end, obj.rollup_children, obj.rollup_milestones
+
+def test_rollups_follow_child_create_edit_move_delete(app, auth_client):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        proj = Project(title='Roll', owner_id=uid)
+        db.session.add(proj)
+        db.session.flush()
+        ph = Phase(title='P', start_date=date(2025, 3, 1), duration=10, project_id=proj.id)
+        db.session.add(ph)
+        db.session.flush()
+        f1 = Feature(title='F1', start_date=date(2025, 3, 2), duration=3, phase_id=ph.id)
+        f2 = Feature(title='F2', start_date=date(2025, 3, 3), duration=2, phase_id=ph.id, is_milestone=True)
+        db.session.add_all([f1, f2])
+        db.session.flush()
+        db.session.add_all([
+            Item(title='a', start_date=date(2025, 3, 2), duration=2, feature_id=f1.id),
+            Item(title='b', start_date=date(2025, 3, 8), duration=6, feature_id=f1.id, is_milestone=True),
+        ])
+        db.session.commit()
+        ph_id, f1_id, f2_id = ph.id, f1.id, f2.id
+        b_id = Item.query.filter_by(title='b').one().id
+        assert _rollup(Feature, f1_id) == (date(2025, 3, 2), date(2025, 3, 14), 2, 1)
+        assert _rollup(Phase, ph_id) == (date(2025, 3, 2), date(2025, 3, 14), 2, 2)
+    task = auth_client.post(f'/edit_feature/{f1_id}', json={'title': 'F1'}).get_json()['task']
+    assert 'rollup-drift' in task['custom_class'] and task['rollup']['end'] == '2025-03-14'
+    # edit_item JSON without is_milestone clears the flag
+    auth_client.post(f'/edit_item/{b_id}', json={'duration': 2})
+    with app.app_context():
+        assert _rollup(Feature, f1_id)[1] == date(2025, 3, 10)
+        # Moving an item refreshes both the old and the new parent
+        db.session.get(Item, b_id).feature_id = f2_id
+        db.session.commit()
+        assert _rollup(Feature, f1_id) == (date(2025, 3, 2), date(2025, 3, 4), 1, 0)
+        assert _rollup(Feature, f2_id) == (date(2025, 3, 8), date(2025, 3, 10), 1, 0)
+        assert _rollup(Phase, ph_id) == (date(2025, 3, 2), date(2025, 3, 10), 2, 1)
+    auth_client.post(f'/delete_item/{b_id}')
+    with app.app_context():
+        assert _rollup(Feature, f2_id) == (None, None, 0, 0)
+        assert _rollup(Phase, ph_id) == (date(2025, 3, 2), date(2025, 3, 5), 2, 1)
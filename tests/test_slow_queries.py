@@ -0,0 +1,26 @@
+from app import create_app, slow_queries
+from app.models import db
+
+def test_slow_statements_captured_with_plan(app, client, monkeypatch):
+    import config
+    monkeypatch.setattr(config.BaseConfig, 'SLOW_QUERY_MS', 0.001)
+    monkeypatch.setattr(config.BaseConfig, 'SLOW_QUERY_LOG_PARAMS', True)
+    slow_app = create_app()
+    slow_queries.clear()
+    with slow_app.app_context():
+        db.create_all()
+        with slow_app.test_request_context('/probe'):
+            db.session.execute(db.text(
+                "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x+1 FROM n WHERE x < 20000) "
+                "SELECT count(*) FROM n WHERE x > :lo"), {'lo': 5}).scalar()
+    entries = slow_queries.recent()
+    assert entries, 'expected at least one captured statement'
+    hit = next(e for e in entries if 'RECURSIVE' in e['statement'])
+    assert hit['route'].startswith('GET /probe') and '5' in hit['parameters'] and hit['plan']
+    client.post('/login', data={'username':'tester','password':'pass'})
+    r = client.get('/admin/slow_queries?format=json')
+    assert r.status_code == 200 and 'queries' in r.get_json()
+
+def test_parameters_redacted_by_default():
+    assert slow_queries._format_params(('pbkdf2:sha256:secret', 'alice'), False) == '<2 redacted>'
+    assert 'secret' in slow_queries._format_params(('pbkdf2:sha256:secret',), True)
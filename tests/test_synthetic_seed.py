@@ -0,0 +1,18 @@
+from app.models import Phase, Feature, Item, Image, image_feature, image_item, image_phase, db
+from app.synthetic import seed_synthetic
+from app.blueprints.planning import _parse_dep_ids, compute_critical_path, _iter_project_parts
+
+def test_seed_shape_and_acyclic_dependencies(app):
+    with app.app_context():
+        summary = seed_synthetic(parts=200, projects=2, seed=7, owner='tester')
+        assert len(summary['projects']) == 2
+        assert summary['phases'] + summary['features'] + summary['items'] == 400
+        assert Image.query.count() == summary['images'] == 20
+        links = sum(db.session.query(t).count() for t in (image_phase, image_feature, image_item))
+        assert links == summary['links'] > 0
+        for model in (Feature, Item):
+            for obj in model.query.filter(model.dependencies.isnot(None)):
+                assert all(d < obj.id for d in _parse_dep_ids(obj.dependencies))
+        assert compute_critical_path(*_iter_project_parts(summary['projects'][0]))
+        again = seed_synthetic(parts=200, projects=1, seed=7, owner='tester')
+        assert Phase.query.count() == 3 * summary['phases'] // 2 and again['phases'] == 4
@@ -0,0 +1,43 @@
+import os, time
+from app.models import db, Image, Phase, Project, User
+from app.upload_gc import scan_uploads
+from app.blueprints import media
+from datetime import date
+
+def _old(path):
+    past = time.time() - 3600
+    os.utime(path, (past, past))
+
+def test_scan_reports_and_reclaims(app, tmp_path):
+    for name in ('kept.png', 'orphan.jpg'):
+        (tmp_path / name).write_bytes(b'x'); _old(tmp_path / name)
+    (tmp_path / 'fresh.pdf').write_bytes(b'x')  # too recent to reclaim
+    with app.app_context():
+        u = User.query.filter_by(username='tester').first()
+        proj = Project(title='GC', owner_id=u.id); db.session.add(proj); db.session.commit()
+        ph = Phase(title='P', start_date=date.today(), duration=1, project_id=proj.id)
+        dangling = Image(filename='missing.png', project_id=proj.id)
+        dangling.phases.append(ph)
+        db.session.add_all([ph, Image(filename='kept.png'), dangling]); db.session.commit()
+        report = scan_uploads(str(tmp_path), batch_size=1)
+        assert report['scanned_files'] == 3
+        assert report['orphan_sample'] == ['orphan.jpg'] and report['skipped_recent'] == 1
+        assert report['dangling_sample'] == ['missing.png']
+        assert (tmp_path / 'orphan.jpg').exists()
+        report = scan_uploads(str(tmp_path), reclaim=True, batch_size=1)
+        assert report['reclaimed_files'] == 1 and report['removed_rows'] == 1
+        assert not (tmp_path / 'orphan.jpg').exists() and (tmp_path / 'fresh.pdf').exists()
+        assert [i.filename for i in Image.query.all()] == ['kept.png']
+        assert ph.images_multi.count() == 0
+
+def test_missing_folder_never_reclaims(app, tmp_path):
+    with app.app_context():
+        db.session.add(Image(filename='a.png')); db.session.commit()
+        report = scan_uploads(str(tmp_path / 'nope'), reclaim=True)
+        assert report['error'] and Image.query.count() == 1
+
+def test_admin_trigger(app, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(media, 'UPLOAD_FOLDER', str(tmp_path))
+    client.post('/login', data={'username':'tester','password':'pass'})
+    r = client.post('/admin/uploads_gc', json={'reclaim': False})
+    assert r.status_code == 200 and r.get_json()['scanned_files'] == 0
@@ -0,0 +1,27 @@
+from sqlalchemy import event
+from app.models import db, User
+from werkzeug.security import check_password_hash
+
+def _user_lookups(app):
+    seen = []
+    with app.app_context():
+        engine = db.engine
+    def capture(conn, cursor, statement, params, context, executemany):
+        if 'FROM user' in statement and 'WHERE user.id =' in statement:
+            seen.append(statement)
+    event.listen(engine, 'before_cursor_execute', capture)
+    return seen
+
+def test_loader_served_from_cache_and_writes_still_work(app, client):
+    client.post('/login', data={'username':'tester','password':'pass'})
+    client.get('/active_users')  # warm
+    seen = _user_lookups(app)
+    for _ in range(3):
+        assert client.get('/active_users').status_code == 200
+    assert seen == []
+    r = client.post('/change_password', data={'old-password':'pass','new-password':'secret1','confirm-password':'secret1'})
+    assert r.status_code == 302
+    with app.app_context():
+        assert check_password_hash(User.query.filter_by(username='tester').first().password_hash, 'secret1')
+    client.get('/active_users')
+    assert len(seen) == 1  # invalidated by change_password, reloaded once
@@ -0,0 +1,62 @@
+from datetime import date
+from app.models import db, User, Project, Phase, Feature
+from app.workcal import WorkCalendar, get_calendar, parse_weekmask, expand_periods
+
+def test_business_day_offsets():
+    cal = WorkCalendar('1111100', expand_periods([(date(2025, 3, 10), date(2025, 3, 11))]))
+    fri = date(2025, 3, 7)
+    # Five working days from a Friday skip the weekend and the two-day shutdown
+    assert cal.end_date(fri, 5) == date(2025, 3, 18)
+    assert cal.roll_forward(date(2025, 3, 8)) == date(2025, 3, 12)
+    assert cal.count(date(2025, 3, 3), date(2025, 3, 17)) == 8
+    assert cal.indices([fri.toordinal()]) == [cal.index(fri)]
+    assert not cal.is_working(date(2025, 3, 10))
+    assert parse_weekmask('Mon Tue Wed Thu') == '1111000'
+    assert get_calendar(None).end_date(fri, 5) == date(2025, 3, 12)
+
+def test_calendar_compiles_a_window_on_demand():
+    cal = WorkCalendar('1111100')
+    cal.end_date(date(2025, 3, 7), 5)
+    compiled = len(cal._win[1])
+    assert compiled < 2000
+    # Growing the window keeps indices absolute
+    k = cal.index(date(2025, 3, 7))
+    assert cal.end_date(date(2150, 1, 1), 1) == date(2150, 1, 2)
+    assert len(cal._win[1]) > compiled and cal.index(date(2025, 3, 7)) == k
+    assert cal.day_at(k) == date(2025, 3, 7)
+
+def test_project_calendar_resyncs_end_dates_and_schedule(app, auth_client):
+    with app.app_context():
+        uid = User.query.filter_by(username='tester').one().id
+        proj = Project(title='Cal', owner_id=uid)
+        db.session.add(proj)
+        db.session.flush()
+        ph = Phase(title='P', start_date=date(2025, 3, 7), duration=10, project_id=proj.id)
+        db.session.add(ph)
+        db.session.flush()
+        db.session.add_all([
+            Feature(id=1, title='A', start_date=date(2025, 3, 7), duration=5, phase_id=ph.id),
+            Feature(id=2, title='B', start_date=date(2025, 3, 7), duration=1, dependencies='feature-1', phase_id=ph.id),
+        ])
+        db.session.commit()
+        pid = proj.id
+        assert db.session.get(Feature, 1).end_date == date(2025, 3, 12)
+    r = auth_client.post('/project_calendar', json={'project_id': pid, 'workweek': 'Mon Tue Wed Thu Fri',
+                                                    'periods': [{'start': '2025-03-17', 'label': 'Holiday'}]})
+    body = r.get_json()
+    assert r.status_code == 200 and body['workweek'] == '1111100' and body['resynced'] == 3
+    assert body['periods'][0]['end'] == '2025-03-17'
+    assert auth_client.post('/project_calendar', json={'project_id': 'cal', 'workweek': None}).status_code == 400
+    assert auth_client.get('/project_calendar?project_id=cal').status_code == 400
+    with app.app_context():
+        assert db.session.get(Feature, 1).end_date == date(2025, 3, 14)
+    updates = auth_client.post('/auto_schedule', json={'project_id': pid}).get_json()['updates']
+    # A (Fri-Thu) ends before Friday 14th; moving A to Monday pushes B past the 17th holiday
+    assert updates == [{'id': 'feature-2', 'start': '2025-03-14', 'end': '2025-03-15', 'duration': 1}]
+    with app.app_context():
+        db.session.get(Feature, 1).start_date = date(2025, 3, 10)
+        db.session.commit()
+        assert db.session.get(Feature, 1).end_date == date(2025, 3, 15)
+    updates = auth_client.post('/auto_schedule', json={'project_id': pid}).get_json()['updates']
+    assert updates[0]['start'] == '2025-03-18'
+    assert auth_client.post('/project_calendar', json={'project_id': pid, 'workweek': 'Funday'}).status_code == 400